@@ -1,11 +1,14 @@
 import os
-from datetime import datetime
+import sys
 import logging
-from pydub import AudioSegment
+
+# 저장소 최상위 폴더에서 minute_code_alpha 패키지를 찾을 수 있게 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minute_code_alpha.audio.ingest import convert_to_wav
 
 
 def convert_wav(file_obj, data_dir):
-    """파일을 업로드하고 WAV로 변환합니다."""
+    """파일을 업로드하고 16kHz 모노 WAV로 변환합니다."""
     if file_obj is None:
         return None
 
@@ -18,8 +21,7 @@ def convert_wav(file_obj, data_dir):
     print(wav_path)
 
     try:
-        audio = AudioSegment.from_file(original_path)
-        audio.export(wav_path, format="wav")
+        convert_to_wav(original_path, wav_path)
         status = f"'{filename}'이(가) '{os.path.basename(wav_path)}'(으)로 변환되어 저장되었습니다."
     except Exception as e:
         status = f"파일 변환 중 오류 발생: {e}"
@@ -0,0 +1,127 @@
+"""
+[ai-seong-han-juni]
+이 파일은 오디오 팀 전용 '기억 창고' 창구입니다.
+같은 녹음 파일을 LLM이나 회의 주제만 바꿔서 다시 처리할 때,
+오디오 내용이 그대로라면 화자 분리와 음성 인식을 다시 하지 않고 예전 결과를 꺼내줍니다.
+오디오 내용의 해시(지문)와 모델/프롬프트 설정을 함께 열쇠로 써서, 조금이라도 다르면 새로 처리합니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import threading
+
+import numpy as np
+
+from ..core.cache import DiskCache, make_cache_key
+from ..settings import (
+    CACHE_DIR,
+    AUDIO_CACHE_MAX_BYTES,
+    DIARIZATION_BACKEND,
+    DIARIZATION_MODEL,
+    FAST_DIARIZATION_SEGMENT_SEC,
+    FAST_DIARIZATION_MIN_SEGMENT_SEC,
+    FAST_DIARIZATION_THRESHOLD,
+    FAST_DIARIZATION_MAX_SPEAKERS,
+    FAST_DIARIZATION_N_MELS,
+    DIARIZATION_WINDOWED_MIN_SEC,
+    DIARIZATION_WINDOW_SEC,
+    DIARIZATION_WINDOW_OVERLAP_SEC,
+    DIARIZATION_SPEAKER_MATCH_THRESHOLD,
+    VAD_FRAME_SEC,
+    VAD_MARGIN_DB,
+    VAD_MIN_THRESHOLD_DB,
+    VAD_HANGOVER_SEC,
+    VAD_MIN_PAUSE_SEC,
+    STT_PACK_MAX_SEC,
+    STT_PACK_MIN_SEC,
+    STT_PACK_MAX_GAP_SEC
+)
+
+_cache = None  # 오디오 캐시가 한 번만 만들어지도록 저장해두는 변수
+_cache_lock = threading.Lock()
+
+def get_audio_cache() -> DiskCache:
+    """오디오 결과용 디스크 캐시를 생성하거나 이미 생성된 캐시를 반환합니다."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(os.path.join(CACHE_DIR, "audio"), AUDIO_CACHE_MAX_BYTES)
+    return _cache
+
+def _diarization_key(audio_hash: str, backend: str = DIARIZATION_BACKEND, windows: tuple = None) -> str:
+    # 화자 분리 결과에 영향을 주는 설정이 바뀌면 다른 키가 되도록 함께 묶습니다.
+    if backend == "fast":
+        params = {
+            "segment_sec": FAST_DIARIZATION_SEGMENT_SEC,
+            "min_segment_sec": FAST_DIARIZATION_MIN_SEGMENT_SEC,
+            "threshold": FAST_DIARIZATION_THRESHOLD,
+            "max_speakers": FAST_DIARIZATION_MAX_SPEAKERS,
+            "n_mels": FAST_DIARIZATION_N_MELS,
+            "embedding": "fixed",  # 화자 명부용 임베딩을 회의와 상관없는 정규화로 바꾼 뒤의 결과
+        }
+    else:
+        params = {
+            "model": DIARIZATION_MODEL,
+            "windowed_min_sec": DIARIZATION_WINDOWED_MIN_SEC,
+            "window_sec": DIARIZATION_WINDOW_SEC,
+            "overlap_sec": DIARIZATION_WINDOW_OVERLAP_SEC,
+            "match_threshold": DIARIZATION_SPEAKER_MATCH_THRESHOLD,
+        }
+        if windows:
+            # 짧은 녹음을 (창 길이, 겹침) 창으로 나눠 처리한 결과는 한 번에 처리한 결과와 따로 보관합니다.
+            params["pipeline_windows"] = list(windows)
+    return make_cache_key("diarization", backend, audio_hash, params)
+
+def _transcript_key(audio_hash: str, start: float, end: float, model: str, prompt: str) -> str:
+    # 구간 경계는 밀리초 단위로 반올림해서 부동소수점 오차로 키가 달라지지 않게 합니다.
+    return make_cache_key("transcript", audio_hash, round(start * 1000), round(end * 1000), model, prompt)
+
+def load_cached_turns(audio_hash: str, backend: str = DIARIZATION_BACKEND, windows: tuple = None):
+    """캐시된 화자 분리 결과([start, end, speaker] 목록)를 반환합니다. 없으면 None."""
+    entry = get_audio_cache().get(_diarization_key(audio_hash, backend, windows))
+    return entry["turns"] if entry else None
+
+def load_cached_speaker_embeddings(audio_hash: str, backend: str = DIARIZATION_BACKEND, windows: tuple = None) -> dict:
+    """화자 분리 결과와 함께 캐시된 화자별 임베딩 {화자 이름: 벡터}를 반환합니다. 없으면 빈 딕셔너리."""
+    entry = get_audio_cache().get(_diarization_key(audio_hash, backend, windows))
+    embeddings = (entry or {}).get("embeddings") or {}
+    return {label: np.asarray(vector, dtype=np.float32) for label, vector in embeddings.items()}
+
+def save_cached_turns(audio_hash: str, turns: list, backend: str = DIARIZATION_BACKEND, embeddings: dict = None,
+                      windows: tuple = None):
+    """
+    화자 분리 결과([start, end, speaker] 목록)와 (있으면) 화자별 임베딩을 캐시에 저장합니다.
+    windows는 짧은 녹음을 창으로 나눠 처리했을 때의 (창 길이, 겹침)입니다.
+    """
+    entry = {"turns": turns}
+    if embeddings:
+        entry["embeddings"] = {label: np.asarray(vector).tolist() for label, vector in embeddings.items()}
+    get_audio_cache().set(_diarization_key(audio_hash, backend, windows), entry)
+
+def _segments_key(audio_hash: str, turns) -> str:
+    # 침묵 다듬기/구간 묶기 결과는 화자 분리 구간과 두 단계의 설정에만 달라집니다.
+    params = {
+        "vad": [VAD_FRAME_SEC, VAD_MARGIN_DB, VAD_MIN_THRESHOLD_DB, VAD_HANGOVER_SEC, VAD_MIN_PAUSE_SEC],
+        "pack": [STT_PACK_MAX_SEC, STT_PACK_MIN_SEC, STT_PACK_MAX_GAP_SEC],
+    }
+    rounded = [[round(start * 1000), round(end * 1000), speaker] for start, end, speaker in turns]
+    return make_cache_key("vad_segments", audio_hash, rounded, params)
+
+def load_cached_segments(audio_hash: str, turns):
+    """캐시된 (VAD로 다듬고 묶은 STT 구간 목록, 잘라낸 침묵 길이(초))를 반환합니다. 없으면 None."""
+    entry = get_audio_cache().get(_segments_key(audio_hash, turns))
+    return (entry["segments"], entry.get("removed_seconds", 0.0)) if entry else None
+
+def save_cached_segments(audio_hash: str, turns, segments: list, removed_seconds: float = 0.0):
+    """화자 분리 구간을 VAD로 다듬고 묶은 STT 구간 목록과 잘라낸 침묵 길이(초)를 캐시에 저장합니다."""
+    get_audio_cache().set(_segments_key(audio_hash, turns), {"segments": segments, "removed_seconds": removed_seconds})
+
+def load_cached_transcript(audio_hash: str, start: float, end: float, model: str, prompt: str):
+    """캐시된 구간별 음성 인식 결과를 반환합니다. 없으면 None."""
+    entry = get_audio_cache().get(_transcript_key(audio_hash, start, end, model, prompt))
+    return entry["text"] if entry else None
+
+def save_cached_transcript(audio_hash: str, start: float, end: float, model: str, prompt: str, text: str):
+    """구간별 음성 인식 결과를 캐시에 저장합니다. (실패해서 빈 결과는 저장하지 않습니다.)"""
+    if text:
+        get_audio_cache().set(_transcript_key(audio_hash, start, end, model, prompt), {"text": text})
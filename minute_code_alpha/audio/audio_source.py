@@ -0,0 +1,235 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '오디오 창고지기'의 역할을 합니다.
+몇 시간짜리 회의 녹음 파일을 통째로 메모리에 올리면 컴퓨터가 버거워해요.
+이 담당자는 디스크에 있는 WAV 파일에서 필요한 구간만 조금씩 꺼내서
+다른 담당자들에게 건네주는 일을 합니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import wave
+import struct
+import numpy as np
+from pydub import AudioSegment
+
+# WAV 헤더의 오디오 형식 코드
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def get_wav_info(audio_path: str) -> dict:
+    """
+    WAV 파일의 헤더만 읽어서 기본 정보를 반환합니다. (오디오 데이터는 읽지 않습니다.)
+
+    Returns:
+        dict: channels, sample_width, sample_rate, n_frames, duration(초)
+    """
+    with wave.open(audio_path, "rb") as wf:
+        n_frames = wf.getnframes()
+        sample_rate = wf.getframerate()
+        return {
+            "channels": wf.getnchannels(),
+            "sample_width": wf.getsampwidth(),
+            "sample_rate": sample_rate,
+            "n_frames": n_frames,
+            "duration": n_frames / float(sample_rate) if sample_rate else 0.0,
+        }
+
+def pcm_to_float32(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """PCM 바이트를 -1.0 ~ 1.0 범위의 모노 float32 배열로 바꿉니다. (여러 채널은 평균으로 합칩니다.)"""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # 24비트 PCM은 numpy 기본 타입이 없으므로 3바이트씩 묶어 32비트로 늘려줍니다.
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        as_int32 = (packed[:, 0].astype(np.int32)
+                    | (packed[:, 1].astype(np.int32) << 8)
+                    | (packed[:, 2].astype(np.int32) << 16))
+        as_int32 = np.where(as_int32 & 0x800000, as_int32 - 0x1000000, as_int32)
+        samples = as_int32.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"지원하지 않는 샘플 크기입니다: {sample_width}바이트")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+def read_wav_range(audio_path: str, start: float, end: float):
+    """
+    WAV 파일에서 [start, end) 구간(초)만 디스크에서 읽어 모노 float32 배열로 반환합니다.
+
+    Returns:
+        tuple: (samples, sample_rate)
+    """
+    with wave.open(audio_path, "rb") as wf:
+        sample_rate = wf.getframerate()
+        n_frames = wf.getnframes()
+        start_frame = min(max(0, int(start * sample_rate)), n_frames)
+        end_frame = min(max(start_frame, int(end * sample_rate)), n_frames)
+        wf.setpos(start_frame)
+        raw = wf.readframes(end_frame - start_frame)
+        return pcm_to_float32(raw, wf.getsampwidth(), wf.getnchannels()), sample_rate
+
+def iter_wav_windows(audio_path: str, window_sec: float, overlap_sec: float):
+    """
+    WAV 파일을 서로 조금씩 겹치는 창(window) 단위로 나눠 차례대로 읽어줍니다.
+    한 번에 창 하나 분량만 메모리에 올라가므로, 파일 길이와 상관없이 메모리 사용량이 일정합니다.
+
+    Yields:
+        tuple: (창 시작 시각(초), 창 끝 시각(초), samples, sample_rate)
+    """
+    if window_sec <= overlap_sec:
+        raise ValueError("창 길이(window_sec)는 겹침 길이(overlap_sec)보다 커야 합니다.")
+
+    duration = get_wav_info(audio_path)["duration"]
+    hop_sec = window_sec - overlap_sec
+    window_start = 0.0
+    while window_start < duration:
+        window_end = min(window_start + window_sec, duration)
+        samples, sample_rate = read_wav_range(audio_path, window_start, window_end)
+        yield window_start, window_end, samples, sample_rate
+        if window_end >= duration:
+            break
+        window_start += hop_sec
+
+
+def _int24_to_int32(packed: np.ndarray) -> np.ndarray:
+    """(내부용) 마지막 축이 3바이트(리틀 엔디언)인 24비트 샘플 배열을 상위 24비트에 채운 int32 배열로 바꿉니다."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    widened = (packed[..., 0].astype("<i4") << 8) | (packed[..., 1].astype("<i4") << 16) \
+        | (packed[..., 2].astype("<i4") << 24)
+    return widened.astype("<i4")
+
+
+class WavAudioSource:
+    """
+    WAV 파일의 PCM 데이터를 numpy 메모리맵(memmap)으로 열어두는 오디오 원본입니다.
+
+    파일을 통째로 디코딩하지 않고 운영체제가 필요한 부분만 디스크에서 읽어오므로,
+    segment()로 꺼낸 구간은 복사본이 아닌 '창문(view)'입니다.
+    실제로 바이트가 복사되는 것은 업로드 직전에 to_audio_segment()로 인코딩할 때뿐입니다.
+    """
+
+    def __init__(self, audio_path: str):
+        self.audio_path = audio_path
+        with open(audio_path, "rb") as f:
+            fmt, data_offset, data_size = self._parse_header(f)
+
+        audio_format, self.channels, self.sample_rate, bits_per_sample = fmt
+        self.sample_width = bits_per_sample // 8
+        shape_tail = ()
+        if audio_format == _WAVE_FORMAT_PCM and bits_per_sample in (8, 16, 32):
+            dtype = {8: np.uint8, 16: "<i2", 32: "<i4"}[bits_per_sample]
+        elif audio_format == _WAVE_FORMAT_PCM and bits_per_sample == 24:
+            # 24비트 PCM은 numpy 기본 타입이 없으므로 샘플마다 3바이트 묶음으로 열어두고, 꺼낼 때 32비트로 늘립니다.
+            dtype, shape_tail = np.uint8, (3,)
+        elif audio_format == _WAVE_FORMAT_IEEE_FLOAT and bits_per_sample == 32:
+            dtype = "<f4"
+        else:
+            raise ValueError(f"메모리맵으로 열 수 없는 WAV 형식입니다 (format={audio_format}, bits={bits_per_sample}).")
+        self._is_float = audio_format == _WAVE_FORMAT_IEEE_FLOAT
+
+        # 헤더의 데이터 크기가 비어 있거나(스트리밍으로 만든 파일) 실제보다 크면 파일 크기에 맞춥니다.
+        available = os.path.getsize(audio_path) - data_offset
+        if data_size <= 0 or data_size > available:
+            data_size = available
+        frame_size = self.channels * self.sample_width
+        self.n_frames = data_size // frame_size
+
+        self._frames = np.memmap(audio_path, dtype=dtype, mode="r", offset=data_offset,
+                                 shape=(self.n_frames, self.channels) + shape_tail)
+
+    @staticmethod
+    def _parse_header(f):
+        """(내부용) RIFF 청크를 따라가며 'fmt ' 정보와 'data' 청크의 위치/크기를 찾습니다."""
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError("WAV(RIFF) 파일이 아닙니다.")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("WAV 파일에서 data 청크를 찾을 수 없습니다.")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # 확장 형식은 실제 형식 코드가 SubFormat GUID의 앞 2바이트에 들어 있습니다.
+                    audio_format = struct.unpack("<H", body[24:26])[0]
+                fmt = (audio_format, channels, sample_rate, bits)
+                if chunk_size % 2:
+                    f.read(1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV 파일의 fmt 청크가 data 청크보다 뒤에 있습니다.")
+                return fmt, f.tell(), chunk_size
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    @property
+    def duration(self) -> float:
+        return self.n_frames / float(self.sample_rate)
+
+    def segment(self, start: float, end: float) -> np.ndarray:
+        """
+        [start, end) 구간(초)의 (프레임 수, 채널 수) 배열을 복사 없이 반환합니다.
+        (24비트 PCM은 (프레임 수, 채널 수, 3) 바이트 배열입니다. to_audio_segment로 넘기면 됩니다.)
+        """
+        start_frame = min(max(0, int(start * self.sample_rate)), self.n_frames)
+        end_frame = min(max(start_frame, int(end * self.sample_rate)), self.n_frames)
+        return self._frames[start_frame:end_frame]
+
+    def read_float32(self, start: float, end: float) -> np.ndarray:
+        """[start, end) 구간(초)을 -1.0 ~ 1.0 범위의 모노 float32 배열로 반환합니다. (이 구간만 복사됩니다.)"""
+        start_frame = min(max(0, int(start * self.sample_rate)), self.n_frames)
+        end_frame = min(max(start_frame, int(end * self.sample_rate)), self.n_frames)
+        return self.read_float32_frames(start_frame, end_frame)
+
+    def read_float32_frames(self, start_frame: int, end_frame: int) -> np.ndarray:
+        """read_float32와 같지만, 구간을 초 대신 프레임 번호로 받습니다."""
+        frames = self._frames[max(0, start_frame):min(end_frame, self.n_frames)]
+        if self._is_float:
+            samples = np.asarray(frames, dtype=np.float32)
+        elif self.sample_width == 3:
+            samples = _int24_to_int32(frames).astype(np.float32) / 2147483648.0
+        elif self.sample_width == 1:
+            samples = (frames.astype(np.float32) - 128.0) / 128.0
+        else:
+            samples = frames.astype(np.float32) / float(2 ** (8 * self.sample_width - 1))
+        return samples.mean(axis=1) if self.channels > 1 else samples[:, 0]
+
+    def to_audio_segment(self, frames: np.ndarray) -> AudioSegment:
+        """segment()로 꺼낸 구간을 업로드 직전에 pydub AudioSegment로 만듭니다."""
+        if self._is_float:
+            # pydub은 float PCM을 다루지 못하므로 16비트 정수로 바꿔서 넘깁니다.
+            pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype("<i2")
+            return AudioSegment(data=pcm.tobytes(), sample_width=2,
+                                frame_rate=self.sample_rate, channels=self.channels)
+        if self.sample_width == 3:
+            # 24비트는 32비트 정수로 늘려서 넘깁니다. (pydub이 24비트 파일을 읽을 때와 같은 방식)
+            return AudioSegment(data=_int24_to_int32(frames).tobytes(), sample_width=4,
+                                frame_rate=self.sample_rate, channels=self.channels)
+        if self.sample_width == 1:
+            # 8비트 WAV는 128을 0으로 쓰는 부호 없는 값이므로, pydub에 맡기지 않고 부호 있는 16비트로 직접 바꿉니다.
+            pcm = (frames.astype("<i2") - 128) << 8
+            return AudioSegment(data=pcm.tobytes(), sample_width=2,
+                                frame_rate=self.sample_rate, channels=self.channels)
+        return AudioSegment(data=np.ascontiguousarray(frames).tobytes(), sample_width=self.sample_width,
+                            frame_rate=self.sample_rate, channels=self.channels)
+
+    def close(self):
+        """메모리맵 참조를 놓습니다. (밖에서 들고 있는 구간이 모두 사라지면 운영체제가 매핑을 정리합니다.)"""
+        self._frames = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
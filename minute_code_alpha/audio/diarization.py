@@ -7,23 +7,418 @@
 """
 # -*- coding: utf-8 -*-
 import os
+import time
+import queue
 import logging
+import threading
+from contextlib import contextmanager
+
+import numpy as np
 import torch
 from pyannote.audio import Pipeline
+from pyannote.core import Annotation, Segment
 
 # '비밀 금고'에서 Pyannote 서비스에 접속하기 위한 비밀번호(토큰)를 가져옵니다.
 from ..config import get_api_key
+from ..settings import (
+    DIARIZATION_BACKEND,
+    DIARIZATION_MODEL,
+    DIARIZATION_POOL_SIZE,
+    DIARIZATION_WINDOWED_MIN_SEC,
+    DIARIZATION_WINDOW_SEC,
+    DIARIZATION_WINDOW_OVERLAP_SEC,
+    DIARIZATION_SPEAKER_MATCH_THRESHOLD
+)
+# '오디오 창고지기'에게서 긴 파일을 창 단위로 조금씩 받아옵니다.
+from .audio_source import get_wav_info, iter_wav_windows
+# 정확도보다 속도가 중요할 때 쓰는 '빠른 화자 분리 담당자'
+from .fast_diarization import diarize_audio_fast
+
+# 창 경계에서 맞닿은 구간을 같은 구간으로 볼 허용 오차(초)
+_BORDER_EPS = 1e-3
+
+
+class DiarizationEngine:
+    """
+    pyannote 화자 분리 파이프라인을 프로세스당 한 번만 불러와 계속 재사용하는 엔진입니다.
 
-def diarize_audio(audio_path: str):
+    모델을 불러오는 데 몇 초씩 걸리기 때문에, 한 번 불러온 파이프라인을 작은 풀(pool)에 넣어두고
+    회의가 들어올 때마다 꺼내 쓰고 다시 돌려놓습니다.
+    풀 크기만큼의 작업이 동시에 실행될 수 있고, 그 이상은 파이프라인이 반납될 때까지 기다립니다.
+    """
+
+    def __init__(self, model_name: str = DIARIZATION_MODEL, pool_size: int = DIARIZATION_POOL_SIZE):
+        self.model_name = model_name
+        self.pool_size = max(1, int(pool_size))
+        self._idle = queue.Queue()  # 쉬고 있는(반납된) 파이프라인들
+        self._created = 0           # 지금까지 만들어진 파이프라인 수
+        self._lock = threading.Lock()
+
+        # 모니터링용 통계
+        self.load_count = 0
+        self.load_seconds = 0.0
+        self.run_count = 0
+        self.reuse_count = 0
+
+    def _load_pipeline(self):
+        """(내부용) 미리 학습된 화자 분리 모델을 불러와 사용할 장치에 올립니다."""
+        token = get_api_key("PYANNOTE_TOKEN")
+        if not token:
+            raise RuntimeError("PYANNOTE_TOKEN이 없어 화자 분리 모델을 불러올 수 없습니다.")
+
+        # 컴퓨터에 GPU(그래픽카드)가 있으면 GPU를 쓰고, 없으면 CPU를 사용합니다.
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        logging.info(f"Pyannote: '{self.model_name}' 모델을 '{device}' 장치에 불러옵니다...")
+
+        start_time = time.perf_counter()
+        pipeline = Pipeline.from_pretrained(self.model_name, use_auth_token=token)
+        if pipeline is None:
+            raise RuntimeError(f"'{self.model_name}' 모델을 불러오지 못했습니다. 토큰과 라이선스 동의 여부를 확인하세요.")
+        pipeline.to(device)
+        elapsed = time.perf_counter() - start_time
+
+        with self._lock:
+            self.load_count += 1
+            self.load_seconds += elapsed
+        logging.info(f"Pyannote: 모델 로딩 완료 ({elapsed:.2f}초)")
+        return pipeline
+
+    def _checkout(self):
+        """(내부용) 쉬고 있는 파이프라인을 꺼내거나, 풀에 여유가 있으면 새로 만듭니다."""
+        reused = True
+        try:
+            pipeline = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    pipeline = self._load_pipeline()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                reused = False
+            else:
+                # 풀이 가득 찼으면 다른 작업이 파이프라인을 반납할 때까지 기다립니다.
+                pipeline = self._idle.get()
+
+        with self._lock:
+            self.run_count += 1
+            if reused:
+                self.reuse_count += 1
+        return pipeline
+
+    @contextmanager
+    def acquire(self):
+        """파이프라인 하나를 빌려주고, with 블록이 끝나면 자동으로 풀에 반납합니다."""
+        pipeline = self._checkout()
+        try:
+            yield pipeline
+        finally:
+            self._idle.put(pipeline)
+
+    def warm_up(self):
+        """첫 요청이 오기 전에 파이프라인 하나를 미리 불러와 둡니다."""
+        with self._lock:
+            already_loaded = self._created > 0
+        if already_loaded:
+            return
+        with self.acquire():
+            pass
+        with self._lock:
+            # 미리 불러오기는 실제 실행이 아니므로 통계에서 제외합니다.
+            self.run_count -= 1
+
+    def run(self, audio, **kwargs):
+        """빌려온 파이프라인으로 화자 분리를 실행합니다. (audio: 파일 경로 또는 waveform 딕셔너리)"""
+        with self.acquire() as pipeline:
+            return pipeline(audio, **kwargs)
+
+    def stats(self) -> dict:
+        """모델 로딩 시간과 재사용 횟수 등 엔진의 현재 상태를 반환합니다."""
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "pool_size": self.pool_size,
+                "loaded_pipelines": self._created,
+                "load_count": self.load_count,
+                "load_seconds": round(self.load_seconds, 3),
+                "run_count": self.run_count,
+                "reuse_count": self.reuse_count,
+            }
+
+
+_engine = None  # 화자 분리 엔진이 프로세스당 한 번만 만들어지도록 저장해두는 변수
+_engine_lock = threading.Lock()
+
+def get_diarization_engine() -> DiarizationEngine:
+    """화자 분리 엔진을 생성하거나 이미 생성된 엔진을 반환합니다."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = DiarizationEngine()
+    return _engine
+
+
+class _SpeakerStitcher:
+    """
+    (내부용) 창마다 따로 붙은 화자 이름(SPEAKER_00 등)을 회의 전체 기준의 이름으로 맞춰줍니다.
+    각 창의 화자 임베딩을 지금까지 모인 화자별 평균 임베딩(centroid)과 코사인 유사도로 비교하고,
+    임베딩을 쓸 수 없는 화자는 이전 창과 겹치는 구간에서 가장 오래 겹친 화자로 이어붙입니다.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.labels = []   # 회의 전체 기준 화자 이름
+        self._sums = []    # 화자별 (정규화된) 임베딩의 합
+        self._counts = []  # 화자별 누적된 임베딩 개수
+
+    def _new_label(self, embedding) -> str:
+        label = f"SPEAKER_{len(self.labels):02d}"
+        self.labels.append(label)
+        self._sums.append(embedding.copy() if embedding is not None else None)
+        self._counts.append(1 if embedding is not None else 0)
+        return label
+
+    def _update(self, index: int, embedding):
+        if embedding is None:
+            return
+        if self._sums[index] is None:
+            self._sums[index] = embedding.copy()
+            self._counts[index] = 1
+        else:
+            self._sums[index] += embedding
+            self._counts[index] += 1
+
+    def assign(self, local_labels, embeddings, overlap_votes: dict) -> dict:
+        """
+        창 안의 화자 이름을 전체 기준 이름으로 바꾸는 매핑을 만듭니다.
+
+        Args:
+            local_labels (list): 창 안의 화자 이름 목록 (embeddings의 행 순서와 같음).
+            embeddings (np.ndarray): (화자 수, 차원) 크기의 화자 임베딩. NaN이 있는 행은 사용하지 않습니다.
+            overlap_votes (dict): {창 안의 화자: {전체 기준 화자: 겹친 시간(초)}}
+
+        Returns:
+            dict: {창 안의 화자 이름: 전체 기준 화자 이름}
+        """
+        normalized = [None] * len(local_labels)
+        if embeddings is not None:
+            for i in range(min(len(local_labels), len(embeddings))):
+                vector = np.asarray(embeddings[i], dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                if np.all(np.isfinite(vector)) and norm > 0:
+                    normalized[i] = vector / norm
+
+        mapping = {}
+        used = set()
+
+        # 1. 화자 임베딩 유사도가 높은 순서대로 한 명씩 짝을 지어줍니다. (한 창 안에서 1:1 매칭)
+        known = [j for j, total in enumerate(self._sums) if total is not None]
+        valid = [i for i, vector in enumerate(normalized) if vector is not None]
+        if known and valid:
+            centroids = self._centroids_for(known)
+            similarity = np.stack([normalized[i] for i in valid]) @ centroids.T
+            order = np.dstack(np.unravel_index(np.argsort(-similarity, axis=None), similarity.shape))[0]
+            for row, col in order:
+                if similarity[row, col] < self.threshold:
+                    break
+                i, j = valid[row], known[col]
+                if local_labels[i] in mapping or j in used:
+                    continue
+                mapping[local_labels[i]] = self.labels[j]
+                used.add(j)
+                self._update(j, normalized[i])
+
+        # 2. 임베딩으로 찾지 못한 화자는 이전 창과 겹치는 구간에서 함께 말한 시간이 가장 긴 화자로 이어붙입니다.
+        for i, label in enumerate(local_labels):
+            if label in mapping:
+                continue
+            votes = overlap_votes.get(label, {})
+            for global_label, _ in sorted(votes.items(), key=lambda item: -item[1]):
+                j = self.labels.index(global_label)
+                if j not in used:
+                    mapping[label] = global_label
+                    used.add(j)
+                    self._update(j, normalized[i])
+                    break
+
+        # 3. 그래도 짝이 없으면 처음 등장한 화자로 등록합니다.
+        for i, label in enumerate(local_labels):
+            if label not in mapping:
+                mapping[label] = self._new_label(normalized[i])
+                used.add(len(self.labels) - 1)
+        return mapping
+
+    def centroids(self) -> dict:
+        """화자별 평균 임베딩 {전체 기준 화자 이름: 정규화된 벡터}. (임베딩이 없는 화자는 빠집니다.)"""
+        known = [j for j, total in enumerate(self._sums) if total is not None]
+        if not known:
+            return {}
+        return dict(zip([self.labels[j] for j in known], self._centroids_for(known)))
+
+    def _centroids_for(self, indices) -> np.ndarray:
+        centroids = np.stack([self._sums[j] / self._counts[j] for j in indices])
+        return centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+
+def _overlap_votes(local_turns, previous_turns) -> dict:
+    """(내부용) 창 안의 화자별로, 이전 창의 어떤 화자와 몇 초나 겹쳤는지 셉니다."""
+    votes = {}
+    for start, end, label in local_turns:
+        for prev_start, prev_end, prev_label in previous_turns:
+            overlap = min(end, prev_end) - max(start, prev_start)
+            if overlap > 0:
+                label_votes = votes.setdefault(label, {})
+                label_votes[prev_label] = label_votes.get(prev_label, 0.0) + overlap
+    return votes
+
+def iter_windowed_diarization(audio_path: str,
+                              window_sec: float = DIARIZATION_WINDOW_SEC,
+                              overlap_sec: float = DIARIZATION_WINDOW_OVERLAP_SEC,
+                              match_threshold: float = DIARIZATION_SPEAKER_MATCH_THRESHOLD,
+                              embeddings_out: dict = None):
+    """
+    긴 오디오 파일을 겹치는 창 단위로 디스크에서 읽어가며 화자를 분리합니다.
+    창마다 끝난 발화 구간(turn)을 바로바로 넘겨주므로, 파일 길이와 상관없이 메모리 사용량이 일정합니다.
+
+    각 창은 겹침 구간의 절반씩을 이웃 창에 양보한 '자기 구역'의 발화만 내보내고,
+    창 경계에서 잘린 같은 화자의 발화는 다시 하나로 이어붙입니다.
+
+    embeddings_out에 딕셔너리를 넘기면, 모든 창을 처리한 뒤 화자별 평균 임베딩을 채워줍니다.
+
+    Yields:
+        list: 창 하나에서 확정된 (start, end, speaker) 발화 구간 목록 (시간순).
+    """
+    engine = get_diarization_engine()
+    stitcher = _SpeakerStitcher(match_threshold)
+    duration = get_wav_info(audio_path)["duration"]
+    half_overlap = overlap_sec / 2.0
+
+    previous_turns = []  # 이전 창의 (전체 기준 이름이 붙은) 발화 구간. 겹침 구간 투표에 사용합니다.
+    carried = []         # 창 오른쪽 경계에 걸쳐 있어 다음 창과 이어붙여야 할 발화 구간
+
+    for window_start, window_end, samples, sample_rate in iter_wav_windows(audio_path, window_sec, overlap_sec):
+        is_first = window_start <= 0.0
+        is_last = window_end >= duration - _BORDER_EPS
+        logging.info(f"창 단위 화자 분리: {window_start:.0f}s ~ {window_end:.0f}s / {duration:.0f}s")
+
+        waveform = torch.from_numpy(np.ascontiguousarray(samples)).unsqueeze(0)
+        local_annotation, embeddings = engine.run(
+            {"waveform": waveform, "sample_rate": sample_rate}, return_embeddings=True
+        )
+        local_turns = [
+            (window_start + turn.start, window_start + turn.end, label)
+            for turn, _, label in local_annotation.itertracks(yield_label=True)
+        ]
+
+        votes = _overlap_votes(local_turns, previous_turns)
+        mapping = stitcher.assign(local_annotation.labels(), embeddings, votes)
+        global_turns = [(start, end, mapping[label]) for start, end, label in local_turns]
+        previous_turns = global_turns
+
+        # 창의 '자기 구역'만 남깁니다.
+        owned_start = window_start if is_first else window_start + half_overlap
+        owned_end = window_end if is_last else window_end - half_overlap
+        owned = sorted(
+            [max(start, owned_start), min(end, owned_end), label]
+            for start, end, label in global_turns
+            if min(end, owned_end) - max(start, owned_start) > 0
+        )
+
+        # 이전 창 경계에서 잘린 같은 화자의 발화를 이어붙입니다.
+        finished = []
+        for carried_start, carried_end, carried_label in carried:
+            continuation = next(
+                (turn for turn in owned
+                 if turn[2] == carried_label and turn[0] <= owned_start + _BORDER_EPS),
+                None
+            )
+            if continuation:
+                continuation[0] = carried_start
+            else:
+                finished.append([carried_start, carried_end, carried_label])
+
+        carried = []
+        for turn in owned:
+            if not is_last and turn[1] >= owned_end - _BORDER_EPS:
+                carried.append(turn)
+            else:
+                finished.append(turn)
+
+        # 이전 창에서 넘어온 발화가 섞였을 수 있으므로 다시 시간순으로 정렬해서 내보냅니다.
+        yield [tuple(turn) for turn in sorted(finished)]
+
+    if carried:
+        yield [tuple(turn) for turn in sorted(carried)]
+    if embeddings_out is not None:
+        embeddings_out.update(stitcher.centroids())
+
+def _embeddings_by_label(labels, embeddings) -> dict:
+    """(내부용) labels() 순서의 임베딩 행렬을 {화자 이름: 정규화된 벡터}로 바꿉니다. (NaN 행은 빠집니다.)"""
+    result = {}
+    if embeddings is None:
+        return result
+    for label, vector in zip(labels, np.asarray(embeddings, dtype=np.float32)):
+        norm = np.linalg.norm(vector)
+        if np.all(np.isfinite(vector)) and norm > 0:
+            result[label] = vector / norm
+    return result
+
+def annotation_to_turns(annotation) -> list:
+    """pyannote Annotation을 JSON으로 저장하기 쉬운 [start, end, speaker] 목록으로 바꿉니다. (시간순)"""
+    return [
+        [float(turn.start), float(turn.end), str(speaker)]
+        for turn, _, speaker in annotation.itertracks(yield_label=True)
+    ]
+
+def diarize_audio_windowed(audio_path: str, embeddings_out: dict = None, **kwargs):
+    """
+    창 단위 화자 분리 결과를 모아 diarize_audio와 같은 Annotation 형식으로 반환합니다.
+
+    Returns:
+        pyannote.core.Annotation: 화자 분리 결과.
+    """
+    annotation = Annotation(uri=os.path.splitext(os.path.basename(audio_path))[0])
+    track = 0
+    for turns in iter_windowed_diarization(audio_path, embeddings_out=embeddings_out, **kwargs):
+        for start, end, speaker in turns:
+            annotation[Segment(start, end), track] = speaker
+            track += 1
+    return annotation
+
+def diarize_audio(audio_path: str, windowed: bool = None, backend: str = DIARIZATION_BACKEND,
+                  return_embeddings: bool = False):
     """
     pyannote.audio를 사용하여 오디오 파일의 화자를 분리합니다.
-    
+
     Args:
         audio_path (str): 화자를 분리할 오디오 파일의 전체 경로.
+        windowed (bool, optional): 창 단위 모드 사용 여부.
+            None이면 녹음 길이가 DIARIZATION_WINDOWED_MIN_SEC 이상일 때 자동으로 사용합니다.
+        backend (str): 화자 분리 방식 ("pyannote" 또는 numpy로 빠르게 처리하는 "fast").
+        return_embeddings (bool): True면 화자별 임베딩 {화자 이름: 벡터}도 함께 반환합니다.
 
     Returns:
         pyannote.core.Annotation: 화자 분리 결과. 실패 시 None.
+        (return_embeddings=True면 (Annotation, 화자별 임베딩 딕셔너리) 튜플, 실패 시 None)
     """
+    if backend == "fast":
+        if not return_embeddings:
+            return diarize_audio_fast(audio_path)
+        result = diarize_audio_fast(audio_path, return_embeddings=True)
+        if result is None:
+            return None
+        annotation, embeddings = result
+        return annotation, _embeddings_by_label(annotation.labels(), embeddings)
+    if backend != "pyannote":
+        logging.error(f"지원하지 않는 화자 분리 방식입니다: {backend}")
+        return None
+
     token = get_api_key("PYANNOTE_TOKEN")
     if not token:
         logging.error("PYANNOTE_TOKEN이 없어 화자 분리를 진행할 수 없습니다.")
@@ -31,21 +426,25 @@ def diarize_audio(audio_path: str):
     if not os.path.exists(audio_path):
         logging.error(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
         return None
-    
+
     logging.info(f"오디오 파일({audio_path})에 대한 화자 분리를 시작합니다...")
     try:
-        # 컴퓨터에 GPU(그래픽카드)가 있으면 GPU를 쓰고, 없으면 CPU를 사용합니다.
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logging.info(f"Pyannote: 사용 장치를 '{device}'(으)로 설정합니다.")
-
-        # 미리 학습된 화자 분리 모델을 불러옵니다.
-        pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", use_auth_token=token)
-        pipeline.to(device)
+        if windowed is None:
+            windowed = get_wav_info(audio_path)["duration"] >= DIARIZATION_WINDOWED_MIN_SEC
 
-        # 오디오 파일에 파이프라인을 실행하여 화자를 분리합니다.
-        diarization = pipeline(audio_path)
-        logging.info("화자 분리 완료.")
-        return diarization
+        engine = get_diarization_engine()
+        speaker_embeddings = {}
+        if windowed:
+            # 긴 녹음은 창 단위로 디스크에서 조금씩 읽어가며 처리합니다.
+            diarization = diarize_audio_windowed(audio_path, embeddings_out=speaker_embeddings)
+        elif return_embeddings:
+            # 미리 불러와 둔 파이프라인을 빌려서 화자를 분리합니다.
+            diarization, embeddings = engine.run(audio_path, return_embeddings=True)
+            speaker_embeddings = _embeddings_by_label(diarization.labels(), embeddings)
+        else:
+            diarization = engine.run(audio_path)
+        logging.info(f"화자 분리 완료. (엔진 상태: {engine.stats()})")
+        return (diarization, speaker_embeddings) if return_embeddings else diarization
     except Exception as e:
         logging.error(f"화자 분리 중 오류 발생: {e}")
         return None
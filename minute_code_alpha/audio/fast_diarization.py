@@ -0,0 +1,241 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '빠른 화자 분리 담당자'의 역할을 합니다.
+pyannote는 정확하지만 CPU에서는 가장 느린 단계예요. 2~3명이 짧게 모이는 회의처럼
+그 정도 정확도가 필요 없을 때는, 이 담당자가 numpy만으로 훨씬 빠르게 화자를 나눠줍니다.
+
+1. 소리 크기(VAD)로 말소리 구간을 찾아 짧은 조각으로 자르고,
+2. 조각마다 목소리 특징(로그 멜 스펙트럼의 평균/표준편차)을 작은 벡터로 만든 뒤,
+3. 비슷한 조각끼리 묶어서(병합 군집화) 같은 사람으로 봅니다.
+결과는 diarize_audio와 같은 pyannote Annotation 형식이라 다음 단계는 그대로 쓸 수 있습니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import logging
+
+import numpy as np
+from pyannote.core import Annotation, Segment
+
+from ..settings import (
+    FAST_DIARIZATION_SEGMENT_SEC,
+    FAST_DIARIZATION_MIN_SEGMENT_SEC,
+    FAST_DIARIZATION_THRESHOLD,
+    FAST_DIARIZATION_MAX_SPEAKERS,
+    FAST_DIARIZATION_N_MELS
+)
+from .audio_source import WavAudioSource
+from .vad import compute_speech_mask, _speech_runs
+
+# 특징 추출용 프레임 길이/간격 (초)
+_FRAME_SEC = 0.025
+_HOP_SEC = 0.010
+
+
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """(내부용) 삼각형 멜 필터 뱅크 행렬 (n_mels, n_fft // 2 + 1)을 만듭니다."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(60.0), hz_to_mel(min(8000.0, sample_rate / 2.0)), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / float(center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / float(right - center)
+    return filters
+
+def log_mel_frames(samples: np.ndarray, sample_rate: int, filters: np.ndarray, n_fft: int) -> np.ndarray:
+    """모노 샘플 배열의 프레임별 로그 멜 에너지 (프레임 수, n_mels)를 계산합니다."""
+    frame_length = int(round(_FRAME_SEC * sample_rate))
+    hop_length = int(round(_HOP_SEC * sample_rate))
+    if len(samples) < frame_length:
+        return np.empty((0, filters.shape[0]), dtype=np.float32)
+
+    # 프레임을 복사 없이 겹쳐 자른 뒤, 한 번의 FFT로 모든 프레임을 처리합니다.
+    n_frames = 1 + (len(samples) - frame_length) // hop_length
+    frames = np.lib.stride_tricks.as_strided(
+        samples, shape=(n_frames, frame_length),
+        strides=(samples.strides[0] * hop_length, samples.strides[0])
+    )
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_length).astype(np.float32), n=n_fft)) ** 2
+    return np.log(spectrum @ filters.T + 1e-6).astype(np.float32)
+
+def _split_speech(mask: np.ndarray, frame_sec: float, segment_sec: float, min_segment_sec: float) -> list:
+    """(내부용) 말소리 구간을 segment_sec 길이의 조각으로 자릅니다. 너무 짧은 꼬리는 앞 조각에 붙입니다."""
+    run_starts, run_ends = _speech_runs(mask)
+    pieces = []
+    for run_start, run_end in zip(run_starts * frame_sec, run_ends * frame_sec):
+        if run_end - run_start < min_segment_sec:
+            continue
+        bounds = list(np.arange(run_start, run_end, segment_sec)) + [run_end]
+        if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_segment_sec:
+            del bounds[-2]
+        pieces.extend((float(s), float(e)) for s, e in zip(bounds[:-1], bounds[1:]))
+    return pieces
+
+def extract_features(source, pieces: list, n_mels: int = FAST_DIARIZATION_N_MELS) -> np.ndarray:
+    """
+    조각마다 로그 멜 에너지의 평균과 표준편차를 이어 붙인 특징 벡터를 만듭니다. (정규화 전)
+
+    Returns:
+        np.ndarray: (조각 수, 2 * n_mels) 특징 행렬.
+    """
+    n_fft = 1 << int(np.ceil(np.log2(_FRAME_SEC * source.sample_rate)))
+    filters = _mel_filterbank(source.sample_rate, n_fft, n_mels)
+    features = np.zeros((len(pieces), 2 * n_mels), dtype=np.float32)
+    for index, (start, end) in enumerate(pieces):
+        frames = log_mel_frames(source.read_float32(start, end), source.sample_rate, filters, n_fft)
+        if len(frames):
+            features[index] = np.concatenate([frames.mean(axis=0), frames.std(axis=0)])
+    return features
+
+def normalize_within_meeting(features: np.ndarray) -> np.ndarray:
+    """
+    회의 안에서 화자를 나누기 위한 정규화입니다.
+    녹음 환경의 영향을 줄이기 위해 회의 전체 평균/표준편차로 정규화하고 길이를 1로 맞춥니다.
+    결과가 그 회의에 누가 나왔는지에 따라 달라지므로, 다른 회의와 비교하는 데(화자 명부) 쓰면 안 됩니다.
+    """
+    embeddings = features.astype(np.float32, copy=True)
+    if len(embeddings):
+        embeddings -= embeddings.mean(axis=0)
+        embeddings /= embeddings.std() + 1e-6
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+    return embeddings
+
+def normalize_fixed(features: np.ndarray) -> np.ndarray:
+    """
+    회의와 상관없이 벡터 하나만 보고 하는 정규화입니다. (화자 명부용)
+    평균 로그 멜 에너지에서 그 벡터의 평균을 빼서 녹음 음량(게인)의 영향만 없애고, 길이를 1로 맞춥니다.
+    """
+    embeddings = np.atleast_2d(features).astype(np.float32, copy=True)
+    n_mels = embeddings.shape[1] // 2
+    embeddings[:, :n_mels] -= embeddings[:, :n_mels].mean(axis=1, keepdims=True)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+    return embeddings
+
+def extract_embeddings(source, pieces: list, n_mels: int = FAST_DIARIZATION_N_MELS) -> np.ndarray:
+    """
+    조각마다 회의 안에서 정규화된 목소리 특징 벡터를 만듭니다. (extract_features + normalize_within_meeting)
+
+    Returns:
+        np.ndarray: (조각 수, 2 * n_mels) 특징 행렬.
+    """
+    return normalize_within_meeting(extract_features(source, pieces, n_mels))
+
+def agglomerative_cluster(embeddings: np.ndarray, threshold: float = FAST_DIARIZATION_THRESHOLD,
+                          max_clusters: int = FAST_DIARIZATION_MAX_SPEAKERS, num_clusters: int = None) -> np.ndarray:
+    """
+    코사인 유사도 평균 연결(average linkage) 병합 군집화.
+    가장 비슷한 두 묶음을 합치는 것을, 유사도가 threshold보다 낮아질 때까지 반복합니다.
+    (num_clusters를 주면 그 개수가 될 때까지, max_clusters를 넘으면 넘지 않을 때까지 계속 합칩니다.)
+
+    행마다 '가장 비슷한 상대'를 기억해 두고 합쳐진 행만 다시 계산하므로, 한 번 합칠 때 O(n)만 듭니다.
+
+    Returns:
+        np.ndarray: 조각별 묶음 번호 (0부터, 처음 등장한 순서).
+    """
+    n = len(embeddings)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    similarity = (embeddings @ embeddings.T).astype(np.float64)
+    np.fill_diagonal(similarity, -np.inf)
+    sizes = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    parent = np.arange(n)
+    best_index = np.argmax(similarity, axis=1)
+    best_value = similarity[np.arange(n), best_index]
+    n_clusters = n
+
+    while n_clusters > 1:
+        i = int(np.argmax(best_value))
+        j = int(best_index[i])
+        if num_clusters is not None:
+            if n_clusters <= num_clusters:
+                break
+        elif best_value[i] < threshold and n_clusters <= max_clusters:
+            break
+
+        # j를 i에 합치고, i와 다른 묶음 사이의 유사도를 크기 가중 평균으로 갱신합니다.
+        merged = (sizes[i] * similarity[i] + sizes[j] * similarity[j]) / (sizes[i] + sizes[j])
+        merged[~active] = -np.inf
+        merged[i] = merged[j] = -np.inf
+        similarity[i, :] = merged
+        similarity[:, i] = merged
+        similarity[j, :] = -np.inf
+        similarity[:, j] = -np.inf
+        sizes[i] += sizes[j]
+        active[j] = False
+        parent[parent == j] = i
+        best_value[j] = -np.inf
+        n_clusters -= 1
+
+        # 가장 비슷한 상대가 i나 j였던 행은 다시 찾고, 나머지는 새 i와만 비교합니다.
+        stale = active & ((best_index == i) | (best_index == j))
+        stale[i] = True
+        rows = np.flatnonzero(stale)
+        best_index[rows] = np.argmax(similarity[rows], axis=1)
+        best_value[rows] = similarity[rows, best_index[rows]]
+        better = active & ~stale & (merged > best_value)
+        best_index[better] = i
+        best_value[better] = merged[better]
+
+    _, labels = np.unique(parent, return_inverse=True)
+    # 처음 등장한 순서대로 번호를 다시 매깁니다.
+    order = {label: rank for rank, label in enumerate(dict.fromkeys(labels.tolist()))}
+    return np.array([order[label] for label in labels.tolist()], dtype=int)
+
+def diarize_audio_fast(audio_path: str, num_speakers: int = None, return_embeddings: bool = False):
+    """
+    numpy만으로 빠르게 화자를 분리합니다. (diarize_audio와 같은 Annotation 형식)
+
+    Args:
+        audio_path (str): 화자를 분리할 WAV 파일 경로.
+        num_speakers (int, optional): 화자 수를 알고 있으면 그 수로 묶습니다.
+        return_embeddings (bool): True면 화자 명부용 화자별 특징 벡터도 함께 반환합니다.
+            (회의마다 달라지는 정규화 대신 normalize_fixed를 써서 다른 회의와 비교할 수 있습니다.)
+
+    Returns:
+        pyannote.core.Annotation: 화자 분리 결과. 실패 시 None.
+        (return_embeddings=True면 (Annotation, labels() 순서의 (화자 수, 차원) 특징 행렬) 튜플)
+    """
+    if not os.path.exists(audio_path):
+        logging.error(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
+        return None
+
+    logging.info(f"오디오 파일({audio_path})에 대한 빠른 화자 분리를 시작합니다...")
+    try:
+        with WavAudioSource(audio_path) as source:
+            speech_mask, frame_sec = compute_speech_mask(source)
+            pieces = _split_speech(speech_mask, frame_sec, FAST_DIARIZATION_SEGMENT_SEC,
+                                   FAST_DIARIZATION_MIN_SEGMENT_SEC)
+            features = extract_features(source, pieces)
+        labels = agglomerative_cluster(normalize_within_meeting(features), num_clusters=num_speakers)
+    except Exception as e:
+        logging.error(f"빠른 화자 분리 중 오류 발생: {e}")
+        return None
+
+    # 바로 이어지는 같은 화자의 조각은 하나의 발화로 합칩니다.
+    turns = []
+    for (start, end), label in zip(pieces, labels.tolist()):
+        if turns and turns[-1][2] == label and start - turns[-1][1] < 1e-3:
+            turns[-1][1] = end
+        else:
+            turns.append([start, end, label])
+
+    annotation = Annotation(uri=os.path.splitext(os.path.basename(audio_path))[0])
+    for track, (start, end, label) in enumerate(turns):
+        annotation[Segment(start, end), track] = f"SPEAKER_{label:02d}"
+
+    n_speakers = int(labels.max()) + 1 if len(labels) else 0
+    logging.info(f"빠른 화자 분리 완료. (조각 {len(pieces)}개, 화자 {n_speakers}명)")
+    if not return_embeddings:
+        return annotation
+
+    centroids = [features[labels == int(label.split("_")[-1])].mean(axis=0) for label in annotation.labels()]
+    return annotation, normalize_fixed(np.array(centroids, dtype=np.float32))
@@ -0,0 +1,103 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '파일 접수 담당자'의 역할을 합니다.
+사용자가 올린 음성/영상 파일을 통째로 메모리에 풀어놓지 않고,
+ffmpeg에게 "16kHz 모노 소리만 뽑아서 조금씩 넘겨줘" 하고 부탁한 뒤
+받는 족족 WAV 파일로 디스크에 써 내려갑니다.
+그래서 큰 영상 파일도 메모리를 거의 쓰지 않고, 화자 분리/STT가 실제로 쓰는 형식으로 한 번에 맞춰집니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import wave
+import logging
+import tempfile
+import subprocess
+
+from ..settings import STT_UPLOAD_SAMPLE_RATE
+
+# ffmpeg 출력에서 한 번에 읽어 디스크에 쓸 크기 (바이트)
+_CHUNK_BYTES = 1024 * 1024
+# 변환 실패 시 오류 메시지에 담을 ffmpeg 오류 출력의 최대 길이 (바이트, 끝부분만)
+_STDERR_TAIL_BYTES = 4096
+_SAMPLE_WIDTH = 2 # 16비트 PCM
+
+
+def probe_duration(path: str) -> float:
+    """ffprobe로 파일 길이(초)를 알아냅니다. 알 수 없으면 None을 반환합니다."""
+    command = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+    ]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        return float(result.stdout.decode("utf-8", errors="ignore").strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+def convert_to_wav(input_path: str, wav_path: str, sample_rate: int = STT_UPLOAD_SAMPLE_RATE,
+                   progress_callback=None) -> str:
+    """
+    음성/영상 파일을 ffmpeg 파이프로 흘려보내며 모노/지정 샘플레이트의 16비트 WAV로 저장합니다.
+    임시 파일에 다 쓴 뒤 이름을 바꾸기 때문에, 중간에 실패해도 반쯤 쓰인 WAV가 남지 않습니다.
+
+    Args:
+        input_path (str): 원본 파일 경로 (ffmpeg가 읽을 수 있는 모든 형식).
+        wav_path (str): 저장할 WAV 파일 경로.
+        sample_rate (int): 저장할 샘플레이트 (기본값: 16000).
+        progress_callback (callable, optional): 0~1 사이 진행률을 받는 함수.
+
+    Returns:
+        str: 저장된 WAV 파일 경로.
+    """
+    duration = probe_duration(input_path)
+    expected_bytes = int(duration * sample_rate) * _SAMPLE_WIDTH if duration else 0
+
+    command = [
+        "ffmpeg", "-loglevel", "error", "-nostdin",
+        "-i", input_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "s16le", "pipe:1",
+    ]
+    temp_path = f"{wav_path}.part"
+    written = 0
+    # ffmpeg 오류 출력은 파이프 대신 임시 파일로 받습니다.
+    # (손상된 파일은 패킷마다 오류를 쏟아낼 수 있는데, 파이프 버퍼가 차면 ffmpeg가 멈춰버립니다.)
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+    try:
+        with wave.open(temp_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(_SAMPLE_WIDTH)
+            wf.setframerate(sample_rate)
+            while True:
+                chunk = process.stdout.read(_CHUNK_BYTES)
+                if not chunk:
+                    break
+                wf.writeframes(chunk)
+                written += len(chunk)
+                if progress_callback and expected_bytes:
+                    progress_callback(min(1.0, written / expected_bytes))
+
+        if process.wait() != 0:
+            stderr_file.seek(max(0, stderr_file.seek(0, os.SEEK_END) - _STDERR_TAIL_BYTES))
+            stderr = stderr_file.read().decode("utf-8", errors="ignore").strip()
+            raise RuntimeError(f"ffmpeg 변환 실패: {stderr}")
+        if written == 0:
+            raise RuntimeError("파일에서 오디오를 찾을 수 없습니다.")
+        os.replace(temp_path, wav_path)
+    except BaseException:
+        process.kill()
+        process.wait()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        process.stdout.close()
+        stderr_file.close()
+
+    if progress_callback:
+        progress_callback(1.0)
+    logging.info(f"오디오 변환 완료: {wav_path} ({written / _SAMPLE_WIDTH / sample_rate:.1f}초, {sample_rate}Hz 모노)")
+    return wav_path
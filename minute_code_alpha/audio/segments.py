@@ -0,0 +1,87 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '구간 정리 담당자'의 역할을 합니다.
+화자 분리 결과에는 같은 사람이 잠깐 숨을 쉬었다가 이어 말한 구간이나, "네", "아" 같은 아주 짧은 구간이 잔뜩 있어요.
+이런 조각들을 하나하나 STT에 보내면 요청이 수백 개가 되니까,
+이 담당자가 보내기 전에 같은 화자끼리 적당한 길이로 묶고, 짧은 조각은 이웃 구간에 붙여줍니다.
+"""
+# -*- coding: utf-8 -*-
+from ..settings import STT_PACK_MAX_SEC, STT_PACK_MIN_SEC, STT_PACK_MAX_GAP_SEC
+
+
+def _gap(a: dict, b: dict) -> float:
+    """(내부용) 두 구간 사이의 빈 시간(초). 겹치면 0입니다."""
+    return max(0.0, max(a['start'], b['start']) - min(a['end'], b['end']))
+
+def _span(a: dict, b: dict) -> float:
+    """(내부용) 두 구간을 합쳤을 때의 길이(초)."""
+    return max(a['end'], b['end']) - min(a['start'], b['start'])
+
+def _merge_same_speaker(segments, max_duration: float, max_gap: float) -> list:
+    """(내부용) 시간순으로 이어지는 같은 화자의 구간을 길이 제한 안에서 하나로 합칩니다."""
+    merged = []
+    for seg in segments:
+        if merged:
+            last = merged[-1]
+            if (last['speaker'] == seg['speaker']
+                    and seg['start'] - last['end'] <= max_gap
+                    and _span(last, seg) <= max_duration):
+                last['end'] = max(last['end'], seg['end'])
+                continue
+        merged.append(dict(seg))
+    return merged
+
+def pack_turns(turns, max_duration: float = STT_PACK_MAX_SEC, min_duration: float = STT_PACK_MIN_SEC,
+               max_gap: float = STT_PACK_MAX_GAP_SEC) -> list:
+    """
+    화자 분리 구간들을 STT 요청 단위로 묶습니다.
+
+    1. 시간순으로 이어지는 같은 화자의 구간은 간격이 max_gap 이하이고 합친 길이가 max_duration 이하이면 하나로 합칩니다.
+    2. min_duration보다 짧은 구간은 버리지 않고 앞/뒤 이웃 중 하나에 붙입니다. (같은 화자, 가까운 이웃 우선)
+    3. 붙일 이웃이 없는 짧은 구간은 앞뒤로 조금 넓혀서 혼자 보냅니다.
+
+    Args:
+        turns (list): [start, end, speaker] 목록.
+
+    Returns:
+        list: {'start', 'end', 'speaker'} 딕셔너리 목록 (시간순).
+    """
+    ordered = sorted(({'start': float(s), 'end': float(e), 'speaker': spk} for s, e, spk in turns),
+                     key=lambda seg: (seg['start'], seg['end']))
+
+    # 1. 같은 화자의 이웃 구간 합치기
+    packed = _merge_same_speaker(ordered, max_duration, max_gap)
+
+    # 2. 짧은 구간을 이웃에 붙이기
+    i = 0
+    while i < len(packed):
+        seg = packed[i]
+        if seg['end'] - seg['start'] >= min_duration:
+            i += 1
+            continue
+
+        best = None
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(packed):
+                neighbour = packed[j]
+                if _gap(seg, neighbour) <= max_gap and _span(seg, neighbour) <= max_duration:
+                    score = (neighbour['speaker'] != seg['speaker'], _gap(seg, neighbour))
+                    if best is None or score < best[0]:
+                        best = (score, j)
+
+        if best is None:
+            # 3. 붙일 곳이 없으면 Whisper가 알아들을 수 있도록 앞뒤로 넓혀서 혼자 보냅니다.
+            pad = (min_duration - (seg['end'] - seg['start'])) / 2.0
+            seg['start'] = max(0.0, seg['start'] - pad)
+            seg['end'] = seg['end'] + pad
+            i += 1
+            continue
+
+        neighbour = packed[best[1]]
+        neighbour['start'] = min(neighbour['start'], seg['start'])
+        neighbour['end'] = max(neighbour['end'], seg['end'])
+        del packed[i]
+        # 앞 구간에 붙였다면 i는 이제 다음 구간을, 뒤 구간에 붙였다면 넓어진 뒤 구간을 가리킵니다.
+
+    # 짧은 구간을 붙이면서 다시 이어지게 된 같은 화자의 구간을 한 번 더 합칩니다.
+    return _merge_same_speaker(packed, max_duration, max_gap)
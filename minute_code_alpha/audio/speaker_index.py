@@ -0,0 +1,224 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '목소리 명부 담당자'의 역할을 합니다.
+화자 분리 결과는 회의마다 SPEAKER_00, SPEAKER_01 같은 이름 없는 번호로 나와요.
+이 담당자는 회의가 끝날 때마다 화자별 목소리 특징(임베딩)을 명부에 적어두고,
+다음 회의에서 같은 목소리가 나오면 "아, 이분은 SPK_0003(김팀장)이네요" 하고 자동으로 알아봅니다.
+
+명부는 임베딩 공간(pyannote/fast_fixed)마다 따로 관리합니다. (방식마다 임베딩의 모양과 성질이 달라요.)
+모든 임베딩을 하나의 numpy 행렬로 들고 있어서, 목소리를 찾는 데는 행렬 곱셈 한 번이면 됩니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import json
+import logging
+import tempfile
+import threading
+
+import numpy as np
+
+from ..settings import (
+    SPEAKER_INDEX_DIR,
+    SPEAKER_INDEX_THRESHOLDS,
+    SPEAKER_INDEX_MAX_PER_SPEAKER
+)
+
+
+def _atomic_write(path: str, write):
+    """(내부용) 임시 파일에 쓴 뒤 한 번에 바꿔치기해서, 반쯤 쓰인 파일이 남지 않게 합니다."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _SpeakerSpace:
+    """(내부용) 화자 분리 방식 하나의 임베딩 행렬. 행마다 어느 화자의 임베딩인지 함께 기억합니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors = np.zeros((0, 0), dtype=np.float32)  # (임베딩 수, 차원), 행마다 길이 1로 정규화
+        self.owners = np.zeros(0, dtype=np.int32)           # 행마다 화자 번호
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.vectors = data["vectors"].astype(np.float32)
+                self.owners = data["owners"].astype(np.int32)
+
+    def save(self):
+        _atomic_write(self.path, lambda f: np.savez(f, vectors=self.vectors, owners=self.owners))
+
+    def add(self, owner: int, vector: np.ndarray, max_per_owner: int):
+        if self.vectors.size == 0:
+            self.vectors = vector[None, :].astype(np.float32)
+            self.owners = np.array([owner], dtype=np.int32)
+            return
+        if vector.shape[0] != self.vectors.shape[1]:
+            raise ValueError(f"임베딩 차원이 다릅니다: {vector.shape[0]} != {self.vectors.shape[1]}")
+        self.vectors = np.vstack([self.vectors, vector[None, :].astype(np.float32)])
+        self.owners = np.append(self.owners, np.int32(owner))
+        # 한 화자의 임베딩이 너무 많아지면 가장 오래된 것부터 지웁니다.
+        rows = np.flatnonzero(self.owners == owner)
+        if len(rows) > max_per_owner:
+            keep = np.ones(len(self.owners), dtype=bool)
+            keep[rows[:len(rows) - max_per_owner]] = False
+            self.vectors = self.vectors[keep]
+            self.owners = self.owners[keep]
+
+    def best_matches(self, queries: np.ndarray):
+        """
+        질의 임베딩마다 화자별 최고 유사도를 구합니다. (행렬 곱셈 한 번)
+
+        Returns:
+            tuple: (화자 번호 배열, (질의 수, 화자 수) 유사도 행렬). 명부가 비어 있으면 빈 배열.
+        """
+        if self.vectors.size == 0 or queries.shape[1] != self.vectors.shape[1]:
+            return np.zeros(0, dtype=np.int32), np.zeros((len(queries), 0), dtype=np.float32)
+        similarity = queries @ self.vectors.T
+        owner_ids, columns = np.unique(self.owners, return_inverse=True)
+        best = np.full((len(queries), len(owner_ids)), -np.inf, dtype=np.float32)
+        np.maximum.at(best, (slice(None), columns), similarity)
+        return owner_ids, best
+
+
+class SpeakerIndex:
+    """
+    회의를 넘나드는 화자 명부입니다.
+    speakers.json에 화자 번호/이름/참여한 회의를, {방식}.npz에 임베딩 행렬을 저장합니다.
+    """
+
+    def __init__(self, directory: str = SPEAKER_INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_path = os.path.join(directory, "speakers.json")
+        self._spaces = {}
+        self._meta = {"next_id": 1, "speakers": {}}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+
+    def _space(self, space: str) -> _SpeakerSpace:
+        if space not in self._spaces:
+            self._spaces[space] = _SpeakerSpace(os.path.join(self.directory, f"{space}.npz"))
+        return self._spaces[space]
+
+    def _save_meta(self):
+        payload = json.dumps(self._meta, ensure_ascii=False, indent=2).encode("utf-8")
+        _atomic_write(self._meta_path, lambda f: f.write(payload))
+
+    @staticmethod
+    def speaker_id(number: int) -> str:
+        return f"SPK_{number:04d}"
+
+    def display_name(self, speaker_id: str) -> str:
+        """이름이 붙은 화자는 이름으로, 아니면 화자 번호(SPK_0001 등)로 보여줍니다."""
+        info = self._meta["speakers"].get(speaker_id, {})
+        return info.get("name") or speaker_id
+
+    def rename(self, speaker_id: str, name: str):
+        """화자에게 사람 이름을 붙입니다. 다음 회의부터 대화록에 이 이름이 나옵니다."""
+        with self._lock:
+            if speaker_id not in self._meta["speakers"]:
+                raise KeyError(f"등록되지 않은 화자입니다: {speaker_id}")
+            self._meta["speakers"][speaker_id]["name"] = name.strip() or None
+            self._save_meta()
+
+    def list_speakers(self) -> list:
+        """등록된 화자 목록 [(화자 번호, 이름, 참여한 회의 수)]을 반환합니다."""
+        with self._lock:
+            return [(speaker_id, info.get("name"), len(info.get("meetings", [])))
+                    for speaker_id, info in sorted(self._meta["speakers"].items())]
+
+    def identify(self, space: str, embeddings: dict, meeting_id: str, threshold: float = None,
+                 enroll: bool = True) -> dict:
+        """
+        회의의 화자 임베딩을 명부와 비교해 같은 사람을 찾고, (enroll=True면) 명부를 갱신합니다.
+        한 회의 안에서 두 화자가 같은 사람으로 묶이지 않도록, 유사도가 높은 순서대로 1:1로 짝을 짓습니다.
+        짝이 없는 화자는 새 번호(SPK_0001 등)로 등록합니다.
+
+        Args:
+            space (str): 임베딩 공간 이름 (예: "pyannote", "fast_fixed").
+            embeddings (dict): {회의 안의 화자 이름: 임베딩 벡터}
+            meeting_id (str): 회의를 구분하는 값 (같은 회의를 다시 처리해도 임베딩이 중복 저장되지 않습니다).
+
+        Returns:
+            dict: {회의 안의 화자 이름: 명부의 화자 번호}
+        """
+        if threshold is None:
+            threshold = SPEAKER_INDEX_THRESHOLDS.get(space, 0.7)
+        labels = list(embeddings)
+        if not labels:
+            return {}
+        queries = np.stack([np.asarray(embeddings[label], dtype=np.float32) for label in labels])
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            store = self._space(space)
+            owner_ids, best = store.best_matches(queries)
+
+            mapping = {}
+            used = set()
+            order = np.dstack(np.unravel_index(np.argsort(-best, axis=None), best.shape))[0]
+            for row, col in order:
+                if best[row, col] < threshold:
+                    break
+                if labels[row] in mapping or col in used:
+                    continue
+                mapping[labels[row]] = self.speaker_id(int(owner_ids[col]))
+                used.add(col)
+
+            if not enroll:
+                return mapping
+
+            for row, label in enumerate(labels):
+                if label not in mapping:
+                    speaker_id = self.speaker_id(self._meta["next_id"])
+                    self._meta["next_id"] += 1
+                    self._meta["speakers"][speaker_id] = {"name": None, "meetings": []}
+                    mapping[label] = speaker_id
+                info = self._meta["speakers"][mapping[label]]
+                if meeting_id not in info["meetings"]:
+                    info["meetings"].append(meeting_id)
+                    store.add(int(mapping[label].split("_")[-1]), queries[row], SPEAKER_INDEX_MAX_PER_SPEAKER)
+            store.save()
+            self._save_meta()
+
+        logging.info(f"화자 명부: {len(labels)}명 중 {len(used)}명을 이전 회의에서 알아봤습니다. "
+                     f"(명부 {len(self._meta['speakers'])}명, '{space}' 임베딩 {len(store.owners)}개)")
+        return mapping
+
+
+_index = None  # 화자 명부가 한 번만 만들어지도록 저장해두는 변수
+_index_lock = threading.Lock()
+
+def get_speaker_index() -> SpeakerIndex:
+    """화자 명부를 생성하거나 이미 생성된 명부를 반환합니다."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SpeakerIndex()
+    return _index
+
+def identify_speakers(space: str, embeddings: dict, meeting_id: str) -> dict:
+    """
+    회의 안의 화자 이름(SPEAKER_00 등)을 대화록에 쓸 이름으로 바꾸는 매핑을 만들고 명부를 갱신합니다.
+    명부를 사용할 수 없으면 빈 딕셔너리를 돌려줍니다. (원래 이름을 그대로 쓰면 됩니다.)
+
+    Returns:
+        dict: {회의 안의 화자 이름: 화자 이름 또는 화자 번호}
+    """
+    if not embeddings:
+        return {}
+    try:
+        index = get_speaker_index()
+        mapping = index.identify(space, embeddings, meeting_id)
+    except Exception as e:
+        logging.error(f"화자 명부 갱신 중 오류 발생: {e}")
+        return {}
+    return {label: index.display_name(speaker_id) for label, speaker_id in mapping.items()}
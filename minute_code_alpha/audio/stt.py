@@ -5,42 +5,158 @@
 이 담당자는 그 오디오를 듣고 "안녕하세요" 처럼 사람이 한 말을 글자로 받아쓰는 일을 합니다.
 """
 # -*- coding: utf-8 -*-
-import os
+import io
+import wave
 import logging
+import threading
+import subprocess
+import openai
 from openai import OpenAI # OpenAI 클라이언트 객체의 타입을 명시하기 위해 import 합니다.
 from pydub import AudioSegment # AudioSegment 객체의 타입을 명시하기 위해 import 합니다.
 
-def transcribe_segment(client: OpenAI, audio_segment: AudioSegment, segment_path: str, prompt: str, model: str) -> str:
+from ..settings import STT_UPLOAD_FORMAT, STT_UPLOAD_SAMPLE_RATE, STT_OPUS_BITRATE
+
+# 업로드 형식별 ffmpeg 출력 옵션과 파일 확장자 (wav는 ffmpeg 없이 직접 만듭니다.)
+_FFMPEG_UPLOAD_FORMATS = {
+    "flac": (["-f", "flac"], "flac"),
+    "opus": (["-c:a", "libopus", "-b:a", STT_OPUS_BITRATE, "-f", "ogg"], "ogg"),
+}
+# 샘플 폭(바이트)별 ffmpeg 원본 PCM 형식
+_PCM_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
+
+class UploadStats:
+    """회의 하나를 처리하는 동안 Whisper로 보낸 업로드 크기를 모아 보여줍니다. (여러 스레드에서 함께 사용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.segments = 0
+        self.bytes_sent = 0
+        self.raw_wav_bytes = 0 # 원본 그대로 WAV로 보냈다면 필요했을 크기
+
+    def add(self, raw_wav_bytes: int, bytes_sent: int):
+        with self._lock:
+            self.segments += 1
+            self.raw_wav_bytes += raw_wav_bytes
+            self.bytes_sent += bytes_sent
+
+    def summary(self) -> str:
+        with self._lock:
+            saved = 1 - self.bytes_sent / self.raw_wav_bytes if self.raw_wav_bytes else 0.0
+            return (f"업로드 {self.segments}개 구간, {self.bytes_sent / 1024 / 1024:.2f}MB 전송 "
+                    f"(원본 WAV 기준 {self.raw_wav_bytes / 1024 / 1024:.2f}MB, {saved:.0%} 절감)")
+
+
+def _encode_wav(audio_segment: AudioSegment) -> bytes:
+    """(내부용) 오디오 조각을 메모리 안에서 WAV 바이트로 만듭니다."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(audio_segment.channels)
+        wf.setsampwidth(audio_segment.sample_width)
+        wf.setframerate(audio_segment.frame_rate)
+        wf.writeframes(audio_segment.raw_data)
+    return buffer.getvalue()
+
+def encode_segment(audio_segment: AudioSegment, upload_format: str = STT_UPLOAD_FORMAT,
+                   sample_rate: int = STT_UPLOAD_SAMPLE_RATE):
+    """
+    오디오 조각을 디스크를 거치지 않고 메모리 안에서 업로드용 파일 내용으로 만듭니다.
+    모노/지정 샘플레이트로 줄인 뒤, FLAC/Opus 형식은 ffmpeg 파이프로 압축합니다.
+
+    Returns:
+        tuple: (업로드 파일 이름, 파일 내용 bytes)
+    """
+    if upload_format == "wav":
+        segment = audio_segment.set_channels(1).set_frame_rate(sample_rate)
+        return "segment.wav", _encode_wav(segment)
+
+    if upload_format not in _FFMPEG_UPLOAD_FORMATS:
+        raise ValueError(f"지원하지 않는 업로드 형식입니다: {upload_format}")
+    output_options, extension = _FFMPEG_UPLOAD_FORMATS[upload_format]
+
+    # 원본 PCM을 표준 입력으로 넣고, 압축된 결과를 표준 출력으로 받습니다.
+    sample_format = _PCM_FORMATS.get(audio_segment.sample_width)
+    if sample_format is None:
+        logging.warning(f"지원하지 않는 샘플 폭({audio_segment.sample_width}바이트)이라 16비트로 바꿔 인코딩합니다.")
+        audio_segment = audio_segment.set_sample_width(2)
+        sample_format = _PCM_FORMATS[2]
+    command = [
+        "ffmpeg", "-loglevel", "error",
+        "-f", sample_format, "-ar", str(audio_segment.frame_rate), "-ac", str(audio_segment.channels),
+        "-i", "pipe:0",
+        "-ac", "1", "-ar", str(sample_rate),
+        *output_options, "pipe:1",
+    ]
+    result = subprocess.run(command, input=audio_segment.raw_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg 인코딩 실패: {result.stderr.decode('utf-8', errors='ignore').strip()}")
+    return f"segment.{extension}", result.stdout
+
+def is_throttle_error(e: Exception) -> bool:
+    """속도 제한(429) 오류인지 확인합니다."""
+    return isinstance(e, openai.RateLimitError)
+
+def is_retryable_error(e: Exception) -> bool:
+    """잠시 후 다시 보내면 성공할 수 있는 오류(속도 제한, 시간 초과, 연결 오류, 서버 오류)인지 확인합니다."""
+    return isinstance(e, (openai.RateLimitError, openai.APITimeoutError,
+                          openai.APIConnectionError, openai.InternalServerError))
+
+def retry_after_seconds(e: Exception):
+    """서버가 응답 헤더(Retry-After)로 알려준 대기 시간(초)을 반환합니다. 없으면 None."""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def transcribe_segment(client: OpenAI, audio_segment: AudioSegment, prompt: str, model: str,
+                       upload_format: str = STT_UPLOAD_FORMAT, stats: UploadStats = None,
+                       controller=None, request_stats=None) -> str:
     """
     Whisper API를 사용하여 오디오 세그먼트를 텍스트로 변환합니다.
 
     Args:
         client (OpenAI): 미리 생성된 OpenAI 클라이언트.
         audio_segment (AudioSegment): pydub으로 잘린 오디오 조각.
-        segment_path (str): 오디오 조각을 임시로 저장할 파일 경로.
         prompt (str): Whisper 모델에 전달할 프롬프트 (힌트).
         model (str): 사용할 Whisper 모델 이름 (예: "whisper-1").
+        upload_format (str): 업로드 형식 ("flac", "opus", "wav").
+        stats (UploadStats, optional): 업로드 크기를 모을 통계 객체.
+        controller (AdaptiveConcurrencyController, optional): 동시 요청 수/속도 제한/재시도를 맡을 교통 정리 담당자.
+        request_stats (RequestStats, optional): 요청/재시도/거절 횟수를 모을 회의별 통계 객체.
 
     Returns:
         str: 변환된 텍스트. 실패 시 빈 문자열.
     """
     try:
-        # 1. 오디오 조각을 임시 파일로 저장합니다.
-        audio_segment.export(segment_path, format="wav")
-        
-        # 2. 저장된 임시 파일을 열어서 Whisper AI에게 보냅니다.
-        with open(segment_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
+        # 1. 오디오 조각을 메모리 안에서 압축된 업로드 파일로 만듭니다.
+        filename, payload = encode_segment(audio_segment, upload_format)
+        if stats is not None:
+            stats.add(len(audio_segment.raw_data) + 44, len(payload)) # 44: WAV 헤더 크기
+
+        # 2. 만든 파일 내용을 그대로 Whisper AI에게 보냅니다.
+        def request():
+            return client.audio.transcriptions.create(
                 model=model,
-                file=audio_file,
+                file=(filename, payload),
                 prompt=prompt,
                 language="ko" # 한국어로 인식하도록 설정
             )
+
+        if controller is not None:
+            # 오디오 길이(초)만큼 비용 버킷을 쓰고, 429/일시적 오류는 기다렸다가 다시 보냅니다.
+            transcript = controller.call(
+                request,
+                cost=len(audio_segment) / 1000.0,
+                is_retryable=is_retryable_error,
+                is_throttle=is_throttle_error,
+                retry_after=retry_after_seconds,
+                stats=request_stats,
+            )
+        else:
+            transcript = request()
         return transcript.text
     except Exception as e:
         logging.error(f"Whisper API 호출 중 오류 발생: {e}")
         return ""
-    finally:
-        # 3. 작업이 끝나면 임시 파일을 항상 삭제합니다.
-        if os.path.exists(segment_path):
-            os.remove(segment_path)
@@ -0,0 +1,255 @@
+"""
+[ai-seong-han-juni]
+이 파일은 'STT 담당자'를 골라 쓸 수 있게 해주는 '인력 사무소' 역할을 합니다.
+받아쓰기는 OpenAI의 Whisper API에 맡길 수도 있고(openai),
+우리 컴퓨터의 CPU에서 직접 Whisper 모델을 돌릴 수도 있어요(local).
+어느 쪽이든 "구간 목록을 주면 텍스트 목록을 돌려준다"는 같은 약속(인터페이스)을 지키기 때문에,
+'프로젝트 매니저'는 누가 받아쓰는지 몰라도 똑같이 일을 맡길 수 있습니다.
+"""
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import concurrent.futures
+from abc import ABC, abstractmethod
+import numpy as np
+
+from ..settings import (
+    STT_MODEL,
+    STT_UPLOAD_FORMAT,
+    STT_MIN_CONCURRENCY,
+    STT_INITIAL_CONCURRENCY,
+    STT_MAX_CONCURRENCY,
+    STT_MAX_REQUESTS_PER_MIN,
+    STT_MAX_AUDIO_SEC_PER_MIN,
+    STT_LATENCY_TARGET_SEC,
+    STT_MAX_RETRIES,
+    LOCAL_STT_MODEL,
+    LOCAL_STT_COMPUTE_TYPE,
+    LOCAL_STT_CPU_THREADS,
+    LOCAL_STT_BATCH_SIZE
+)
+from ..llm.llm_clients import get_openai_client
+from ..core.rate_limit import AdaptiveConcurrencyController, RequestStats
+from .stt import transcribe_segment, UploadStats
+
+# Whisper 모델이 한 번에 들을 수 있는 최대 길이 (초)
+_WHISPER_CHUNK_SEC = 30.0
+_WHISPER_SAMPLE_RATE = 16000
+
+
+class SttBackend(ABC):
+    """STT 백엔드가 공통으로 지켜야 할 약속(인터페이스)입니다."""
+
+    name = "base"
+
+    @property
+    @abstractmethod
+    def model_id(self) -> str:
+        """캐시 키 등에 쓰이는, 결과에 영향을 주는 모델 설정을 나타내는 문자열."""
+
+    @abstractmethod
+    def transcribe_many(self, source, segments: list, prompt: str, upload_stats: UploadStats = None,
+                        request_stats: RequestStats = None) -> list:
+        """
+        여러 구간을 받아쓰기합니다.
+
+        Args:
+            source (WavAudioSource): 메모리맵으로 연 오디오 원본.
+            segments (list): {'start', 'end', 'speaker'} 딕셔너리 목록.
+            prompt (str): Whisper에 전달할 힌트 프롬프트.
+            upload_stats (UploadStats, optional): 업로드 크기를 모을 통계 객체.
+                회의 하나를 여러 번에 나눠 부를 때 같은 객체를 넘겨서 회의 전체의 합계를 모읍니다.
+            request_stats (RequestStats, optional): API 요청/재시도/거절 횟수와 동시 요청 한도를 모을 통계 객체. (upload_stats와 같은 방식)
+
+        Returns:
+            list: 구간별 텍스트 (입력 순서와 같음). 실패한 구간은 빈 문자열.
+        """
+
+
+class OpenAIWhisperBackend(SttBackend):
+    """
+    OpenAI Whisper API로 구간마다 요청을 보내 병렬로 받아쓰기합니다.
+    동시에 보내는 요청 수는 교통 정리 담당자(AdaptiveConcurrencyController)가 할당량과 응답 속도에 맞춰 조절합니다.
+    이 담당자는 프로세스 전체에서 하나이므로, 여러 회의를 동시에 처리해도 함께 할당량을 나눠 씁니다.
+    """
+
+    name = "openai"
+
+    def __init__(self, model: str = STT_MODEL, upload_format: str = STT_UPLOAD_FORMAT):
+        self.model = model
+        self.upload_format = upload_format
+        self.controller = AdaptiveConcurrencyController(
+            initial=STT_INITIAL_CONCURRENCY,
+            min_limit=STT_MIN_CONCURRENCY,
+            max_limit=STT_MAX_CONCURRENCY,
+            requests_per_min=STT_MAX_REQUESTS_PER_MIN,
+            cost_per_min=STT_MAX_AUDIO_SEC_PER_MIN,
+            latency_target_sec=STT_LATENCY_TARGET_SEC,
+            max_retries=STT_MAX_RETRIES,
+            name="Whisper API",
+        )
+
+    @property
+    def model_id(self) -> str:
+        return self.model
+
+    def transcribe_many(self, source, segments: list, prompt: str, upload_stats: UploadStats = None,
+                        request_stats: RequestStats = None) -> list:
+        client = get_openai_client()
+        if not client:
+            raise RuntimeError("OpenAI API 클라이언트 초기화에 실패했습니다. .env 파일을 확인하세요.")
+
+        # 재시도는 교통 정리 담당자가 맡으므로, 클라이언트 자체의 자동 재시도는 끕니다.
+        client = client.with_options(max_retries=0)
+        texts = [""] * len(segments)
+
+        def transcribe_one(index):
+            # 업로드하는 순간에만 구간을 복사해서 인코딩합니다.
+            info = segments[index]
+            segment_audio = source.to_audio_segment(source.segment(info['start'], info['end']))
+            return transcribe_segment(client, segment_audio, prompt, self.model,
+                                      upload_format=self.upload_format, stats=upload_stats,
+                                      controller=self.controller, request_stats=request_stats)
+
+        # 스레드는 최대 한도만큼 만들어 두고, 실제로 동시에 나가는 요청 수는 교통 정리 담당자가 정합니다.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=STT_MAX_CONCURRENCY) as executor:
+            future_to_index = {executor.submit(transcribe_one, i): i for i in range(len(segments))}
+            for future in concurrent.futures.as_completed(future_to_index):
+                index = future_to_index[future]
+                try:
+                    texts[index] = future.result()
+                except Exception as exc:
+                    logging.error(f"STT 작업 중 오류 발생 (인덱스 {index}): {exc}")
+        return texts
+
+
+def _resample(samples: np.ndarray, sample_rate: int, target_rate: int = _WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """(내부용) 선형 보간으로 샘플레이트를 맞춥니다. (이미 같으면 그대로 반환)"""
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    target_length = int(round(len(samples) * target_rate / float(sample_rate)))
+    positions = np.linspace(0, len(samples) - 1, num=target_length, dtype=np.float64)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+class LocalWhisperBackend(SttBackend):
+    """
+    faster-whisper(CTranslate2, int8)로 CPU에서 직접 받아쓰기합니다.
+    여러 구간을 하나의 오디오로 이어 붙이고 구간 경계(clip_timestamps)를 알려줘서,
+    한 번의 배치 추론으로 batch_size개 구간을 함께 처리합니다.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size: str = LOCAL_STT_MODEL, compute_type: str = LOCAL_STT_COMPUTE_TYPE,
+                 cpu_threads: int = LOCAL_STT_CPU_THREADS, batch_size: int = LOCAL_STT_BATCH_SIZE):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.batch_size = max(1, int(batch_size))
+        self._pipeline = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"faster-whisper:{self.model_size}:{self.compute_type}"
+
+    def _get_pipeline(self):
+        """(내부용) 모델을 처음 쓸 때 한 번만 불러옵니다."""
+        with self._lock:
+            if self._pipeline is None:
+                try:
+                    from faster_whisper import WhisperModel, BatchedInferencePipeline
+                except ImportError as e:
+                    raise RuntimeError("로컬 STT를 사용하려면 faster-whisper를 설치하세요: pip install faster-whisper") from e
+                logging.info(f"로컬 STT: '{self.model_size}' 모델을 불러옵니다. "
+                             f"(compute_type={self.compute_type}, cpu_threads={self.cpu_threads})")
+                model = WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type,
+                                     cpu_threads=self.cpu_threads)
+                self._pipeline = BatchedInferencePipeline(model=model)
+            return self._pipeline
+
+    def _transcribe_batch(self, pipeline, clips: list, prompt: str) -> list:
+        """(내부용) 오디오 조각들을 이어 붙여 한 번의 배치 추론으로 받아쓰기합니다."""
+        offsets = []
+        position = 0
+        for samples in clips:
+            offsets.append((position, position + len(samples)))
+            position += len(samples)
+        audio = np.concatenate(clips) if clips else np.zeros(0, dtype=np.float32)
+        clip_timestamps = [
+            {"start": start / _WHISPER_SAMPLE_RATE, "end": end / _WHISPER_SAMPLE_RATE}
+            for start, end in offsets
+        ]
+
+        segments, _ = pipeline.transcribe(
+            audio,
+            language="ko",
+            initial_prompt=prompt or None,
+            clip_timestamps=clip_timestamps,
+            vad_filter=False,
+            batch_size=len(clips),
+        )
+
+        # 결과 문장을 시작 시각으로 원래 조각에 되돌려 줍니다.
+        starts = np.array([start for start, _ in offsets], dtype=np.float64) / _WHISPER_SAMPLE_RATE
+        texts = [[] for _ in clips]
+        for segment in segments:
+            index = int(np.searchsorted(starts, segment.start + 1e-3, side="right")) - 1
+            texts[max(0, min(index, len(clips) - 1))].append(segment.text.strip())
+        return [" ".join(t for t in parts if t) for parts in texts]
+
+    def transcribe_many(self, source, segments: list, prompt: str, upload_stats: UploadStats = None,
+                        request_stats: RequestStats = None) -> list:
+        # 업로드/API 요청이 없으므로 upload_stats, request_stats는 쓰지 않습니다.
+        pipeline = self._get_pipeline()
+
+        # Whisper는 30초씩 듣기 때문에, 30초가 넘는 구간은 조각으로 나눴다가 나중에 다시 합칩니다.
+        clips = []
+        owners = []
+        for index, info in enumerate(segments):
+            piece_start = info['start']
+            while piece_start < info['end']:
+                piece_end = min(piece_start + _WHISPER_CHUNK_SEC, info['end'])
+                samples = _resample(source.read_float32(piece_start, piece_end), source.sample_rate)
+                if len(samples):
+                    clips.append(samples)
+                    owners.append(index)
+                piece_start = piece_end
+
+        pieces = []
+        for batch_start in range(0, len(clips), self.batch_size):
+            batch = clips[batch_start:batch_start + self.batch_size]
+            try:
+                pieces.extend(self._transcribe_batch(pipeline, batch, prompt))
+            except Exception as exc:
+                logging.error(f"로컬 STT 배치 처리 중 오류 발생 (조각 {batch_start}~): {exc}")
+                pieces.extend([""] * len(batch))
+
+        texts = [[] for _ in segments]
+        for owner, text in zip(owners, pieces):
+            if text:
+                texts[owner].append(text)
+        return [" ".join(parts) for parts in texts]
+
+
+_BACKEND_CLASSES = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+_backends = {}  # 백엔드별로 한 번만 만들어지도록 저장해두는 변수 (로컬 모델을 매번 다시 불러오지 않도록)
+_backends_lock = threading.Lock()
+
+def get_stt_backend(name: str) -> SttBackend:
+    """이름에 맞는 STT 백엔드를 생성하거나 이미 생성된 백엔드를 반환합니다."""
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"지원하지 않는 STT 백엔드입니다: {name}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _BACKEND_CLASSES[name]()
+        return _backends[name]
+
+def get_stt_metrics() -> dict:
+    """Whisper API 백엔드의 현재 동시 요청 한도와 재시도 횟수 등을 반환합니다. (모니터링용)"""
+    backend = get_stt_backend(OpenAIWhisperBackend.name)
+    return backend.controller.stats()
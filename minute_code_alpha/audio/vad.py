@@ -0,0 +1,114 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '침묵 다듬기 담당자(VAD, Voice Activity Detection)'의 역할을 합니다.
+화자 분리 구간에는 말하기 전후의 침묵이나 잡음이 꽤 많이 섞여 있어요.
+Whisper는 오디오 길이만큼 돈과 시간이 드니까, 이 담당자가 소리의 크기(에너지)를 재서
+구간 앞뒤의 침묵은 잘라내고, 중간에 오래 쉰 곳이 있으면 거기서 구간을 나눠줍니다.
+"""
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from ..settings import (
+    VAD_FRAME_SEC,
+    VAD_MARGIN_DB,
+    VAD_MIN_THRESHOLD_DB,
+    VAD_HANGOVER_SEC,
+    VAD_MIN_PAUSE_SEC
+)
+
+# 에너지를 계산할 때 한 번에 읽어올 오디오 길이 (초). 메모리를 아끼기 위해 블록 단위로 읽습니다.
+_BLOCK_SEC = 60.0
+
+
+def frame_energy_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """모노 샘플 배열을 frame_length 샘플씩 자른 프레임별 에너지(dB)를 계산합니다. (남는 꼬리는 버립니다.)"""
+    n_frames = len(samples) // frame_length
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return (20.0 * np.log10(rms + 1e-10)).astype(np.float32)
+
+def compute_speech_mask(source, frame_sec: float = VAD_FRAME_SEC, margin_db: float = VAD_MARGIN_DB,
+                        min_threshold_db: float = VAD_MIN_THRESHOLD_DB, hangover_sec: float = VAD_HANGOVER_SEC):
+    """
+    오디오 파일 전체를 블록 단위로 읽어 프레임마다 말소리인지(True) 침묵인지(False) 판단합니다.
+    배경 소음 수준(하위 10% 에너지)보다 margin_db 이상 큰 프레임을 말소리로 보고,
+    말소리 앞뒤로 hangover_sec만큼 여유를 둡니다.
+
+    Args:
+        source (WavAudioSource): 메모리맵으로 연 오디오 원본.
+
+    Returns:
+        tuple: (프레임별 말소리 여부 bool 배열, 실제 프레임 길이(초))
+    """
+    frame_length = max(1, int(round(source.sample_rate * frame_sec)))
+    block_frames = max(1, int(_BLOCK_SEC * source.sample_rate) // frame_length) * frame_length
+
+    energies = []
+    for block_start in range(0, source.n_frames, block_frames):
+        samples = source.read_float32_frames(block_start, block_start + block_frames)
+        energies.append(frame_energy_db(samples, frame_length))
+    energy = np.concatenate(energies) if energies else np.empty(0, dtype=np.float32)
+    actual_frame_sec = frame_length / float(source.sample_rate)
+    if energy.size == 0:
+        return np.zeros(0, dtype=bool), actual_frame_sec
+
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(noise_floor + margin_db, min_threshold_db)
+    mask = energy > threshold
+
+    # 말소리 프레임 앞뒤로 여유를 둬서 단어의 시작/끝이 잘리지 않게 합니다. (팽창 연산)
+    hangover = int(round(hangover_sec / actual_frame_sec))
+    if hangover > 0:
+        kernel = np.ones(2 * hangover + 1, dtype=np.int32)
+        mask = np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+    return mask, actual_frame_sec
+
+def _speech_runs(mask: np.ndarray):
+    """(내부용) bool 배열에서 True가 연속된 구간들의 (시작 인덱스, 끝 인덱스) 배열을 구합니다."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def trim_turns(turns, mask: np.ndarray, frame_sec: float, min_pause_sec: float = VAD_MIN_PAUSE_SEC):
+    """
+    화자 분리 구간마다 앞뒤 침묵을 잘라내고, min_pause_sec 이상 쉰 곳에서 구간을 나눕니다.
+    말소리가 전혀 없는 구간은 빼버립니다.
+
+    Args:
+        turns (list): [start, end, speaker] 목록.
+        mask (np.ndarray): compute_speech_mask로 구한 프레임별 말소리 여부.
+        frame_sec (float): 프레임 길이 (초).
+
+    Returns:
+        tuple: ([start, end, speaker] 목록, 잘라낸 총 시간(초))
+    """
+    min_pause_frames = int(round(min_pause_sec / frame_sec))
+    trimmed = []
+    original_seconds = 0.0
+    kept_seconds = 0.0
+
+    for start, end, speaker in turns:
+        original_seconds += end - start
+        first = max(0, int(start / frame_sec))
+        last = min(len(mask), int(np.ceil(end / frame_sec)))
+        if last <= first:
+            continue
+
+        run_starts, run_ends = _speech_runs(mask[first:last])
+        if run_starts.size == 0:
+            continue
+
+        # 말소리 사이의 쉼이 짧으면 하나로 이어주고, 긴 쉼(min_pause_frames 이상)에서만 나눕니다.
+        breaks = np.flatnonzero(run_starts[1:] - run_ends[:-1] >= min_pause_frames)
+        group_starts = run_starts[np.concatenate(([0], breaks + 1))]
+        group_ends = run_ends[np.concatenate((breaks, [len(run_ends) - 1]))]
+
+        for group_start, group_end in zip(group_starts, group_ends):
+            new_start = max(start, (first + group_start) * frame_sec)
+            new_end = min(end, (first + group_end) * frame_sec)
+            if new_end > new_start:
+                trimmed.append([float(new_start), float(new_end), speaker])
+                kept_seconds += new_end - new_start
+
+    return trimmed, float(max(0.0, original_seconds - kept_seconds))
@@ -9,56 +9,78 @@
 import os
 import uuid
 import logging
+import threading
+from functools import partial
 
 from langgraph.graph import StateGraph, END
 
 # 우리가 만든 모듈들을 가져옵니다.
 from .nodes import (
     GraphState, # 챗봇의 '정보 보따리'
+    build_crag_chains, # 노드들이 쓸 체인을 미리 만드는 함수
     route_question, retrieve, grade_documents, generate, 
     grade_generation, decide_next_action
 )
+from .vector_store import get_chroma_retriever
+from ..llm.llm_clients import get_chat_openai_llm # LangChain용 ChatOpenAI LLM 가져오기
+from ..settings import CHATBOT_GRADING_MODE
 from ..config import get_api_key # API 키를 가져오기 위해 '비밀 금고'를 사용합니다.
 
 # --- 1. RAG 그래프 정의 ---
 # 챗봇 팀장이 연구원들에게 일을 시키는 '업무 흐름도'를 그립니다.
 
 _app = None # 챗봇 앱이 한 번만 만들어지도록 저장해두는 변수
+_app_lock = threading.Lock()
+
+def build_crag_app(llm, retriever_factory=get_chroma_retriever, grading_mode: str = CHATBOT_GRADING_MODE):
+    """
+    주어진 LLM으로 체인을 한 번 만들어 각 노드에 넣고, LangGraph 앱을 컴파일합니다.
+    grading_mode는 문서 평가 방식입니다. ("batch", "single", "sequential")
+    (벤치마크처럼 가짜 LLM/리트리버로 그래프를 돌려볼 때도 이 함수를 씁니다.)
+    """
+    chains = build_crag_chains(llm)
+
+    # '정보 보따리'를 가지고 일할 '업무 흐름도'를 만듭니다.
+    workflow = StateGraph(GraphState)
+
+    # 각 연구원들을 '업무 흐름도'에 배치합니다. (미리 만든 체인을 손에 쥐여줍니다.)
+    workflow.add_node("route_question", partial(route_question, chains=chains))
+    workflow.add_node("retrieve", partial(retrieve, retriever_factory=retriever_factory))
+    workflow.add_node("grade_documents", partial(grade_documents, chains=chains, mode=grading_mode))
+    workflow.add_node("generate", partial(generate, chains=chains))
+    workflow.add_node("grade_generation", partial(grade_generation, chains=chains))
+    workflow.add_node("decide_next_action", decide_next_action)
+
+    # 첫 번째 업무는 '질문 분석'입니다.
+    workflow.set_entry_point("route_question")
+    # 각 업무의 순서를 정해줍니다.
+    workflow.add_edge("route_question", "retrieve")
+    workflow.add_edge("retrieve", "grade_documents")
+    workflow.add_edge("grade_documents", "generate")
+    workflow.add_edge("generate", "grade_generation")
+    workflow.add_edge("grade_generation", "decide_next_action")
+    
+    # '다음 행동 결정' 업무 후에, 다시 자료를 찾아야 할지(retrieve) 아니면 끝낼지(END) 결정합니다.
+    workflow.add_conditional_edges(
+        "decide_next_action",
+        # 이 함수가 'retrieve'를 반환하면 retrieve 노드로, 'END'를 반환하면 끝냅니다.
+        lambda state: "retrieve" if state.get("final_answer") is None else END,
+        {"retrieve": "retrieve", END: END}
+    )
+    
+    # 모든 업무 흐름도를 완성하고 챗봇 앱을 만듭니다.
+    return workflow.compile()
 
 def get_crag_app():
     """LangGraph 앱을 생성하거나 이미 생성된 앱을 반환합니다."""
     global _app
     if _app is None:
-        # '정보 보따리'를 가지고 일할 '업무 흐름도'를 만듭니다.
-        workflow = StateGraph(GraphState)
-        
-        # 각 연구원들을 '업무 흐름도'에 배치합니다.
-        workflow.add_node("route_question", route_question)
-        workflow.add_node("retrieve", retrieve)
-        workflow.add_node("grade_documents", grade_documents)
-        workflow.add_node("generate", generate)
-        workflow.add_node("grade_generation", grade_generation)
-        workflow.add_node("decide_next_action", decide_next_action)
-
-        # 첫 번째 업무는 '질문 분석'입니다.
-        workflow.set_entry_point("route_question")
-        # 각 업무의 순서를 정해줍니다.
-        workflow.add_edge("route_question", "retrieve")
-        workflow.add_edge("retrieve", "grade_documents")
-        workflow.add_edge("grade_documents", "generate")
-        workflow.add_edge("generate", "grade_generation")
-        workflow.add_edge("grade_generation", "decide_next_action")
-        
-        # '다음 행동 결정' 업무 후에, 다시 자료를 찾아야 할지(retrieve) 아니면 끝낼지(END) 결정합니다.
-        workflow.add_conditional_edges(
-            "decide_next_action",
-            # 이 함수가 'retrieve'를 반환하면 retrieve 노드로, 'END'를 반환하면 끝냅니다.
-            lambda state: "retrieve" if state.get("final_answer") is None else END,
-            {"retrieve": "retrieve", END: END}
-        )
-        
-        # 모든 업무 흐름도를 완성하고 챗봇 앱을 만듭니다.
-        _app = workflow.compile()
+        with _app_lock:
+            if _app is None:
+                llm = get_chat_openai_llm()
+                if not llm:
+                    raise RuntimeError("LLM 초기화 실패")
+                _app = build_crag_app(llm)
     return _app
 
 def run_query(question: str, collection_name: str):
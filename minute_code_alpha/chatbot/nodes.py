@@ -6,6 +6,8 @@
 이 연구원들은 '챗봇 명령서(prompts.py)'와 '지식 창고 관리자(vector_store.py)'의 도움을 받습니다.
 """
 # -*- coding: utf-8 -*-
+import re
+import time
 import logging
 import json
 from typing import List, Any
@@ -20,12 +22,13 @@ from langchain.schema import Document
 from .prompts import (
     ROUTER_SYSTEM_PROMPT, ROUTER_PROMPT_TEMPLATE,
     CHATBOT_GRADER_SYSTEM_PROMPT, CHATBOT_GRADE_PROMPT_TEMPLATE,
+    CHATBOT_BATCH_GRADER_SYSTEM_PROMPT, CHATBOT_BATCH_GRADE_PROMPT_TEMPLATE,
     CHATBOT_RAG_SYSTEM_PROMPT, CHATBOT_RAG_PROMPT_TEMPLATE,
     GENERATION_VALIDATOR_SYSTEM_PROMPT, GENERATION_VALIDATOR_PROMPT_TEMPLATE,
     DECIDER_SYSTEM_PROMPT, DECIDER_PROMPT_TEMPLATE
 )
 from .vector_store import get_chroma_retriever
-from ..llm.llm_clients import get_chat_openai_llm # LangChain용 ChatOpenAI LLM 가져오기
+from ..settings import CHATBOT_GRADING_MODE, CHATBOT_GRADING_MAX_CONCURRENCY
 
 # --- 1. Pydantic 모델 (JSON 출력 형식 정의) ---
 # AI가 답변을 줄 때 어떤 형식으로 줄지 미리 정해놓는 '설계도'입니다.
@@ -38,6 +41,9 @@ class GradeDocuments(BaseModel):
     relevant: str = Field(description="'yes' 또는 'no'")
     reason: str
 
+class BatchGradeDocuments(BaseModel):
+    grades: List[dict] = Field(description="문서마다 {'document': 'D1', 'relevant': 'yes' 또는 'no', 'reason': ...}")
+
 class GenerationValidation(BaseModel):
     grounded: bool
     missing_evidence: List[str]
@@ -64,101 +70,151 @@ class GraphState(TypedDict):
 # AI에게 명령을 내리고 답변을 받아오는 '통역사'와, AI의 답변을 우리가 이해하기 쉽게 바꿔주는 '번역기'를 설정합니다.
 json_parser_router = JsonOutputParser(pydantic_object=RouteQuery)
 json_parser_grader = JsonOutputParser(pydantic_object=GradeDocuments)
+json_parser_batch_grader = JsonOutputParser(pydantic_object=BatchGradeDocuments)
 json_parser_validator = JsonOutputParser(pydantic_object=GenerationValidation)
 json_parser_decider = JsonOutputParser(pydantic_object=FinalDecision)
 
+def build_crag_chains(llm) -> dict:
+    """
+    노드들이 쓰는 'prompt | llm | parser' 체인을 한 번에 만듭니다.
+    그래프를 만들 때(get_crag_app) 한 번만 부르고, 각 노드에 넣어줍니다. (질문마다 다시 만들지 않습니다.)
+
+    Returns:
+        dict: {"router", "grader", "batch_grader", "generator", "validator"} 체인
+    """
+    def chain(system_prompt, human_prompt, parser):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("human", human_prompt)
+        ])
+        return prompt | llm | parser
+
+    return {
+        "router": chain(ROUTER_SYSTEM_PROMPT, ROUTER_PROMPT_TEMPLATE, json_parser_router),
+        "grader": chain(CHATBOT_GRADER_SYSTEM_PROMPT, CHATBOT_GRADE_PROMPT_TEMPLATE, json_parser_grader),
+        "batch_grader": chain(CHATBOT_BATCH_GRADER_SYSTEM_PROMPT, CHATBOT_BATCH_GRADE_PROMPT_TEMPLATE,
+                              json_parser_batch_grader),
+        "generator": chain(CHATBOT_RAG_SYSTEM_PROMPT, CHATBOT_RAG_PROMPT_TEMPLATE, StrOutputParser()),
+        "validator": chain(GENERATION_VALIDATOR_SYSTEM_PROMPT, GENERATION_VALIDATOR_PROMPT_TEMPLATE,
+                           json_parser_validator),
+    }
+
+def _format_context(documents) -> str:
+    """(내부용) 문서에 인덱스 부여 (D1, D2...) - 근거 문서 표시용"""
+    return "\n\n".join(f"[D{i+1}]\n{doc.page_content}" for i, doc in enumerate(documents))
+
 # --- 4. 그래프 노드 함수 (개별 연구원들의 작업) ---
 # 각 함수는 '정보 보따리'를 받아서 필요한 작업을 하고, 업데이트된 '정보 보따리'를 돌려줍니다.
+# chains/retriever_factory는 그래프를 만들 때 functools.partial로 미리 넣어둡니다.
 
-def route_question(state: GraphState):
+def route_question(state: GraphState, chains: dict):
     """질문을 분석하여 어떤 데이터베이스에서 정보를 찾을지 결정합니다."""
     print("---\n---[1] ANALYZE QUESTION---")
-    llm = get_chat_openai_llm()
-    if not llm: return {"final_answer": "LLM 초기화 실패"}
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", ROUTER_SYSTEM_PROMPT),
-        ("human", ROUTER_PROMPT_TEMPLATE)
-    ])
-    chain = prompt | llm | json_parser_router
-    result = chain.invoke({"question": state["question"]})
+    result = chains["router"].invoke({"question": state["question"]})
     
     print(f"---DECISION: ROUTE TO {result['target_db']} (Confidence: {result['confidence']})---")
     return {"datasource": result['target_db'], "retries": 0}
 
-def retrieve(state: GraphState):
+def retrieve(state: GraphState, retriever_factory=get_chroma_retriever):
     """결정된 데이터베이스에서 질문과 관련된 문서를 검색합니다."""
     print("---\n---[2] RETRIEVE---")
     collection_suffix = "_summary" if state["datasource"] == "summary_db" else "_full"
     final_collection_name = f"{state['base_collection_name']}{collection_suffix}"
     
     print(f"---RETRIEVING FROM: {final_collection_name}---")
-    retriever = get_chroma_retriever(final_collection_name)
+    retriever = retriever_factory(final_collection_name)
     if not retriever: return {"final_answer": "리트리버 초기화 실패"}
     documents = retriever.invoke(state["question"])
     return {"documents": documents}
 
-def grade_documents(state: GraphState):
-    """검색된 문서들이 질문에 답변하기에 충분히 관련 있는지 평가합니다."""
-    print("---\n---[3] GRADE DOCUMENTS---")
-    llm = get_chat_openai_llm()
-    if not llm: return {"final_answer": "LLM 초기화 실패"}
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", CHATBOT_GRADER_SYSTEM_PROMPT),
-        ("human", CHATBOT_GRADE_PROMPT_TEMPLATE)
-    ])
-    chain = prompt | llm | json_parser_grader
-    
+def _grade_each(question, documents, chains, mode) -> list:
+    """
+    (내부용) 문서마다 평가 체인을 한 번씩 부릅니다.
+    "sequential"이면 차례로, 그 밖에는 chain.batch로 최대 CHATBOT_GRADING_MAX_CONCURRENCY개씩 동시에 부릅니다.
+    평가에 실패한 문서는 관련 없음으로 봅니다.
+    """
+    inputs = [{"question": question, "document": d.page_content} for d in documents]
+    if mode == "sequential":
+        return [chains["grader"].invoke(x) for x in inputs]
+
+    results = chains["grader"].batch(
+        inputs, config={"max_concurrency": CHATBOT_GRADING_MAX_CONCURRENCY}, return_exceptions=True
+    )
+    grades = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            logging.warning(f"문서 D{i+1} 평가 중 오류 발생, 관련 없음으로 처리합니다: {result}")
+            result = {"relevant": "no", "reason": f"평가 실패: {result}"}
+        grades.append(result)
+    return grades
+
+def _grade_all_at_once(question, documents, chains) -> list:
+    """
+    (내부용) 모든 문서를 번호(D1, D2...)를 붙여 한 번의 LLM 호출로 평가합니다.
+    응답에 빠진 문서는 관련 없음으로 봅니다.
+    """
+    result = chains["batch_grader"].invoke({"question": question, "documents": _format_context(documents)})
+    grades = [{"relevant": "no", "reason": "평가 결과 없음"} for _ in documents]
+    found = set()
+    for grade in result.get("grades", []):
+        match = re.search(r"\d+", str(grade.get("document", "")))
+        index = int(match.group()) - 1 if match else -1
+        if 0 <= index < len(documents) and index not in found:
+            found.add(index)
+            grades[index] = {"relevant": grade.get("relevant", "no"), "reason": grade.get("reason", "")}
+    if len(found) < len(documents):
+        logging.warning(f"한 번에 평가한 결과에서 {len(documents) - len(found)}개 문서가 빠져 관련 없음으로 처리합니다.")
+    return grades
+
+def grade_documents(state: GraphState, chains: dict, mode: str = CHATBOT_GRADING_MODE):
+    """
+    검색된 문서들이 질문에 답변하기에 충분히 관련 있는지 평가합니다.
+    mode는 "batch"(문서마다 동시에), "single"(한 번의 호출로 전부), "sequential"(문서마다 차례로) 중 하나입니다.
+    """
+    print(f"---\n---[3] GRADE DOCUMENTS ({mode})---")
+    documents = state["documents"]
+    if not documents:
+        return {"documents": []}
+
+    # 실제 질문에서 평가 방식별 지연 시간을 비교할 수 있도록 평가에 걸린 시간을 남깁니다.
+    start_time = time.perf_counter()
+    used_mode = mode
+    if mode == "single":
+        try:
+            grades = _grade_all_at_once(state["question"], documents, chains)
+        except Exception as e:
+            logging.warning(f"문서 일괄 평가 실패, 문서별 평가로 다시 시도합니다: {e}")
+            grades = _grade_each(state["question"], documents, chains, "batch")
+            used_mode = "single->batch"
+    else:
+        grades = _grade_each(state["question"], documents, chains, mode)
+    logging.info(f"문서 평가 완료. (방식: {used_mode}, 문서 {len(documents)}개, "
+                 f"소요 시간: {time.perf_counter() - start_time:.2f}초)")
+
     filtered_docs = []
-    for d in state["documents"]:
-        result = chain.invoke({"question": state["question"], "document": d.page_content})
-        if result['relevant'] == "yes":
-            print(f"---GRADE: DOCUMENT RELEVANT ({result['reason']})---")
-            d.metadata['relevance_reason'] = result['reason'] # 메타데이터에 근거 추가
+    for d, result in zip(documents, grades):
+        if result.get('relevant') == "yes":
+            print(f"---GRADE: DOCUMENT RELEVANT ({result.get('reason')})---")
+            d.metadata['relevance_reason'] = result.get('reason') # 메타데이터에 근거 추가
             filtered_docs.append(d)
     return {"documents": filtered_docs}
 
-def generate(state: GraphState):
+def generate(state: GraphState, chains: dict):
     """관련성 있는 문서들을 바탕으로 질문에 대한 답변을 생성합니다."""
     print("---\n---[4] GENERATE---")
-    llm = get_chat_openai_llm()
-    if not llm: return {"final_answer": "LLM 초기화 실패"}
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", CHATBOT_RAG_SYSTEM_PROMPT),
-        ("human", CHATBOT_RAG_PROMPT_TEMPLATE)
-    ])
-    chain = prompt | llm | StrOutputParser()
-    
-    # 답변 생성 시, 문서에 인덱스 부여 (D1, D2...) - 근거 문서 표시용
-    context_with_indices = []
-    for i, doc in enumerate(state["documents"]):
-        context_with_indices.append(f"[D{i+1}]\n{doc.page_content}")
-    
-    generation = chain.invoke({"context": "\n\n".join(context_with_indices), "question": state["question"]})
+    generation = chains["generator"].invoke({
+        "context": _format_context(state["documents"]),
+        "question": state["question"]
+    })
     return {"generation": generation}
 
-def grade_generation(state: GraphState):
+def grade_generation(state: GraphState, chains: dict):
     """생성된 답변이 제공된 문서 컨텍스트에 의해 충분히 뒷받침되는지 검증합니다."""
     print("---\n---[5] VALIDATE GENERATION---")
-    llm = get_chat_openai_llm()
-    if not llm: return {"final_answer": "LLM 초기화 실패"}
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", GENERATION_VALIDATOR_SYSTEM_PROMPT),
-        ("human", GENERATION_VALIDATOR_PROMPT_TEMPLATE)
-    ])
-    chain = prompt | llm | json_parser_validator
-    
-    context_with_indices = []
-    for i, doc in enumerate(state["documents"]):
-        context_with_indices.append(f"[D{i+1}]\n{doc.page_content}")
-
-    validation_result = chain.invoke({
+    validation_result = chains["validator"].invoke({
         "question": state["question"],
         "answer": state["generation"],
-        "context": "\n\n".join(context_with_indices)
+        "context": _format_context(state["documents"])
     })
     return {"validation_result": validation_result}
 
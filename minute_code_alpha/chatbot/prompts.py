@@ -45,6 +45,24 @@ CHATBOT_GRADE_PROMPT_TEMPLATE = """[문서]
   "reason": "간단한 사유"
 }}"""
 
+# --- 문서 여러 개를 한 번에 평가 (한 번의 LLM 호출) ---
+CHATBOT_BATCH_GRADER_SYSTEM_PROMPT = """당신은 검색된 여러 문서가 각각 질문에 답변하는 데 충분히 관련 있는지 평가하는 평가자입니다.
+문서마다 내용이 질문의 핵심을 직접적으로 다루면 'yes', 아니면 'no'로 판정하고 간단한 사유를 덧붙이세요.
+모든 문서를 빠짐없이, 문서 번호(D1, D2...)를 붙여 평가하세요. 출력은 반드시 JSON으로 하세요."""
+
+CHATBOT_BATCH_GRADE_PROMPT_TEMPLATE = """[문서 목록]
+{documents}
+
+[질문]
+{question}
+
+[출력 형식(JSON)]
+{{
+  "grades": [
+    {{"document": "D1", "relevant": "yes" 또는 "no", "reason": "간단한 사유"}}
+  ]
+}}"""
+
 # =========================
 # [4단계] 답변 생성 (근거 기반, 한국어, 간결)
 # =========================
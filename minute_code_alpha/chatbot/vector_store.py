@@ -4,10 +4,19 @@
 챗봇이 질문에 답하려면 회의록 내용을 잘 알고 있어야겠죠?
 이 담당자는 회의록 내용을 잘게 쪼개서 '벡터'라는 특별한 형태로 저장해두고,
 질문이 들어오면 그 질문과 가장 비슷한 내용의 지식을 '지식 창고(ChromaDB)'에서 빠르게 찾아주는 일을 합니다.
+지식 창고 문은 한 번만 열고(PersistentClient), 최근에 쓴 컬렉션과 리트리버는 기억해두었다가
+같은 회의에 대한 질문이 다시 들어오면 바로 꺼내 씁니다.
+회의록을 다시 넣을 때는 조각마다 내용과 위치로 정해지는 번호(ID)를 붙여 덮어쓰기 때문에,
+같은 녹음을 여러 번 처리해도 지식 창고에 같은 내용이 중복으로 쌓이지 않습니다.
 """
 # -*- coding: utf-8 -*-
 import os
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+
+import chromadb
 
 from langchain_community.document_loaders import TextLoader
 from langchain_chroma import Chroma
@@ -15,50 +24,106 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 # 우리가 만든 '플러그'에서 임베딩 모델을 가져옵니다.
 from ..llm.llm_clients import get_openai_embeddings
+from ..core.cache import hash_file
 # '규칙집'에서 지식 창고가 저장될 위치를 가져옵니다.
-from ..settings import CHROMA_PERSIST_DIR
+from ..settings import CHROMA_PERSIST_DIR, CHROMA_HANDLE_CACHE_SIZE
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+_client = None # ChromaDB 클라이언트가 한 번만 만들어지도록 저장해두는 변수
+_client_lock = threading.Lock()
+_handles = OrderedDict() # 컬렉션 이름 -> (Chroma, 리트리버). 최근에 쓴 것이 뒤에 옵니다.
+_handles_lock = threading.Lock()
+
+def get_chroma_client():
+    """지식 창고 폴더(CHROMA_PERSIST_DIR)를 여는 ChromaDB 클라이언트를 생성하거나 반환합니다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+    return _client
+
+def _get_handle(collection_name: str):
+    """(내부용) 컬렉션의 (Chroma, 리트리버)를 기억해둔 것에서 꺼내거나 새로 엽니다. 실패하면 None."""
+    with _handles_lock:
+        if collection_name in _handles:
+            _handles.move_to_end(collection_name)
+            return _handles[collection_name]
+
+        embeddings = get_openai_embeddings()
+        if not embeddings:
+            logging.error("임베딩 모델 초기화 실패.")
+            return None
+
+        vectorstore = Chroma(
+            collection_name=collection_name,
+            client=get_chroma_client(),
+            embedding_function=embeddings,
+        )
+        handle = (vectorstore, vectorstore.as_retriever())
+        _handles[collection_name] = handle
+        while len(_handles) > CHROMA_HANDLE_CACHE_SIZE:
+            _handles.popitem(last=False)
+        return handle
+
+def invalidate_collection(collection_name: str):
+    """컬렉션 내용이 바뀌었을 때, 기억해둔 Chroma/리트리버를 버려서 다음 검색에서 새로 열게 합니다."""
+    with _handles_lock:
+        _handles.pop(collection_name, None)
+
 def get_chroma_retriever(collection_name: str):
     """
     지정된 컬렉션 이름으로 ChromaDB 리트리버를 가져옵니다.
+    최근에 쓴 컬렉션은 다시 열지 않고 기억해둔 리트리버를 돌려줍니다.
     """
-    embeddings = get_openai_embeddings()
-    if not embeddings:
-        logging.error("임베딩 모델 초기화 실패.")
-        return None
-
-    vectorstore = Chroma(
-        collection_name=collection_name,
-        persist_directory=CHROMA_PERSIST_DIR,
-        embedding_function=embeddings,
-    )
-    return vectorstore.as_retriever()
+    handle = _get_handle(collection_name)
+    return handle[1] if handle else None
+
+def _chunk_id(index: int, content: str) -> str:
+    """(내부용) 조각의 위치와 내용으로 항상 같은 ID를 만듭니다."""
+    return hashlib.sha256(f"{index}\n{content}".encode("utf-8")).hexdigest()
 
 def update_vector_store(file_path: str, collection_name: str):
     """
     파일 내용을 읽어 벡터 저장소를 업데이트합니다.
+    - 조각마다 위치와 내용으로 정해지는 ID를 붙여 덮어쓰기(upsert)합니다. (다시 처리해도 중복되지 않습니다.)
+    - 새 파일에 없는 예전 조각은 지웁니다.
+    - 컬렉션에 이미 같은 내용의 파일(해시가 같은 파일)이 들어 있으면 아무 작업도 하지 않습니다.
     """
     if not os.path.exists(file_path):
         logging.error(f"오류: 파일을 찾을 수 없습니다: {file_path}")
         return
 
-    embeddings = get_openai_embeddings()
-    if not embeddings:
+    handle = _get_handle(collection_name)
+    if not handle:
         logging.error("임베딩 모델 초기화 실패. 벡터 저장소를 업데이트할 수 없습니다.")
         return
+    vectorstore = handle[0]
+
+    source_hash = hash_file(file_path)
+    existing = vectorstore.get(include=["metadatas"])
+    existing_ids = set(existing["ids"])
+    if existing_ids and all((metadata or {}).get("source_hash") == source_hash
+                            for metadata in existing["metadatas"]):
+        logging.info(f"벡터 저장소 변경 없음 (같은 내용의 파일이 이미 색인됨): {file_path} -> '{collection_name}'.")
+        return
 
     loader = TextLoader(file_path, encoding='utf-8')
     docs = loader.load()
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
     splits = text_splitter.split_documents(docs)
+    for split in splits:
+        split.metadata["source_hash"] = source_hash
+    ids = [_chunk_id(i, split.page_content) for i, split in enumerate(splits)]
 
-    Chroma.from_documents(
-        documents=splits,
-        embedding=embeddings,
-        collection_name=collection_name,
-        persist_directory=CHROMA_PERSIST_DIR,
-    )
-    logging.info(f"벡터 저장소 업데이트 완료: {file_path} -> '{collection_name}'.")
+    # 바뀌지 않은 조각도 source_hash를 새로 적기 위해 함께 덮어씁니다. (임베딩은 캐시에서 꺼내옵니다.)
+    if splits:
+        vectorstore.add_documents(splits, ids=ids)
+    stale_ids = existing_ids - set(ids)
+    if stale_ids:
+        vectorstore.delete(ids=list(stale_ids))
+    invalidate_collection(collection_name)
+    logging.info(f"벡터 저장소 업데이트 완료: {file_path} -> '{collection_name}'. "
+                 f"(조각 {len(ids)}개 중 새 조각 {len(set(ids) - existing_ids)}개, 지운 조각 {len(stale_ids)}개)")
@@ -29,14 +29,15 @@ def get_api_key(key_name: str) -> str:
         print(f"경고: {key_name}을(를) .env 파일에서 찾을 수 없습니다.")
     return api_key
 
-def check_api_keys(llm_choice: str):
+def check_api_keys(llm_choice: str, diarization_backend: str = "pyannote", stt_backend: str = "openai"):
     """필요한 API 키가 .env 파일에 모두 설정되었는지 확인합니다."""
     missing_keys = []
-    # Pyannote 토큰은 항상 필요합니다.
-    if not get_api_key("PYANNOTE_TOKEN"):
+    # Pyannote 토큰은 pyannote로 화자를 분리할 때 필요합니다. (빠른 화자 분리는 토큰 없이 동작)
+    if diarization_backend == "pyannote" and not get_api_key("PYANNOTE_TOKEN"):
         missing_keys.append("PYANNOTE_TOKEN")
-    # OpenAI 키는 STT와 GPT 모델 사용 시 필요합니다.
-    if not get_api_key("OPENAI_API_KEY"):
+    # OpenAI 키는 Whisper API로 STT를 하거나 GPT 모델을 쓸 때 필요합니다. (로컬 STT + Gemini는 키 없이 동작)
+    needs_openai = stt_backend == "openai" or llm_choice.startswith("gpt")
+    if needs_openai and not get_api_key("OPENAI_API_KEY"):
         missing_keys.append("OPENAI_API_KEY")
     
     # Gemini 모델 선택 시 Google API 키가 필요합니다.
@@ -0,0 +1,140 @@
+"""
+[ai-seong-han-juni]
+이 파일은 우리 프로젝트의 '기억 창고' 역할을 합니다.
+한 번 오래 걸려서 얻은 결과(화자 분리, 음성 인식 등)를 디스크에 적어두었다가,
+똑같은 일을 다시 시키면 처음부터 하지 않고 적어둔 결과를 바로 꺼내줍니다.
+창고가 너무 커지면 가장 오랫동안 꺼내 보지 않은 기억부터 정리합니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import json
+import hashlib
+import logging
+import threading
+import tempfile
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용 전체의 SHA-256 해시를 계산합니다. (큰 파일도 조금씩 읽어서 메모리를 아낍니다.)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_cache_key(*parts) -> str:
+    """여러 값(해시, 모델 이름, 프롬프트, 파라미터 등)을 묶어서 하나의 캐시 키로 만듭니다."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    키 하나당 JSON 파일 하나로 값을 저장하는 디스크 캐시입니다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다. (파일 수정 시각 기준 LRU)
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 처음 저장할 때 한 번만 폴더를 훑어서 계산합니다.
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # 한 폴더에 파일이 너무 많아지지 않도록 키 앞 두 글자로 하위 폴더를 나눕니다.
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        """저장된 값을 반환합니다. 없으면 None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # 최근에 사용했다고 표시해서 정리 대상에서 뒤로 미룹니다.
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"캐시 항목을 읽을 수 없어 무시합니다 ({path}): {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value):
+        """값을 저장합니다. 저장 후 전체 크기가 한도를 넘으면 오래된 항목을 정리합니다."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = None
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            # 다른 작업이 반쯤 쓰인 파일을 읽지 않도록, 임시 파일에 쓴 뒤 한 번에 바꿔치기합니다.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            new_size = os.path.getsize(path)
+        except (OSError, TypeError, ValueError) as e:
+            # JSON으로 바꿀 수 없는 값(TypeError/ValueError)도 저장만 건너뜁니다.
+            logging.warning(f"캐시 저장 중 오류 발생 ({path}): {e}")
+            return
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += new_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """(내부용) (수정 시각, 크기, 경로) 목록을 반환합니다."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """(내부용) 전체 크기가 한도의 90% 아래로 내려갈 때까지 오래된 항목부터 지웁니다."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        self._total_bytes = total
+        if removed:
+            logging.info(f"캐시 용량 정리: {removed}개 항목 삭제 ({self.directory})")
+
+    def stats(self) -> dict:
+        """적중(hit)/실패(miss) 횟수를 반환합니다."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
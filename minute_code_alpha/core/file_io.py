@@ -11,9 +11,12 @@ import json
 import logging
 from datetime import datetime
 
-def save_results(base_results_dir, original_filename, meeting_topic, keywords, original_transcript, corrected_transcript, summary):
+def format_transcript_line(segment) -> str:
+    """대화록 구간 하나를 '[시작s - 끝s] 화자: 내용' 형식의 한 줄로 만듭니다."""
+    return f"[{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['speaker']}: {segment['text']}"
+
+def create_results_dir(base_results_dir, original_filename):
     """
-    처리된 모든 결과를 파일로 저장합니다.
     결과 폴더를 '원본파일명_YYYYMMDDHHMM' 형식으로 생성하고, 충돌 시 숫자를 붙입니다.
     """
     # 'results' 폴더가 없으면 생성
@@ -37,18 +40,19 @@ def save_results(base_results_dir, original_filename, meeting_topic, keywords, o
     os.makedirs(results_dir)
 
     logging.info(f"결과를 '{results_dir}' 폴더에 저장합니다.")
+    return results_dir
 
-    # 파일 경로 정의
+def save_transcripts(results_dir, original_filename, original_transcript, corrected_transcript):
+    """원본 STT 결과와 LLM 교정 결과를 TXT로 저장하고, 교정 결과 파일 경로를 반환합니다."""
+    base_filename = os.path.splitext(os.path.basename(original_filename))[0]
     stt_txt_path = os.path.join(results_dir, f"stt_{base_filename}.txt")
     corrected_txt_path = os.path.join(results_dir, f"corrected_{base_filename}.txt")
-    summary_md_path = os.path.join(results_dir, f"summary_{base_filename}.md")
-    results_json_path = os.path.join(results_dir, f"diarization_{base_filename}.json")
 
     # 1. 원본 STT 결과 (TXT)
     try:
         with open(stt_txt_path, "w", encoding="utf-8") as f:
             for segment in original_transcript:
-                f.write(f"[{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['speaker']}: {segment['text']}\n")
+                f.write(format_transcript_line(segment) + "\n")
         logging.info(f"원본 STT 결과를 '{stt_txt_path}'에 저장했습니다.")
     except IOError as e:
         logging.error(f"파일 저장 중 오류 발생 ({stt_txt_path}): {e}")
@@ -57,10 +61,17 @@ def save_results(base_results_dir, original_filename, meeting_topic, keywords, o
     try:
         with open(corrected_txt_path, "w", encoding="utf-8") as f:
             for segment in corrected_transcript:
-                f.write(f"[{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['speaker']}: {segment['text']}\n")
+                f.write(format_transcript_line(segment) + "\n")
         logging.info(f"LLM 교정 결과를 '{corrected_txt_path}'에 저장했습니다.")
     except IOError as e:
         logging.error(f"파일 저장 중 오류 발생 ({corrected_txt_path}): {e}")
+    return corrected_txt_path
+
+def save_summary(results_dir, original_filename, meeting_topic, keywords, original_transcript, corrected_transcript, summary):
+    """회의 요약(MD)과 모든 결과를 모은 JSON을 저장하고, 요약 파일 경로를 반환합니다."""
+    base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+    summary_md_path = os.path.join(results_dir, f"summary_{base_filename}.md")
+    results_json_path = os.path.join(results_dir, f"diarization_{base_filename}.json")
 
     # 3. 회의 요약 결과 (MD)
     try:
@@ -87,5 +98,15 @@ def save_results(base_results_dir, original_filename, meeting_topic, keywords, o
         logging.info(f"모든 결과를 '{results_json_path}'에 저장했습니다.")
     except IOError as e:
         logging.error(f"파일 저장 중 오류 발생 ({results_json_path}): {e}")
-        
+    return summary_md_path
+
+def save_results(base_results_dir, original_filename, meeting_topic, keywords, original_transcript, corrected_transcript, summary):
+    """
+    처리된 모든 결과를 파일로 저장합니다.
+    결과 폴더를 '원본파일명_YYYYMMDDHHMM' 형식으로 생성하고, 충돌 시 숫자를 붙입니다.
+    """
+    results_dir = create_results_dir(base_results_dir, original_filename)
+    save_transcripts(results_dir, original_filename, original_transcript, corrected_transcript)
+    save_summary(results_dir, original_filename, meeting_topic, keywords,
+                 original_transcript, corrected_transcript, summary)
     return results_dir
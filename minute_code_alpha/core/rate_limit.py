@@ -0,0 +1,225 @@
+"""
+[ai-seong-han-juni]
+이 파일은 외부 API에 보내는 요청의 '교통 정리 담당자' 역할을 합니다.
+요청을 너무 조금 보내면 쓸 수 있는 할당량을 낭비하고, 너무 많이 보내면 "천천히 보내세요(429)" 오류를 받아요.
+이 담당자는 분당 요청 수/오디오 길이 한도(토큰 버킷)를 지키면서,
+응답이 빠르면 동시에 보내는 요청 수를 조금씩 늘리고, 느려지거나 거절당하면 확 줄입니다(AIMD).
+실패한 요청은 무작위로 조금씩 다른 시간만큼 기다렸다가 다시 보내줍니다.
+"""
+# -*- coding: utf-8 -*-
+import time
+import random
+import logging
+import threading
+
+
+class TokenBucket:
+    """초당 rate만큼 토큰이 채워지는 양동이입니다. 토큰이 모자라면 채워질 때까지 기다립니다."""
+
+    def __init__(self, rate_per_sec: float, capacity: float):
+        if rate_per_sec <= 0:
+            raise ValueError(f"토큰 채움 속도는 0보다 커야 합니다: {rate_per_sec}")
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """amount만큼 토큰을 꺼냅니다. (한 번에 양동이 크기보다 많이 필요하면 양동이 크기만큼만 기다립니다.)"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RequestStats:
+    """
+    작업 하나(예: 회의 하나)에서 교통 정리 담당자를 거친 요청 수와 재시도/거절/실패 횟수, 그동안의 동시 요청 한도를 모읍니다.
+    교통 정리 담당자는 프로세스 전체에서 함께 쓰므로, 회의별 수치는 이 객체로 따로 셉니다. (여러 스레드에서 함께 사용)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.min_limit = None  # 이 작업 동안 가장 낮았던 동시 요청 한도
+        self.last_limit = None # 마지막 요청이 끝났을 때의 동시 요청 한도
+
+    def record(self, limit: int, throttled: bool = False, retried: bool = False, failed: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.throttled += int(throttled)
+            self.retries += int(retried)
+            self.failures += int(failed)
+            self.min_limit = limit if self.min_limit is None else min(self.min_limit, limit)
+            self.last_limit = limit
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+                "min_concurrency_limit": self.min_limit,
+                "concurrency_limit": self.last_limit,
+            }
+
+
+class AdaptiveConcurrencyController:
+    """
+    동시에 실행 중인 요청 수(in-flight)의 한도를 관찰된 지연 시간과 거절(429) 여부로 조절합니다.
+
+    - 목표 지연 시간 안에 성공하면 한도를 1/한도만큼 늘립니다. (한도만큼 성공하면 +1, 덧셈 증가)
+    - 느리게 성공하면 한도를 조금(x0.9), 거절당하면 크게(x0.5) 줄입니다. (곱셈 감소)
+      한꺼번에 보낸 요청들이 함께 거절당해도 한 번만 줄이도록, 줄이는 것은 decrease_cooldown_sec에 한 번뿐입니다.
+    - 재시도 가능한 오류는 지수적으로 늘어나는 시간 안에서 무작위로 기다렸다가 다시 보냅니다. (full jitter)
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int,
+                 requests_per_min: float, cost_per_min: float,
+                 latency_target_sec: float, max_retries: int,
+                 base_backoff_sec: float = 1.0, max_backoff_sec: float = 30.0, name: str = "api",
+                 decrease_cooldown_sec: float = None):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target_sec = latency_target_sec
+        self.max_retries = max_retries
+        self.base_backoff_sec = base_backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        # 기본값은 목표 지연 시간: 그 사이에 돌아온 응답들은 같은 순간의 혼잡을 보고 있습니다.
+        self.decrease_cooldown_sec = latency_target_sec if decrease_cooldown_sec is None else decrease_cooldown_sec
+
+        # 분당 한도를 초당 채움 속도로 바꾸고, 순간적으로 몰리는 양(burst)은 10초 분량까지 허용합니다.
+        self._request_bucket = TokenBucket(requests_per_min / 60.0, max(1.0, requests_per_min / 6.0))
+        self._cost_bucket = TokenBucket(cost_per_min / 60.0, max(1.0, cost_per_min / 6.0))
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = None  # 마지막으로 한도를 줄인 시각 (time.monotonic)
+        self._condition = threading.Condition()
+
+        # 모니터링용 통계
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    @property
+    def limit(self) -> int:
+        """현재 동시 요청 한도."""
+        with self._condition:
+            return int(self._limit)
+
+    def _acquire_slot(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def _decrease(self, factor: float):
+        """(내부용) 한도를 factor배로 줄입니다. 직전에 줄인 지 decrease_cooldown_sec이 안 지났으면 그대로 둡니다. (잠금 안에서 부릅니다.)"""
+        now = time.monotonic()
+        if self._last_decrease is not None and now - self._last_decrease < self.decrease_cooldown_sec:
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * factor)
+
+    def _release_slot(self, latency: float = None, throttled: bool = False):
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._decrease(0.5)
+            elif latency is not None:
+                if latency <= self.latency_target_sec:
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                else:
+                    self._decrease(0.9)
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, retry_after: float = None) -> float:
+        """(내부용) 다음 재시도까지 기다릴 시간. 서버가 알려준 Retry-After가 있으면 그보다 짧게 기다리지 않습니다."""
+        delay = random.uniform(0, min(self.max_backoff_sec, self.base_backoff_sec * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_backoff_sec))
+        return delay
+
+    def call(self, fn, cost: float = 1.0, is_retryable=None, is_throttle=None, retry_after=None,
+             stats: RequestStats = None):
+        """
+        한도와 속도 제한을 지키며 fn()을 실행하고, 실패하면 재시도합니다.
+
+        Args:
+            fn (callable): 인자 없이 호출할 요청 함수.
+            cost (float): 비용 버킷에서 꺼낼 양 (예: 오디오 길이(초)).
+            is_retryable (callable): 예외를 받아 재시도 여부를 알려주는 함수.
+            is_throttle (callable): 예외를 받아 속도 제한(429) 여부를 알려주는 함수.
+            retry_after (callable): 예외를 받아 서버가 알려준 대기 시간(초)을 돌려주는 함수.
+            stats (RequestStats, optional): 이 요청의 시도/재시도/거절/실패를 함께 셀 작업별 통계 객체.
+
+        Returns:
+            fn()의 반환값. 재시도를 모두 써도 실패하면 마지막 예외를 그대로 던집니다.
+        """
+        attempt = 0
+        while True:
+            self._request_bucket.acquire(1.0)
+            self._cost_bucket.acquire(cost)
+            self._acquire_slot()
+            start_time = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = bool(is_throttle and is_throttle(e))
+                self._release_slot(throttled=throttled)
+                retryable = throttled or bool(is_retryable and is_retryable(e))
+                with self._condition:
+                    self.requests += 1
+                    if throttled:
+                        self.throttled += 1
+                    failed = not retryable or attempt >= self.max_retries
+                    if failed:
+                        self.failures += 1
+                    else:
+                        self.retries += 1
+                    limit = int(self._limit)
+                if stats is not None:
+                    stats.record(limit, throttled=throttled, retried=not failed, failed=failed)
+                if failed:
+                    raise
+                delay = self._backoff(attempt, retry_after(e) if retry_after else None)
+                logging.warning(f"{self.name}: 요청 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도합니다. "
+                                f"({attempt + 1}/{self.max_retries}, 동시 요청 한도 {self.limit})")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._release_slot(latency=time.perf_counter() - start_time)
+            with self._condition:
+                self.requests += 1
+                limit = int(self._limit)
+            if stats is not None:
+                stats.record(limit)
+            return result
+
+    def stats(self) -> dict:
+        """현재 동시 요청 한도와 진행 중 요청 수, 재시도/거절/실패 횟수를 반환합니다."""
+        with self._condition:
+            return {
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+            }
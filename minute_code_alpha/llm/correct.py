@@ -2,66 +2,142 @@
 [ai-seong-han-juni]
 이 파일은 '텍스트 교정 담당자'의 역할을 합니다.
 음성인식으로 만들어진 회의록 원본은 오타가 있거나 문장이 어색할 수 있어요.
-이 담당자는 회의록을 읽어서, 어떤 AI 모델(GPT 또는 Gemini)을 사용할지 확인한 다음,
+이 담당자는 회의록을 읽어서, 선택된 AI 모델의 공급자를 '접수 창구(providers.py)'에서 받은 다음,
 AI에게 "이 문장들을 자연스럽게 다듬어줘!"라고 요청하는 일을 합니다.
+긴 회의록은 구간마다 번호를 붙여 여러 창으로 나눈 뒤 동시에 교정하고,
+돌려받은 번호를 보고 교정된 문장을 원래 구간에 정확히 되돌려 놓습니다.
 """
 # -*- coding: utf-8 -*-
+import re
+import asyncio
 import logging
 
-# 우리가 만든 '플러그'와 '명령서'를 가져옵니다.
-from .llm_clients import get_openai_client, get_gemini_chain
-from .prompts import GEMINI_CORRECTION_PROMPT_V2
+# 우리가 만든 '접수 창구'와 '명령서'를 가져옵니다.
+from .providers import get_provider, run_sync
+from .prompts import (
+    SEGMENT_CORRECTION_SYSTEM_PROMPT,
+    SEGMENT_CORRECTION_USER_PROMPT
+)
+from ..settings import (
+    CORRECTION_WINDOW_SEGMENTS,
+    CORRECTION_CONTEXT_SEGMENTS,
+    CORRECTION_MAX_WORKERS
+)
 
+# 교정 결과에서 "[번호] 내용" 형식의 줄을 찾는 패턴
+_TAGGED_LINE = re.compile(r"^\s*\[(\d+)\]\s*(.*)$")
 
-def _correct_with_gpt(client, text, topic, keywords):
-    """(내부용) GPT-4o를 사용하여 텍스트를 교정합니다."""
-    # 원본 코드에서는 이 프롬프트들이 정의되지 않은 채 사용되고 있었습니다.
-    # 원본의 의도를 살려, 아래와 같이 시스템/사용자 프롬프트를 구성합니다.
-    system_prompt = "당신은 회의록을 자연스러운 한국어 문장으로 교정하는 전문가입니다."
-    user_prompt = f"""다음 텍스트는 '{topic}'에 대한 회의 내용입니다. 
-주요 키워드는 {keywords} 입니다. 
-문맥에 맞게 문장을 다듬고, 맞춤법 및 띄어쓰기를 수정해주세요. 
-특히, 키워드가 포함된 문장은 더 자연스럽게 만들어주세요.
 
-원본 텍스트:
-{text}
+def _format_tagged(segments, indices) -> str:
+    """(내부용) 구간들을 "[번호] 화자: 내용" 형식의 줄로 만듭니다. (없으면 '(없음)')"""
+    lines = [f"[{i}] {segments[i]['speaker']}: {segments[i]['text']}" for i in indices]
+    return "\n".join(lines) if lines else "(없음)"
 
-교정된 텍스트:
-"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.5,
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.error(f"GPT-4o 교정 중 오류 발생: {e}")
-        return text # 오류 발생 시 원본 텍스트 반환
+def parse_tagged_lines(response: str, segments, expected) -> dict:
+    """
+    교정 결과에서 번호별 교정 문장을 꺼냅니다.
+    - 창에 속하지 않은 번호와 이미 나온 번호는 무시합니다. (처음 나온 줄을 씁니다.)
+    - 번호 없는 줄은 바로 앞 번호 줄이 나뉜 것으로 보고 이어 붙입니다.
+    - 줄 맨 앞에 화자 이름을 붙여 답했다면 떼어냅니다.
+
+    Returns:
+        dict: {구간 번호: 교정된 문장}
+    """
+    expected = set(expected)
+    corrected = {}
+    current = None
+    for line in response.splitlines():
+        match = _TAGGED_LINE.match(line)
+        if match:
+            index = int(match.group(1))
+            current = index if index in expected and index not in corrected else None
+            if current is not None:
+                text = match.group(2).strip()
+                speaker_prefix = f"{segments[index]['speaker']}:"
+                if text.startswith(speaker_prefix):
+                    text = text[len(speaker_prefix):].strip()
+                corrected[index] = text
+        elif current is not None and line.strip():
+            corrected[current] = f"{corrected[current]} {line.strip()}".strip()
+    return {index: text for index, text in corrected.items() if text}
+
+async def acorrect_segments(llm_choice, segments: list, topic, keywords, on_update=None) -> list:
+    """
+    대화록 구간들을 겹치는 창으로 나눠 동시에 교정하고, 구간 번호로 결과를 되돌려 놓습니다. (비동기)
+    창마다 앞뒤로 CORRECTION_CONTEXT_SEGMENTS개의 구간을 참고용 문맥으로 함께 보여주고,
+    결과는 그 창이 맡은 구간의 것만 씁니다. 번호가 빠졌거나 교정에 실패한 구간은 원문을 그대로 둡니다.
+    동시에 교정하는 창은 CORRECTION_MAX_WORKERS개를 넘지 않습니다.
 
-def _correct_with_gemini(text, topic, keywords):
-    """(내부용) Gemini를 사용하여 텍스트를 교정합니다."""
-    # Gemini는 Langchain 체인을 사용합니다.
-    chain = get_gemini_chain(GEMINI_CORRECTION_PROMPT_V2, ["text", "topic", "keywords"])
-    if not chain: return text
-    try:
-        return chain.run(text=text, topic=topic, keywords=", ".join(keywords))
-    except Exception as e:
-        logging.error(f"Gemini 교정 중 오류 발생: {e}")
-        return text # 오류 발생 시 원본 텍스트 반환
+    Args:
+        segments (list): {'speaker', 'text', ...} 딕셔너리 목록 (시간순).
+        on_update (callable, optional): 교정 결과가 한 줄씩 도착할 때마다 {구간 번호: 교정된 문장}을 받는 함수.
 
-def correct_text(llm_choice, text, topic, keywords):
-    """선택된 LLM을 사용하여 텍스트를 교정합니다."""
-    logging.info(f"LLM({llm_choice})으로 텍스트 교정을 시작합니다...")
-    if llm_choice == "gpt-4o":
-        client = get_openai_client()
-        if not client: return text
-        return _correct_with_gpt(client, text, topic, keywords)
-    elif llm_choice == "gemini-2.5-pro":
-        return _correct_with_gemini(text, topic, keywords)
-    else:
+    Returns:
+        list: 구간별 교정된 문장 (입력 순서와 같음).
+    """
+    texts = [segment['text'] for segment in segments]
+    if not segments:
+        return texts
+    provider = get_provider(llm_choice)
+    if not provider:
         logging.warning(f"지원하지 않는 LLM({llm_choice})입니다. 원본 텍스트를 반환합니다.")
-        return text
+        return texts
+    logging.info(f"LLM({llm_choice})으로 대화록 교정을 시작합니다... (구간 {len(segments)}개)")
+    semaphore = asyncio.Semaphore(CORRECTION_MAX_WORKERS)
+
+    async def correct_window(window_start):
+        window_end = min(window_start + CORRECTION_WINDOW_SEGMENTS, len(segments))
+        owned = range(window_start, window_end)
+        before = range(max(0, window_start - CORRECTION_CONTEXT_SEGMENTS), window_start)
+        after = range(window_end, min(len(segments), window_end + CORRECTION_CONTEXT_SEGMENTS))
+
+        on_token = None
+        if on_update:
+            received = []
+            def on_token(token):
+                received.append(token)
+                # 줄이 끝날 때마다, 지금까지 완성된 줄들의 교정 결과를 알려줍니다.
+                if "\n" in token:
+                    text = "".join(received)
+                    on_update(parse_tagged_lines(text[:text.rfind("\n")], segments, owned))
+
+        prompt_vars = {
+            "topic": topic,
+            "keywords": ", ".join(keywords),
+            "context_before": _format_tagged(segments, before),
+            "lines": _format_tagged(segments, owned),
+            "context_after": _format_tagged(segments, after),
+        }
+        async with semaphore:
+            response = await provider.acomplete(
+                provider.messages(SEGMENT_CORRECTION_SYSTEM_PROMPT,
+                                  SEGMENT_CORRECTION_USER_PROMPT.format(**prompt_vars)),
+                temperature=0.2,
+                on_token=on_token,
+            )
+        corrected = parse_tagged_lines(response, segments, owned)
+        if on_update:
+            on_update(corrected)
+        if len(corrected) < len(owned):
+            logging.warning(f"교정 창 [{window_start}~{window_end - 1}]: {len(owned) - len(corrected)}개 구간은 "
+                            f"교정 결과가 없어 원문을 사용합니다.")
+        return corrected
+
+    window_starts = list(range(0, len(segments), CORRECTION_WINDOW_SEGMENTS))
+    results = await asyncio.gather(*(correct_window(start) for start in window_starts), return_exceptions=True)
+    for window_start, result in zip(window_starts, results):
+        if isinstance(result, Exception):
+            logging.error(f"대화록 교정 중 오류 발생 (구간 {window_start}~): {result}")
+            continue
+        for index, text in result.items():
+            texts[index] = text
+
+    logging.info(f"대화록 교정 완료. (창 {len(window_starts)}개)")
+    return texts
+
+def correct_segments(llm_choice, segments: list, topic, keywords, on_update=None) -> list:
+    """
+    acorrect_segments를 동기 코드에서 부르기 위한 함수입니다. (인자와 반환값은 같습니다.)
+    on_update는 LLM 공급자 루프의 스레드에서 불립니다.
+    """
+    return run_sync(acorrect_segments(llm_choice, segments, topic, keywords, on_update))
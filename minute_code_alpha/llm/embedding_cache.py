@@ -0,0 +1,164 @@
+"""
+[ai-seong-han-juni]
+이 파일은 임베딩 전용 '기억 창고' 창구입니다.
+지식 창고에 회의록을 다시 넣을 때(재처리)나 같은 질문을 또 할 때, 같은 글의 임베딩(숫자 목록)을
+OpenAI에 다시 물어보지 않고 예전에 받아둔 값을 꺼내줍니다.
+열쇠는 임베딩 모델 이름과 글 내용의 해시로 만들고, 값은 float32 숫자 묶음으로 SQLite 파일 하나에 촘촘하게 저장합니다.
+창고가 너무 커지면 가장 오랫동안 꺼내 보지 않은 임베딩부터 정리합니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from ..core.cache import make_cache_key
+from ..settings import CACHE_DIR, EMBEDDING_CACHE_MAX_BYTES
+
+
+class EmbeddingStore:
+    """
+    (키 -> float32 벡터)를 SQLite 한 파일에 저장하는 캐시입니다.
+    전체 벡터 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다. (last_used 기준 LRU)
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 여러 스레드(파이프라인 색인, Gradio 챗봇)가 같은 연결을 쓰므로 잠금으로 순서를 지킵니다.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+            row = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        self._total_bytes = row[0]
+
+    def get_many(self, keys) -> dict:
+        """저장된 벡터들을 {키: float 목록}으로 반환합니다. 없는 키는 빠집니다."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):  # SQLite 변수 개수 제한을 넘지 않도록 나눠서 찾습니다.
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+            if found:
+                # 최근에 사용했다고 표시해서 정리 대상에서 뒤로 미룹니다.
+                with self._conn:
+                    self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                           [(time.time(), key) for key in found])
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: dict):
+        """{키: float 목록}을 저장합니다. 저장 후 전체 크기가 한도를 넘으면 오래된 항목을 정리합니다."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+        try:
+            with self._lock, self._conn:
+                old = 0  # 덮어쓸 기존 벡터들의 크기
+                for start in range(0, len(rows), 500):  # SQLite 변수 개수 제한을 넘지 않도록 나눠서 찾습니다.
+                    batch = [key for key, _, _ in rows[start:start + 500]]
+                    placeholders = ",".join("?" * len(batch))
+                    old += self._conn.execute(
+                        f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchone()[0]
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                                       rows)
+                self._total_bytes += sum(len(blob) for _, blob, _ in rows) - old
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error as e:
+            logging.warning(f"임베딩 캐시 저장 중 오류 발생 ({self.path}): {e}")
+
+    def _evict(self):
+        """(내부용) 전체 크기가 한도의 90% 아래로 내려갈 때까지 오래된 항목부터 지웁니다. (잠금 안에서 부릅니다.)"""
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        rows = self._conn.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used").fetchall()
+        stale = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            stale.append((key,))
+            self._total_bytes -= size
+            removed += 1
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+        if removed:
+            logging.info(f"임베딩 캐시 용량 정리: {removed}개 항목 삭제 ({self.path})")
+
+    def stats(self) -> dict:
+        """적중(hit)/실패(miss) 횟수를 반환합니다. (글 하나당 한 번씩 셉니다.)"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_store = None  # 임베딩 캐시가 한 번만 만들어지도록 저장해두는 변수
+_store_lock = threading.Lock()
+
+def get_embedding_store() -> EmbeddingStore:
+    """임베딩용 SQLite 캐시를 생성하거나 이미 생성된 캐시를 반환합니다."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore(os.path.join(CACHE_DIR, "embeddings.sqlite3"), EMBEDDING_CACHE_MAX_BYTES)
+    return _store
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    다른 임베딩 모델(예: OpenAIEmbeddings)을 감싸서, 캐시에 없는 글만 실제 모델에 보냅니다.
+    색인(embed_documents)과 질문 검색(embed_query)이 같은 캐시를 씁니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, store: EmbeddingStore = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.store = store or get_embedding_store()
+
+    def _key(self, text: str) -> str:
+        return make_cache_key("embedding", self.model, text)
+
+    def embed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        cached = self.store.get_many(keys)
+        # 캐시에 없는 글만, 같은 글은 한 번만 모델에 보냅니다.
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            self.store.set_many(computed)
+            cached.update(computed)
+            logging.info(f"임베딩 {len(texts)}개 중 {len(texts) - len(missing)}개는 캐시에서 가져왔습니다.")
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text):
+        key = self._key(text)
+        cached = self.store.get_many([key])
+        if key in cached:
+            return cached[key]
+        vector = self.embeddings.embed_query(text)
+        self.store.set_many({key: vector})
+        return vector
@@ -4,50 +4,117 @@
 OpenAI 플러그(GPT용), Google 플러그(Gemini용)가 있어서,
 우리가 필요할 때마다 원하는 AI 서비스에 딱 맞춰 코드를 연결할 수 있게 도와줍니다.
 이 플러그들은 '비밀 금고(config.py)'에서 API 키를 가져와 사용합니다.
+플러그는 매번 새로 만들지 않고 한 번 꽂아둔 것을 모두가 함께 써요. OpenAI 쪽 플러그들은
+하나의 HTTP 연결 풀을 나눠 쓰기 때문에, 요청마다 새로 연결(TLS 핸드셰이크)하는 비용이 들지 않습니다.
 """
 # -*- coding: utf-8 -*-
 import logging
-from openai import OpenAI
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
+from .embedding_cache import CachedEmbeddings
 # 방금 만든 '비밀 금고'에서 API 키를 가져오는 함수를 불러옵니다.
 from ..config import get_api_key
+from ..settings import (
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_EXPIRY_SEC,
+    LLM_HTTP_CONNECT_TIMEOUT_SEC,
+    LLM_HTTP_TIMEOUT_SEC,
+    EMBEDDING_CACHE_ENABLED
+)
+
+# 플러그는 서비스/설정/API 키마다 한 번만 만들어서 프로세스 전체가 함께 씁니다.
+# (STT 스레드들과 동시에 들어오는 Gradio 요청이 같은 연결 풀을 나눠 씁니다.)
+_clients = {}
+_clients_lock = threading.RLock()  # 클라이언트를 만들면서 연결 풀을 꺼내므로 재진입 가능한 잠금을 씁니다.
+
+def _get_or_create(key, factory):
+    """(내부용) key에 해당하는 클라이언트가 없을 때만 factory()로 만들어 저장합니다."""
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory()
+                _clients[key] = client
+    return client
+
+def _http_options() -> dict:
+    """(내부용) 연결 풀 크기와 시간 제한 설정."""
+    return {
+        "limits": httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY_SEC
+        ),
+        "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT_SEC, connect=LLM_HTTP_CONNECT_TIMEOUT_SEC),
+    }
+
+def get_http_client() -> httpx.Client:
+    """OpenAI 계열 클라이언트가 함께 쓰는 keep-alive HTTP 연결 풀을 반환합니다."""
+    return _get_or_create(("httpx",), lambda: httpx.Client(**_http_options()))
 
 def get_openai_client():
-    """OpenAI 클라이언트를 생성하고 반환합니다."""
+    """OpenAI 클라이언트를 반환합니다. (처음 한 번만 만들고, 이후에는 같은 클라이언트를 돌려줍니다.)"""
+    api_key = get_api_key("OPENAI_API_KEY")
+    if not api_key:
+        logging.error("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
+        return None
+    return _get_or_create(("openai", api_key), lambda: OpenAI(api_key=api_key, http_client=get_http_client()))
+
+def get_async_openai_client():
+    """
+    비동기 OpenAI 클라이언트를 반환합니다. (처음 한 번만 만듭니다.)
+    비동기 연결 풀은 만들어진 이벤트 루프에 묶이므로, LLM 공급자 루프(providers.py)에서만 사용합니다.
+    """
     api_key = get_api_key("OPENAI_API_KEY")
     if not api_key:
         logging.error("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
         return None
-    return OpenAI(api_key=api_key)
+    return _get_or_create(("async_openai", api_key), lambda: AsyncOpenAI(
+        api_key=api_key, http_client=httpx.AsyncClient(**_http_options())
+    ))
 
-def get_gemini_chain(template_string, input_vars):
-    """LangChain과 Gemini를 사용하는 LLMChain을 생성합니다."""
+def get_gemini_llm(model="gemini-2.5-pro", temperature=0.5):
+    """Gemini 모델 연결(ChatGoogleGenerativeAI)을 반환합니다. (모델/temperature마다 한 번만 만듭니다.)"""
     api_key = get_api_key("GOOGLE_API_KEY")
     if not api_key:
         logging.error("GOOGLE_API_KEY가 .env 파일에 설정되지 않았습니다.")
         return None
-    
-    prompt = PromptTemplate(template=template_string, input_variables=input_vars)
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro", temperature=0.5, google_api_key=api_key)
-    return LLMChain(llm=llm, prompt=prompt)
+    return _get_or_create(("gemini", api_key, model, temperature), lambda: ChatGoogleGenerativeAI(
+        model=model, temperature=temperature, google_api_key=api_key
+    ))
 
 def get_chat_openai_llm():
-    """LangChain에서 사용할 ChatOpenAI 인스턴스를 생성하고 반환합니다."""
+    """LangChain에서 사용할 ChatOpenAI 인스턴스를 반환합니다. (처음 한 번만 만듭니다.)"""
     api_key = get_api_key("OPENAI_API_KEY")
     if not api_key:
         logging.error("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
         return None
     # 챗봇의 RAG 파이프라인에서는 창의성보다는 정확성이 중요하므로 temperature를 0으로 설정합니다.
-    return ChatOpenAI(model="gpt-4-turbo", temperature=0, openai_api_key=api_key)
+    return _get_or_create(("chat_openai", api_key), lambda: ChatOpenAI(
+        model="gpt-4-turbo", temperature=0, openai_api_key=api_key, http_client=get_http_client()
+    ))
 
 def get_openai_embeddings():
-    """LangChain에서 사용할 OpenAIEmbeddings 인스턴스를 생성하고 반환합니다."""
+    """
+    LangChain에서 사용할 OpenAIEmbeddings 인스턴스를 반환합니다. (처음 한 번만 만듭니다.)
+    EMBEDDING_CACHE_ENABLED이면 임베딩 캐시로 감싸서, 이미 받아둔 글의 임베딩은 다시 요청하지 않습니다.
+    """
     api_key = get_api_key("OPENAI_API_KEY")
     if not api_key:
         logging.error("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
         return None
-    return OpenAIEmbeddings(openai_api_key=api_key)
+
+    def create():
+        embeddings = OpenAIEmbeddings(openai_api_key=api_key, http_client=get_http_client())
+        if not EMBEDDING_CACHE_ENABLED:
+            return embeddings
+        return CachedEmbeddings(embeddings, model=embeddings.model)
+
+    return _get_or_create(("openai_embeddings", api_key), create)
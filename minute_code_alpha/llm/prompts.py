@@ -12,37 +12,6 @@
 # V2 개선 프롬프트 (2-Step Correction)
 # ==============================================================================
 
-# --- 1차 교정 프롬프트 (문장 완성 및 오류 수정) ---
-# STT 직후의 원본 텍스트를 완성된 문장으로 다듬고 맞춤법, 단어 오류 등을 수정합니다.
-GEMINI_CORRECTION_PROMPT_V2 = '''
-당신은 회의록을 완성도 높은 문장으로 교정하는 전문 AI 어시스턴트입니다.
-
-[지시사항]
-1. 아래 '원본 텍스트'는 음성 인식을 거쳐 문장이 중간에 끊겨 있습니다. 이 조각난 문장들을 자연스러운 하나의 완성된 문장으로 합쳐주세요.
-2. 맞춤법, 띄어쓰기, 문법 오류를 수정해주세요.
-3. 문맥에 맞지 않는 단어가 있다면 올바른 표현으로 교정해주세요. (예: 인공지능 화학 -> 인공지능화하기, 생소형 AI -> 생성형 AI)
-4. **[매우 중요] 절대로 원본에 없는 내용을 요약하거나 창작하지 마시오. 단순히 문장을 다듬고 완성하는 역할만 수행해야 합니다.**
-5. 화자 정보(예: SPEAKER_01:)는 문장 맨 앞에 그대로 유지해주세요.
-
-[예시]
-- 원본:
-SPEAKER_05: 재료가 뭐뭐가 필요하고
-SPEAKER_05: 어디서 사면 가장 싸게 사고
-- 교정본:
-SPEAKER_05: 재료가 뭐뭐가 필요하고 어디서 사면 가장 싸게 사는지
-
----
-[회의 주제]: {topic}
-[주요 키워드]: {keywords}
-
----
-[원본 텍스트]
-{text}
-
----
-[교정된 텍스트]
-'''
-
 # --- 2차 교정 프롬프트 (화자 역할 부여) ---
 # 1차 교정이 완료된 텍스트를 입력받아, 기계적인 화자 이름을 역할에 맞게 변경합니다.
 SPEAKER_REFINEMENT_PROMPT = '''
@@ -65,6 +34,31 @@ SPEAKER_REFINEMENT_PROMPT = '''
 '''
 
 
+# --- 구간 ID 기반 창 단위 교정 프롬프트 ---
+# 각 줄 앞의 [번호]를 그대로 돌려받아, 줄이 합쳐지거나 나뉘어도 원래 구간(타임스탬프)에 정확히 되돌립니다.
+SEGMENT_CORRECTION_SYSTEM_PROMPT = "당신은 음성 인식으로 만든 회의록을 자연스러운 한국어 문장으로 교정하는 전문가입니다."
+SEGMENT_CORRECTION_USER_PROMPT = """다음은 '{topic}'에 대한 회의 대화의 일부입니다. 주요 키워드: {keywords}
+
+[지시사항]
+1. '교정할 대화'의 각 줄을 맞춤법, 띄어쓰기, 문맥에 맞지 않는 단어를 고쳐 자연스럽게 다듬어주세요.
+2. 각 줄은 "[번호] 화자: 내용" 형식입니다. 출력도 반드시 한 줄에 하나씩 "[번호] 교정된 내용" 형식으로 쓰세요.
+3. 입력된 모든 번호를 빠짐없이, 같은 순서로 출력하세요. 줄을 합치거나 나누지 말고, 화자 이름은 쓰지 마세요.
+4. 원본에 없는 내용을 요약하거나 창작하지 마세요.
+5. '앞 문맥'과 '뒤 문맥'은 이해를 돕기 위한 참고용입니다. 교정하거나 출력하지 마세요.
+
+[앞 문맥]
+{context_before}
+
+[교정할 대화]
+{lines}
+
+[뒤 문맥]
+{context_after}
+
+[교정 결과]
+"""
+
+
 # ==============================================================================
 # 요약 및 STT 프롬프트 (JSON 구조화)
 # ==============================================================================
@@ -110,12 +104,6 @@ MEETING_SUMMARY_USER_PROMPT = """[회의 정보]
 [출력(JSON)]
 """
 
-# --- Gemini 텍스트 요약 프롬프트 (JSON) ---
-GEMINI_SUMMARY_PROMPT_TEMPLATE = f"""{MEETING_SUMMARY_SYSTEM_PROMPT}
-
-{MEETING_SUMMARY_USER_PROMPT}"""
-
-
 # --- GPT 텍스트 요약 프롬프트 (청크별) ---
 GPT_CHUNK_SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that summarizes parts of a meeting transcript."
 GPT_CHUNK_SUMMARY_USER_PROMPT = """다음은 '{topic}'에 관한 회의 대화의 일부입니다. 이 대화 내용을 바탕으로 핵심 내용을 간결하게 요약해 주십시오.
@@ -135,6 +123,9 @@ GPT_FINAL_SUMMARY_USER_PROMPT = """다음은 '{topic}'에 관한 회의의 각 
 
 최종 통합 요약문:"""
 
+# 조각 요약들을 합쳐 최종 JSON 요약을 만들 때, 원문 대신 들어가는 입력의 머리말입니다.
+COMBINED_CHUNK_SUMMARY_HEADER = "(아래는 회의 원문을 시간순으로 나눈 각 부분의 요약입니다.)"
+
 # --- STT 프롬프트 템플릿 ---
 STT_PROMPT_TEMPLATE = ""
 
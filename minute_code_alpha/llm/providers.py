@@ -0,0 +1,178 @@
+"""
+[ai-seong-han-juni]
+이 파일은 LLM 팀의 '접수 창구' 역할을 합니다.
+교정/키워드/요약 담당자는 이제 "gpt-4o냐 gemini냐"를 직접 따지지 않고,
+모델 이름으로 이 창구에서 '공급자(provider)'를 받아 똑같은 방법(acomplete)으로 일을 맡깁니다.
+새 모델을 쓰고 싶으면 아래 명단(_PROVIDER_FACTORIES)에 한 줄만 추가하면 돼요.
+
+모든 요청은 프로세스에 하나뿐인 비동기 이벤트 루프(전용 스레드)에서 처리합니다.
+그래서 조각 요약이나 교정 창 수십 개를 스레드 없이 한꺼번에 보낼 수 있고,
+공급자마다 동시에 보낼 수 있는 요청 수(세마포어)도 한곳에서 지킵니다.
+"""
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+from .llm_clients import get_async_openai_client, get_gemini_llm
+from .response_cache import acached_response
+from ..settings import LLM_MAX_CONCURRENT_REQUESTS
+
+
+class LLMProvider(ABC):
+    """
+    LLM 공급자의 공통 모양입니다.
+    하위 클래스는 vendor(서비스 이름)와 _request(실제 API 호출)만 정하면 됩니다.
+    """
+    vendor = ""
+
+    def __init__(self, model: str, max_concurrency: int = LLM_MAX_CONCURRENT_REQUESTS):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._semaphore = None  # 공급자 루프 안에서 처음 쓸 때 만듭니다.
+
+    def messages(self, system: str, user: str, single: str = None) -> list:
+        """
+        시스템/사용자 프롬프트로 이 공급자에게 보낼 메시지 목록을 만듭니다.
+        single은 한 덩어리 프롬프트를 쓰는 공급자를 위한 전용 프롬프트입니다. (없으면 system과 user를 이어 씁니다.)
+        """
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    @abstractmethod
+    async def _request(self, messages: list, temperature: float, json_mode: bool, on_token) -> str:
+        """실제 API를 한 번 호출하고 응답 문자열을 돌려줍니다. (on_token이 있으면 스트리밍)"""
+
+    async def acomplete(self, messages: list, temperature: float = 0.5, json_mode: bool = False,
+                        on_token=None) -> str:
+        """
+        메시지를 보내고 응답 문자열을 돌려줍니다. 같은 요청의 응답이 캐시에 있으면 API를 부르지 않습니다.
+        오류는 그대로 던지므로, 호출하는 쪽에서 처리합니다.
+
+        Args:
+            messages (list): messages()로 만든 메시지 목록.
+            temperature (float): 샘플링 온도.
+            json_mode (bool): JSON 객체로만 답하도록 요청할지 여부 (지원하는 공급자만).
+            on_token (callable, optional): 응답 조각(토큰)이 도착하는 대로 받는 함수.
+                (캐시에서 꺼낸 응답은 한 번에 흘려보냅니다.)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        streamed = False
+
+        async def compute():
+            nonlocal streamed
+            async with self._semaphore:
+                streamed = on_token is not None
+                return await self._request(messages, temperature, json_mode, on_token)
+
+        params = {"temperature": temperature, "json_mode": json_mode}
+        response = await acached_response(self.vendor, self.model, params, messages, compute)
+        if on_token is not None and not streamed and response:
+            on_token(response)
+        return response
+
+
+class OpenAIProvider(LLMProvider):
+    """AsyncOpenAI 채팅 API를 쓰는 공급자입니다."""
+    vendor = "openai"
+
+    async def _request(self, messages, temperature, json_mode, on_token):
+        client = get_async_openai_client()
+        if not client:
+            raise RuntimeError("OpenAI 클라이언트 초기화 실패")
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        if on_token is None:
+            response = await client.chat.completions.create(
+                model=self.model, messages=messages, temperature=temperature, **extra
+            )
+            return response.choices[0].message.content
+
+        parts = []
+        stream = await client.chat.completions.create(
+            model=self.model, messages=messages, temperature=temperature, stream=True, **extra
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_token(delta)
+        return "".join(parts)
+
+
+class GeminiProvider(LLMProvider):
+    """LangChain ChatGoogleGenerativeAI의 비동기 호출(ainvoke/astream)을 쓰는 공급자입니다."""
+    vendor = "gemini"
+
+    def messages(self, system, user, single=None):
+        # Gemini에는 예전처럼 한 덩어리 프롬프트로 보냅니다.
+        return [{"role": "user", "content": single or f"{system}\n\n{user}"}]
+
+    async def _request(self, messages, temperature, json_mode, on_token):
+        llm = get_gemini_llm(self.model, temperature)
+        if not llm:
+            raise RuntimeError("Gemini 모델 초기화 실패")
+        prompt = "\n\n".join(message["content"] for message in messages)
+        if on_token is None:
+            result = await llm.ainvoke(prompt)
+            return result.content
+
+        parts = []
+        async for chunk in llm.astream(prompt):
+            delta = chunk.content if isinstance(chunk.content, str) else ""
+            if delta:
+                parts.append(delta)
+                on_token(delta)
+        return "".join(parts)
+
+
+# 모델 이름 -> 공급자를 만드는 함수. 새 모델은 여기에 한 줄 추가하면 됩니다.
+_PROVIDER_FACTORIES = {
+    "gpt-4o": lambda: OpenAIProvider("gpt-4o"),
+    "gemini-2.5-pro": lambda: GeminiProvider("gemini-2.5-pro"),
+}
+_providers = {}
+_providers_lock = threading.Lock()
+
+def register_provider(name: str, factory):
+    """모델 이름으로 쓸 공급자를 등록합니다. (factory는 인자 없이 LLMProvider를 만드는 함수)"""
+    with _providers_lock:
+        _PROVIDER_FACTORIES[name] = factory
+        _providers.pop(name, None)
+
+def get_provider(name: str):
+    """모델 이름에 해당하는 공급자를 반환합니다. 등록되지 않은 모델이면 None."""
+    with _providers_lock:
+        if name not in _providers:
+            factory = _PROVIDER_FACTORIES.get(name)
+            if factory is None:
+                return None
+            _providers[name] = factory()
+        return _providers[name]
+
+
+_loop = None  # 모든 LLM 요청을 처리하는 이벤트 루프가 한 번만 만들어지도록 저장해두는 변수
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """(내부용) 전용 스레드에서 돌아가는 공급자 이벤트 루프를 생성하거나 반환합니다."""
+    global _loop, _loop_thread
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                _loop_thread = threading.Thread(target=loop.run_forever, name="llm-provider-loop", daemon=True)
+                _loop_thread.start()
+                _loop = loop
+    return _loop
+
+def run_sync(coro):
+    """
+    동기 코드(파이프라인 스레드, Gradio 핸들러)에서 코루틴을 공급자 루프에 맡기고 결과를 기다립니다.
+    여러 스레드에서 동시에 불러도 모든 요청은 같은 루프와 같은 연결 풀에서 처리됩니다.
+    """
+    loop = _get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("공급자 루프 안에서는 run_sync 대신 await를 사용하세요.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,88 @@
+"""
+[ai-seong-han-juni]
+이 파일은 LLM 팀 전용 '기억 창고' 창구입니다.
+교정, 키워드 추출, 요약은 같은 글을 같은 모델과 같은 명령서(프롬프트)로 다시 시키면 거의 같은 답이 나와요.
+다시 처리하기, 중간 단계 실패 후 재시도, 버튼 두 번 누르기 같은 경우에
+AI를 다시 부르지 않고 예전 답을 꺼내줍니다.
+열쇠는 서비스/모델/명령서 버전/설정값/입력 글 전체를 묶어서 만들기 때문에, 하나라도 다르면 새로 물어봅니다.
+"""
+# -*- coding: utf-8 -*-
+import os
+import time
+import asyncio
+import logging
+import threading
+
+from ..core.cache import DiskCache, make_cache_key
+from ..settings import (
+    CACHE_DIR,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL_SEC,
+    LLM_PROMPT_VERSION
+)
+
+_cache = None  # LLM 응답 캐시가 한 번만 만들어지도록 저장해두는 변수
+_cache_lock = threading.Lock()
+_enabled = LLM_CACHE_ENABLED
+
+def get_response_cache() -> DiskCache:
+    """LLM 응답용 디스크 캐시를 생성하거나 이미 생성된 캐시를 반환합니다."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(os.path.join(CACHE_DIR, "llm"), LLM_CACHE_MAX_BYTES)
+    return _cache
+
+def set_response_cache_enabled(enabled: bool):
+    """LLM 응답 캐시를 켜거나 끕니다. (끄면 항상 AI에게 새로 물어보고, 결과도 저장하지 않습니다.)"""
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_response_cache_enabled() -> bool:
+    # 환경 변수 LLM_CACHE_BYPASS=1 로도 잠시 끌 수 있습니다.
+    return _enabled and os.environ.get("LLM_CACHE_BYPASS", "") not in ("1", "true", "True")
+
+def _lookup(provider: str, model: str, params: dict, inputs):
+    """(내부용) 캐시 키와, 아직 유효한 예전 응답(없으면 None)을 반환합니다."""
+    cache = get_response_cache()
+    key = make_cache_key("llm", provider, model, LLM_PROMPT_VERSION, params, inputs)
+    entry = cache.get(key)
+    if entry and time.time() - entry.get("created", 0) <= LLM_CACHE_TTL_SEC:
+        logging.info(f"LLM 응답 캐시 적중 ({provider}/{model}). (누적 {cache.stats()})")
+        return key, entry["response"]
+    return key, None
+
+def _store(key: str, response):
+    if response:
+        get_response_cache().set(key, {"created": time.time(), "response": response})
+
+async def acached_response(provider: str, model: str, params: dict, inputs, compute):
+    """
+    같은 요청에 대한 예전 응답이 있으면 돌려주고, 없으면 compute()로 새로 받아 저장합니다.
+    compute()가 예외를 던지면 저장하지 않고 그대로 던집니다. (실패한 응답은 기억하지 않습니다.)
+    캐시 파일 읽기/쓰기(용량 정리 포함)는 다른 스레드에서 해서, 모든 LLM 요청이 함께 쓰는 이벤트 루프를 막지 않습니다.
+
+    Args:
+        provider (str): 서비스 이름 (예: "openai", "gemini").
+        model (str): 모델 이름.
+        params (dict): 응답에 영향을 주는 설정값 (temperature, response_format 등).
+        inputs: 프롬프트 전체 (메시지 목록 또는 템플릿과 변수). JSON으로 바꿀 수 있어야 합니다.
+        compute (callable): 인자 없이 호출하면 응답 문자열을 돌려주는 코루틴을 만드는 함수.
+
+    Returns:
+        str: LLM 응답.
+    """
+    if not is_response_cache_enabled():
+        return await compute()
+    key, response = await asyncio.to_thread(_lookup, provider, model, params, inputs)
+    if response is not None:
+        return response
+    response = await compute()
+    await asyncio.to_thread(_store, key, response)
+    return response
+
+def response_cache_stats() -> dict:
+    """LLM 응답 캐시의 적중(hit)/실패(miss) 횟수를 반환합니다."""
+    return get_response_cache().stats()
@@ -1,71 +1,167 @@
 """
 [ai-seong-han-juni]
 이 파일은 '회의록 요약 담당자'의 역할을 합니다.
-이 담당자는 길고 복잡한 회의록 전체를 받아서, 어떤 AI 모델(GPT 또는 Gemini)을 쓸지 확인하고,
+이 담당자는 길고 복잡한 회의록 전체를 받아서, 선택된 AI 모델의 공급자를 '접수 창구(providers.py)'에서 받고,
 AI에게 "이 회의 내용을 핵심만 뽑아서 보기 좋게 정리해줘!" 라고 요청하는 일을 합니다.
 결과물은 보통 JSON이라는 구조화된 형식으로 나와서, 나중에 웹사이트에 보여주기 좋습니다.
+회의록이 너무 길면 한 번에 읽히지 않고 나눠서 요약한 뒤(map), 조각 요약들을 모아 최종 요약을 만듭니다(reduce).
 """
 # -*- coding: utf-8 -*-
 import logging
 import re
+import asyncio
 
-# 우리가 만든 '플러그'와 '명령서'를 가져옵니다.
-from .llm_clients import get_openai_client, get_gemini_chain
+# 우리가 만든 '접수 창구'와 '명령서'를 가져옵니다.
+from .providers import get_provider, run_sync
 from .prompts import (
     MEETING_SUMMARY_SYSTEM_PROMPT,
     MEETING_SUMMARY_USER_PROMPT,
-    GEMINI_SUMMARY_PROMPT_TEMPLATE
+    GPT_CHUNK_SUMMARY_SYSTEM_PROMPT,
+    GPT_CHUNK_SUMMARY_USER_PROMPT,
+    GPT_FINAL_SUMMARY_SYSTEM_PROMPT,
+    COMBINED_CHUNK_SUMMARY_HEADER
 )
+from ..settings import (
+    SUMMARY_MODE,
+    SUMMARY_SINGLE_MAX_TOKENS,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAX_WORKERS
+)
+
+_encoder = None  # 토큰 수를 세는 인코더가 한 번만 만들어지도록 저장해두는 변수
+
+def count_tokens(text: str) -> int:
+    """GPT-4o 기준 토큰 수를 셉니다. (tiktoken이 없으면 글자 수로 대략 계산합니다.)"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    # 한국어는 대략 한 글자가 1토큰 안팎이므로, 넉넉하게 글자 수를 그대로 씁니다.
+    return len(text)
+
+def split_by_token_budget(text: str, max_tokens: int) -> list:
+    """
+    대화록을 화자 발화(줄) 경계에서 잘라, 조각마다 max_tokens를 넘지 않게 나눕니다.
+    한 줄이 혼자서 max_tokens를 넘으면 그 줄만 글자 단위로 나눕니다.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        tokens = count_tokens(line) + 1 # 줄바꿈 몫
+        if tokens > max_tokens:
+            step = max(1, len(line) * max_tokens // tokens)
+            pieces = [line[i:i + step] for i in range(0, len(line), step)]
+        else:
+            pieces = [line]
+        for piece in pieces:
+            piece_tokens = min(tokens, max_tokens)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
 
-def _summarize_with_gpt(client, text, topic, keywords):
-    """(내부용) GPT-4o를 사용하여 텍스트를 JSON 형식으로 요약합니다."""
-    logging.info("GPT-4o를 사용하여 JSON 요약을 시작합니다.")
+async def _asummarize_json(provider, text, topic, keywords, system_prompt=MEETING_SUMMARY_SYSTEM_PROMPT,
+                           on_token=None):
+    """(내부용) 텍스트를 JSON 형식으로 요약합니다. 실패하면 오류 JSON을 반환합니다."""
+    logging.info(f"{provider.model}을(를) 사용하여 JSON 요약을 시작합니다.")
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"}, # 응답을 JSON 형식으로 받도록 요청
-            messages=[
-                {"role": "system", "content": MEETING_SUMMARY_SYSTEM_PROMPT},
-                {"role": "user", "content": MEETING_SUMMARY_USER_PROMPT.format(
-                    topic=topic, 
-                    keywords=', '.join(keywords), 
-                    text=text
-                )}
-            ],
+        result = await provider.acomplete(
+            provider.messages(system_prompt, MEETING_SUMMARY_USER_PROMPT.format(
+                topic=topic,
+                keywords=', '.join(keywords),
+                text=text
+            )),
             temperature=0.5,
+            json_mode=True, # 응답을 JSON 형식으로 받도록 요청 (지원하는 공급자만)
+            on_token=on_token,
         )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.error(f"GPT-4o JSON 요약 중 오류 발생: {e}")
-        return "{\"error\": \"GPT-4o 요약 생성에 실패했습니다.\"}"
-
-def _summarize_with_gemini(text, topic, keywords):
-    """(내부용) Gemini를 사용하여 텍스트를 JSON 형식으로 요약합니다."""
-    logging.info("Gemini 2.5 Pro를 사용하여 JSON 요약을 시작합니다.")
-    chain = get_gemini_chain(GEMINI_SUMMARY_PROMPT_TEMPLATE, ["text", "topic", "keywords"])
-    if not chain: 
-        return "{\"error\": \"Gemini 체인 생성에 실패했습니다.\"}"
-    try:
-        result = chain.run(text=text, topic=topic, keywords=", ".join(keywords))
         # LLM 응답에서 JSON 코드 블록(```json ... ```)을 정리하고 순수한 JSON만 추출
         match = re.search(r'```json\n(.*?)\n```', result, re.DOTALL)
         if match:
             return match.group(1).strip()
         return result.strip()
     except Exception as e:
-        logging.error(f"Gemini JSON 요약 중 오류 발생: {e}")
-        return "{\"error\": \"Gemini 요약 생성에 실패했습니다.\"}"
+        logging.error(f"{provider.model} JSON 요약 중 오류 발생: {e}")
+        return f"{{\"error\": \"{provider.model} 요약 생성에 실패했습니다.\"}}"
+
+async def _asummarize_chunk(provider, chunk, topic, keywords):
+    """(내부용) 대화록 조각 하나를 짧은 글로 요약합니다. (map 단계)"""
+    response = await provider.acomplete(
+        provider.messages(GPT_CHUNK_SUMMARY_SYSTEM_PROMPT, GPT_CHUNK_SUMMARY_USER_PROMPT.format(
+            topic=topic,
+            keywords=', '.join(keywords),
+            chunk=chunk
+        )),
+        temperature=0.3,
+    )
+    return response.strip()
+
+async def _amap_reduce_summarize(provider, text, topic, keywords, on_token=None):
+    """
+    (내부용) 긴 대화록을 토큰 예산에 맞춰 나누고, 조각들을 동시에 요약한 뒤(map),
+    조각 요약들을 모아 기존과 같은 JSON 스키마(decisions, action_items, key_points)로 합칩니다(reduce).
+    동시에 요약하는 조각은 SUMMARY_MAX_WORKERS개를 넘지 않습니다.
+    """
+    chunks = split_by_token_budget(text, SUMMARY_CHUNK_TOKENS)
+    logging.info(f"대화록을 {len(chunks)}개 조각으로 나눠 동시에 요약합니다. (조각당 최대 {SUMMARY_CHUNK_TOKENS}토큰)")
+    semaphore = asyncio.Semaphore(SUMMARY_MAX_WORKERS)
+
+    async def summarize_chunk(chunk):
+        async with semaphore:
+            return await _asummarize_chunk(provider, chunk, topic, keywords)
+
+    results = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks), return_exceptions=True)
+    chunk_summaries = []
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            logging.error(f"조각 요약 중 오류 발생 (조각 {index + 1}/{len(chunks)}): {result}")
+            result = ""
+        chunk_summaries.append(result)
+
+    if not any(chunk_summaries):
+        return "{\"error\": \"조각 요약 생성에 실패했습니다.\"}"
+    combined = "\n\n".join(
+        f"[부분 {i + 1}/{len(chunks)}]\n{summary}" for i, summary in enumerate(chunk_summaries) if summary
+    )
+    combined = f"{COMBINED_CHUNK_SUMMARY_HEADER}\n\n{combined}"
+    return await _asummarize_json(provider, combined, topic, keywords,
+                                  system_prompt=f"{GPT_FINAL_SUMMARY_SYSTEM_PROMPT}\n{MEETING_SUMMARY_SYSTEM_PROMPT}",
+                                  on_token=on_token)
+
+async def asummarize_text(llm_choice, text, topic, keywords, mode=SUMMARY_MODE, on_token=None):
+    """
+    선택된 LLM을 사용하여 텍스트를 요약합니다. (비동기)
 
-def summarize_text(llm_choice, text, topic, keywords):
-    """선택된 LLM을 사용하여 텍스트를 요약합니다."""
+    Args:
+        mode (str): "single"(한 번에 요약), "map_reduce"(나눠서 요약 후 통합),
+            "auto"(SUMMARY_SINGLE_MAX_TOKENS보다 길면 map_reduce).
+        on_token (callable, optional): 최종 요약 응답을 조각(토큰)이 도착하는 대로 받는 함수.
+            (map_reduce에서는 조각 요약이 아니라 마지막 통합 요약만 흘려보냅니다.)
+    """
     logging.info(f"LLM({llm_choice})으로 텍스트 요약을 시작합니다...")
-    if llm_choice == "gpt-4o":
-        client = get_openai_client()
-        if not client: return "{\"error\": \"OpenAI 클라이언트 초기화 실패\"}"
-        return _summarize_with_gpt(client, text, topic, keywords)
-    elif llm_choice == "gemini-2.5-pro":
-        return _summarize_with_gemini(text, topic, keywords)
-    else:
-        logging.warning(f"지원하지 않는 LLM 모델({llm_choice})입니다. 요약을 건너<0xEB><0x9B><0x81>니다.")
+    provider = get_provider(llm_choice)
+    if not provider:
+        logging.warning(f"지원하지 않는 LLM 모델({llm_choice})입니다. 요약을 건너뜁니다.")
         return "{\"error\": \"지원하지 않는 모델입니다.\"}"
+    if mode == "auto":
+        mode = "map_reduce" if count_tokens(text) > SUMMARY_SINGLE_MAX_TOKENS else "single"
+    if mode == "map_reduce":
+        return await _amap_reduce_summarize(provider, text, topic, keywords, on_token=on_token)
+    return await _asummarize_json(provider, text, topic, keywords, on_token=on_token)
 
+def summarize_text(llm_choice, text, topic, keywords, mode=SUMMARY_MODE, on_token=None):
+    """
+    asummarize_text를 동기 코드에서 부르기 위한 함수입니다. (인자와 반환값은 같습니다.)
+    on_token은 LLM 공급자 루프의 스레드에서 불립니다.
+    """
+    return run_sync(asummarize_text(llm_choice, text, topic, keywords, mode, on_token))
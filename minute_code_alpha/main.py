@@ -15,8 +15,13 @@ from .ui.layout import create_ui
 from .settings import (
     DATA_DIR,
     RESULTS_DIR,
-    TEMP_DIR
+    TEMP_DIR,
+    CACHE_DIR,
+    SPEAKER_INDEX_DIR,
+    DIARIZATION_PRELOAD
 )
+# '화자 분리 담당자'의 모델을 앱 시작 시 미리 불러오기 위해 가져옵니다.
+from .audio.diarization import get_diarization_engine
 
 # --- 기본 설정 및 디렉터리 생성 ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,12 +29,19 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 def setup_directories():
     """프로젝트에 필요한 모든 디렉터리를 생성합니다."""
     # '규칙집'에 정의된 폴더들을 만듭니다.
-    dir_paths = [DATA_DIR, RESULTS_DIR, TEMP_DIR]
+    dir_paths = [DATA_DIR, RESULTS_DIR, TEMP_DIR, CACHE_DIR, SPEAKER_INDEX_DIR]
     
     for path in dir_paths:
         os.makedirs(path, exist_ok=True) # 폴더가 없으면 만들고, 있으면 그냥 넘어갑니다.
         logging.info(f"Directory '{path}' is ready.")
 
+    # 설정에 따라 화자 분리 모델을 미리 불러와, 첫 회의 처리 때 로딩 시간을 기다리지 않도록 합니다.
+    if DIARIZATION_PRELOAD:
+        try:
+            get_diarization_engine().warm_up()
+        except Exception as e:
+            logging.warning(f"화자 분리 모델 미리 불러오기에 실패했습니다. 첫 요청 시 다시 시도합니다: {e}")
+
 # --- 애플리케이션 실행 ---
 if __name__ == "__main__":
     # 1. 필요한 폴더들을 미리 만들어둡니다.
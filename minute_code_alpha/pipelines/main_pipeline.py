@@ -4,32 +4,58 @@
 회의록을 처리하는 모든 과정을 총괄하고 지시하는 역할을 하죠.
 음성 파일을 받아서, '화자 분리 담당자', 'STT 담당자', '교정 담당자', '키워드 추출 담당자', '요약 담당자'에게
 순서대로 일을 시키고, 마지막으로 '사서'에게 결과물을 저장하라고 지시합니다.
+STT 이후의 일들은 '작업 순서표 담당자(stage_graph.py)'에게 맡겨서, 서로 기다릴 필요가 없는 일은 동시에 진행합니다.
 """
 # -*- coding: utf-8 -*-
 import os
 import time
+import queue
 import logging
-import concurrent.futures
-from pydub import AudioSegment
+import threading
 import re
 import uuid
 from slugify import slugify
 
 # 우리가 만든 모듈들을 가져옵니다.
 from ..settings import (
-    TEMP_DIR,
-    STT_MODEL,
+    STT_BACKEND,
+    STT_PIPELINED,
+    STT_PIPELINE_SHORT_FILES,
+    STT_PIPELINE_QUEUE_SIZE,
+    STT_PIPELINE_WINDOW_SEC,
+    STT_PIPELINE_WINDOW_OVERLAP_SEC,
+    AVAILABLE_DIARIZATION_BACKENDS,
+    DIARIZATION_BACKEND,
+    DIARIZATION_WINDOWED_MIN_SEC,
+    DIARIZATION_WINDOW_SEC,
+    DIARIZATION_WINDOW_OVERLAP_SEC,
+    VAD_ENABLED,
+    SPEAKER_INDEX_ENABLED,
+    SPEAKER_INDEX_SPACES,
+    PIPELINE_MAX_WORKERS,
     RESULTS_DIR
 )
-from ..config import check_api_keys # API 키 확인 담당
+from ..config import check_api_keys, get_api_key # API 키 확인 담당
 
-from ..llm.llm_clients import get_openai_client # OpenAI 클라이언트 생성
-from ..llm.correct import correct_text # 텍스트 교정 담당
+from ..llm.correct import correct_segments # 텍스트 교정 담당
 from ..llm.summarize import summarize_text # 요약 담당
 from ..llm.keywords import extract_keywords # 키워드 추출 담당
-from ..audio.diarization import diarize_audio # 화자 분리 담당
-from ..audio.stt import transcribe_segment # STT 담당
-from ..core.file_io import save_results # 파일 저장 담당
+from ..llm.response_cache import response_cache_stats # LLM 응답 '기억 창고'
+from ..audio.diarization import diarize_audio, annotation_to_turns, iter_windowed_diarization # 화자 분리 담당
+from ..audio.stt_backends import get_stt_backend # STT 담당 (API 또는 로컬)
+from ..audio.stt import UploadStats # 회의 하나의 업로드 크기 집계
+from ..core.rate_limit import RequestStats # 회의 하나의 API 요청/재시도/거절 집계
+from ..audio.segments import pack_turns # STT 전 구간 정리 담당
+from ..audio.audio_source import WavAudioSource # 메모리맵 오디오 원본
+from ..audio.vad import compute_speech_mask, trim_turns # 침묵 다듬기 담당
+from ..audio.audio_cache import ( # 화자 분리/STT 결과 '기억 창고'
+    load_cached_turns, save_cached_turns, load_cached_speaker_embeddings,
+    load_cached_transcript, save_cached_transcript, load_cached_segments, save_cached_segments
+)
+from ..audio.speaker_index import identify_speakers # 회의를 넘나드는 '목소리 명부'
+from ..core.file_io import create_results_dir, save_transcripts, save_summary, format_transcript_line # 파일 저장 담당
+from ..core.cache import hash_file # 오디오 내용 지문(해시) 계산
+from .stage_graph import StageGraph, StageError # 단계별 작업 순서표
 from ..chatbot.vector_store import update_vector_store 
 
 # STT 프롬프트는 LLM 프롬프트와는 별개로 STT 모델에 직접 전달되므로,
@@ -39,7 +65,265 @@ from ..llm.prompts import STT_PROMPT_TEMPLATE
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def run_pipeline(audio_path: str, llm_choice: str, topic: str, keywords: list):
+_DIARIZATION_DONE = object() # 화자 분리가 모두 끝났음을 알리는 표시
+
+class _LazySpeechMask:
+    """
+    (내부용) 침묵 검출 결과(프레임별 말소리 여부)를 처음 필요할 때 한 번만 계산합니다.
+    다듬은 구간이 모두 캐시에 있으면 파일 전체를 읽는 일 없이 끝납니다.
+    창 단위로 여러 번 다듬어도 회의 전체에서 잘라낸 침묵 길이를 removed_seconds에 모읍니다.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.removed_seconds = 0.0
+        self._result = None
+
+    def get(self):
+        if self._result is None:
+            self._result = compute_speech_mask(self.source)
+        return self._result
+
+def _prepare_segments(turns, audio_hash: str, speech_mask: _LazySpeechMask = None) -> list:
+    """(내부용) 화자 분리 구간을 (선택) VAD로 다듬고 STT 요청 단위로 묶습니다."""
+    if speech_mask is None:
+        # 같은 화자의 이웃 구간은 합치고, 짧은 구간은 버리지 않고 이웃에 붙여 STT 요청 수를 줄입니다.
+        segments_info = pack_turns(turns)
+        logging.info(f"STT 구간 묶기: 요청 {len(turns)}개 -> {len(segments_info)}개")
+        return segments_info
+
+    cached = load_cached_segments(audio_hash, turns)
+    if cached is not None:
+        segments_info, removed_seconds = cached
+        speech_mask.removed_seconds += removed_seconds
+        logging.info(f"캐시된 VAD/구간 묶기 결과를 사용합니다. (구간 {len(segments_info)}개)")
+        return segments_info
+
+    # 구간 앞뒤의 침묵을 잘라내고 긴 쉼에서 구간을 나눕니다.
+    mask, frame_sec = speech_mask.get()
+    trimmed, removed_seconds = trim_turns(turns, mask, frame_sec)
+    speech_mask.removed_seconds += removed_seconds
+    segments_info = pack_turns(trimmed)
+    logging.info(f"STT 구간 묶기: 요청 {len(trimmed)}개 -> {len(segments_info)}개")
+    save_cached_segments(audio_hash, turns, segments_info, removed_seconds)
+    return segments_info
+
+def _transcribe_segments(source, segments_info, audio_hash: str, stt_prompt: str, backend,
+                         upload_stats: UploadStats = None, request_stats: RequestStats = None):
+    """
+    (내부용) 선택된 STT 백엔드로 구간들을 받아쓰기합니다. 캐시에 있는 구간은 다시 보내지 않습니다.
+    upload_stats/request_stats에는 회의 전체의 업로드 크기와 API 요청 상태가 모입니다. (요약은 run_pipeline에서 한 번만 남깁니다.)
+
+    Returns:
+        tuple: (구간별 텍스트 목록, 오류 메시지 또는 None)
+    """
+    # 캐시에 있는 구간은 바로 채우고, 나머지 구간만 STT 백엔드에 보냅니다.
+    transcribed_texts = [""] * len(segments_info)
+    pending_indices = []
+    for index, info in enumerate(segments_info):
+        cached_text = load_cached_transcript(audio_hash, info['start'], info['end'], backend.model_id, stt_prompt)
+        if cached_text is not None:
+            transcribed_texts[index] = cached_text
+        else:
+            pending_indices.append(index)
+    logging.info(f"STT 캐시 적중: {len(segments_info) - len(pending_indices)}/{len(segments_info)}개 구간")
+    if not pending_indices:
+        return transcribed_texts, None
+
+    stt_start_time = time.time()
+    try:
+        pending_texts = backend.transcribe_many(source, [segments_info[i] for i in pending_indices], stt_prompt,
+                                                upload_stats=upload_stats, request_stats=request_stats)
+    except Exception as e:
+        logging.error(f"STT 백엔드({backend.name}) 실행 중 오류 발생: {e}")
+        return transcribed_texts, f"음성 인식({backend.name})에 실패했습니다: {e}"
+
+    for index, text in zip(pending_indices, pending_texts):
+        transcribed_texts[index] = text
+        info = segments_info[index]
+        save_cached_transcript(audio_hash, info['start'], info['end'], backend.model_id, stt_prompt, text)
+
+    stt_end_time = time.time()
+    audio_seconds = sum(segments_info[i]['end'] - segments_info[i]['start'] for i in pending_indices)
+    logging.info(f"음성 인식 완료. (백엔드: {backend.name}, 총 처리 시간: {stt_end_time - stt_start_time:.2f}초, "
+                 f"오디오 {audio_seconds:.1f}초)")
+    return transcribed_texts, None
+
+def _diarize_and_transcribe_pipelined(audio_path: str, source, audio_hash: str, stt_prompt: str, backend,
+                                      speech_mask: _LazySpeechMask = None, windows: tuple = None,
+                                      upload_stats: UploadStats = None, request_stats: RequestStats = None):
+    """
+    (내부용) 창 단위 화자 분리와 STT를 겹쳐서 실행합니다.
+    windows는 (창 길이, 겹침)입니다. None이면 긴 녹음용 창(DIARIZATION_WINDOW_SEC)을 써서 한 번에 처리할 때와 같은 결과가 나옵니다.
+    '화자 분리 담당자'는 별도 스레드에서 창마다 끝난 발화 구간을 대기열에 넣고,
+    'STT 담당자'는 그 구간을 바로 꺼내 받아쓰기합니다. 대기열 크기가 정해져 있어서
+    화자 분리가 너무 앞서 나가면 STT가 따라올 때까지 기다립니다.
+
+    Returns:
+        tuple: (전체 발화 구간 목록, 화자별 임베딩, STT 구간 목록, 구간별 텍스트 목록, 오류 메시지 또는 None)
+    """
+    failed = "화자 분리에 실패했습니다. Pyannote 토큰 또는 오디오 파일을 확인하세요."
+    if not get_api_key("PYANNOTE_TOKEN"):
+        logging.error("PYANNOTE_TOKEN이 없어 화자 분리를 진행할 수 없습니다.")
+        return None, None, None, None, failed
+
+    turn_queue = queue.Queue(maxsize=STT_PIPELINE_QUEUE_SIZE)
+    stop_event = threading.Event() # STT 쪽에서 실패하면 화자 분리도 멈추게 하는 신호
+    failures = []
+    speaker_embeddings = {} # 화자 분리가 모두 끝나면 화자별 평균 임베딩이 채워집니다.
+
+    def put(item) -> bool:
+        # 대기열이 가득 차 있으면 기다리되, 멈춤 신호가 오면 포기합니다.
+        while not stop_event.is_set():
+            try:
+                turn_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            window_sec, overlap_sec = windows or (DIARIZATION_WINDOW_SEC, DIARIZATION_WINDOW_OVERLAP_SEC)
+            for window_turns in iter_windowed_diarization(audio_path, window_sec=window_sec, overlap_sec=overlap_sec,
+                                                          embeddings_out=speaker_embeddings):
+                if not put(window_turns):
+                    return
+        except Exception as e:
+            logging.error(f"화자 분리 중 오류 발생: {e}")
+            failures.append(e)
+        put(_DIARIZATION_DONE)
+
+    start_time = time.time()
+    producer = threading.Thread(target=produce, name="diarization-producer", daemon=True)
+    producer.start()
+
+    turns, segments_info, transcribed_texts = [], [], []
+    error_message = None
+    try:
+        while True:
+            window_turns = turn_queue.get()
+            if window_turns is _DIARIZATION_DONE:
+                break
+            turns.extend([start, end, speaker] for start, end, speaker in window_turns)
+            batch = _prepare_segments(list(window_turns), audio_hash, speech_mask)
+            batch_texts, error_message = _transcribe_segments(source, batch, audio_hash, stt_prompt, backend,
+                                                              upload_stats, request_stats)
+            if error_message:
+                break
+            segments_info.extend(batch)
+            transcribed_texts.extend(batch_texts)
+    finally:
+        stop_event.set()
+    if error_message:
+        return None, None, None, None, error_message
+
+    producer.join()
+    if failures:
+        return None, None, None, None, failed
+
+    # 창 경계에서 이어붙인 발화는 다음 창과 함께 나오므로, 마지막에 시간순으로 다시 정렬합니다.
+    turns.sort()
+    order = sorted(range(len(segments_info)), key=lambda i: (segments_info[i]['start'], segments_info[i]['end']))
+    segments_info = [segments_info[i] for i in order]
+    transcribed_texts = [transcribed_texts[i] for i in order]
+    logging.info(f"화자 분리 + STT 파이프라인 완료. (총 처리 시간: {time.time() - start_time:.2f}초)")
+    return turns, speaker_embeddings, segments_info, transcribed_texts, None
+
+def _collection_name(audio_path: str) -> str:
+    """(내부용) 오디오 파일 이름으로 ChromaDB 컬렉션 기본 이름을 만듭니다."""
+    base_filename = os.path.splitext(os.path.basename(audio_path))[0]
+    slugified_name = slugify(base_filename, separator='_', lowercase=True, replacements=[['.', '_']])
+    collection_name = re.sub(r'[^a-zA-Z0-9._-]', '_', slugified_name)
+    collection_name = collection_name.strip('_')
+    if not collection_name or len(collection_name) < 3:
+        collection_name = "meeting_" + str(uuid.uuid4())[:8].replace('-', '_')
+    return collection_name
+
+def _index_file(file_path: str, collection_name: str, label: str):
+    """(내부용) 결과 파일 하나를 벡터 저장소에 색인합니다. 실패해도 파이프라인은 계속 진행합니다."""
+    try:
+        if os.path.exists(file_path):
+            update_vector_store(file_path, collection_name)
+            logging.info(f"{label} 벡터 저장소 업데이트 완료: {collection_name}")
+    except Exception as e:
+        logging.error(f"{label} 벡터 저장소 업데이트 중 오류 발생: {e}")
+
+def _build_post_stt_graph(audio_path, llm_choice, topic, keywords, collection_name, on_event) -> StageGraph:
+    """
+    (내부용) STT 이후 단계들의 작업 순서표를 만듭니다.
+
+        correct → keywords → summary → save_summary → index_summary
+        correct → save_transcripts → index_transcript  (키워드/요약과 동시에 진행)
+        results_dir → save_transcripts, save_summary
+
+    교정과 요약은 결과가 도착하는 대로 on_event("transcript", 대화록 전체 글) /
+    on_event("summary_token", 요약 조각)으로 알려줍니다.
+    """
+    def correct(original_transcript):
+        # 교정 전 대화록을 먼저 보여주고, 교정된 줄이 도착할 때마다 그 줄만 바꿔서 다시 보여줍니다.
+        lines = [format_transcript_line(segment) for segment in original_transcript]
+        lines_lock = threading.Lock()
+        on_event("status", "텍스트 교정 중...")
+        on_event("transcript", "\n".join(lines))
+
+        def on_update(corrected):
+            with lines_lock:
+                for index, text in corrected.items():
+                    lines[index] = format_transcript_line(dict(original_transcript[index], text=text))
+                snapshot = "\n".join(lines)
+            on_event("transcript", snapshot)
+
+        # 구간마다 번호를 붙여 창 단위로 동시에 교정하고, 번호로 원래 구간(타임스탬프)에 되돌립니다.
+        corrected_texts = correct_segments(llm_choice, original_transcript, topic, keywords, on_update=on_update)
+        return [
+            {
+                "start": segment['start'], "end": segment['end'],
+                "speaker": segment['speaker'], "text": new_text
+            }
+            for segment, new_text in zip(original_transcript, corrected_texts)
+        ]
+
+    def extract(corrected_transcript):
+        text_for_keywords = "\n".join(seg['text'] for seg in corrected_transcript)
+        extracted_keywords = extract_keywords(llm_choice, text_for_keywords, topic)
+        if not extracted_keywords:
+            logging.warning("키워드 추출에 실패하여 사용자가 입력한 키워드를 사용합니다.")
+            return keywords
+        return extracted_keywords
+
+    def summarize(corrected_transcript, final_keywords):
+        text_for_summary = "\n".join(seg['text'] for seg in corrected_transcript)
+        on_event("status", "회의 요약 작성 중...")
+        return summarize_text(llm_choice, text_for_summary, topic, final_keywords,
+                              on_token=lambda token: on_event("summary_token", token))
+
+    graph = StageGraph("post_stt")
+    graph.add("correct", correct, ["original_transcript"], ["corrected_transcript"])
+    graph.add("keywords", extract, ["corrected_transcript"], ["final_keywords"])
+    graph.add("summary", summarize, ["corrected_transcript", "final_keywords"], ["summary"])
+    graph.add("results_dir", lambda: create_results_dir(RESULTS_DIR, audio_path), [], ["results_path"])
+    graph.add("save_transcripts",
+              lambda results_path, original_transcript, corrected_transcript: save_transcripts(
+                  results_path, audio_path, original_transcript, corrected_transcript),
+              ["results_path", "original_transcript", "corrected_transcript"], ["corrected_txt_path"])
+    graph.add("index_transcript",
+              lambda corrected_txt_path: _index_file(corrected_txt_path, f"{collection_name}_full", "전체 대화록"),
+              ["corrected_txt_path"])
+    graph.add("save_summary",
+              lambda results_path, original_transcript, corrected_transcript, final_keywords, summary: save_summary(
+                  results_path, audio_path, topic, final_keywords, original_transcript, corrected_transcript, summary),
+              ["results_path", "original_transcript", "corrected_transcript", "final_keywords", "summary"],
+              ["summary_md_path"])
+    graph.add("index_summary",
+              lambda summary_md_path: _index_file(summary_md_path, f"{collection_name}_summary", "요약본"),
+              ["summary_md_path"])
+    return graph
+
+def run_pipeline(audio_path: str, llm_choice: str, topic: str, keywords: list, use_vad: bool = VAD_ENABLED,
+                 stt_backend: str = STT_BACKEND, pipelined: bool = STT_PIPELINED,
+                 diarization_backend: str = DIARIZATION_BACKEND, use_speaker_index: bool = SPEAKER_INDEX_ENABLED,
+                 on_event=None):
     """
     메인 처리 파이프라인.
     오디오 파일을 입력받아 화자분리, STT, 교정, 요약 과정을 거쳐 결과를 저장합니다.
@@ -49,6 +333,16 @@ def run_pipeline(audio_path: str, llm_choice: str, topic: str, keywords: list):
         llm_choice (str): 사용할 LLM 모델 (예: 'gpt-4o', 'gemini-2.5-pro').
         topic (str): 회의 주제.
         keywords (list): 회의 주요 키워드 리스트.
+        use_vad (bool): STT 전에 침묵 구간을 잘라내는 VAD 단계 사용 여부.
+        stt_backend (str): 사용할 STT 백엔드 (예: 'openai', 'local').
+        pipelined (bool): 창 단위로 처리하는 긴 녹음에서 pyannote 화자 분리와 STT를 겹쳐 실행할지 여부.
+            (STT_PIPELINE_SHORT_FILES를 켜면 짧은 녹음도 짧은 창으로 나눠 겹쳐 실행합니다.
+            빠른 화자 분리는 STT보다 훨씬 짧게 끝나므로 겹치지 않고 차례로 실행합니다.)
+        diarization_backend (str): 사용할 화자 분리 방식 (예: 'pyannote', 'fast').
+        use_speaker_index (bool): 화자 명부로 이전 회의에 나온 목소리를 알아보고, 명부를 갱신할지 여부.
+        on_event (callable, optional): 진행 상황을 중간중간 받는 함수 on_event(종류, 내용).
+            종류는 "status"(진행 상태 문장), "transcript"(지금까지 교정된 대화록 전체), "summary_token"(요약 조각).
+            여러 스레드에서 불릴 수 있습니다.
 
     Returns:
         tuple: (결과 폴더 경로, 상태 메시지) 튜플.
@@ -56,68 +350,110 @@ def run_pipeline(audio_path: str, llm_choice: str, topic: str, keywords: list):
     logging.info(f"--- 새로운 처리 파이프라인 시작 ---")
     logging.info(f"입력 파일: {audio_path}")
     logging.info(f"선택된 LLM: {llm_choice}")
+    logging.info(f"선택된 STT 백엔드: {stt_backend}")
+    logging.info(f"선택된 화자 분리 방식: {diarization_backend}")
+
+    notify = on_event or (lambda kind, payload: None)
 
     # --- 0. API 키 확인 --- #
-    error_message = check_api_keys(llm_choice)
+    error_message = check_api_keys(llm_choice, diarization_backend, stt_backend)
     if error_message:
         logging.error(error_message)
         return None, error_message
+    try:
+        backend = get_stt_backend(stt_backend)
+    except ValueError as e:
+        logging.error(str(e))
+        return None, str(e)
+    if diarization_backend not in AVAILABLE_DIARIZATION_BACKENDS:
+        logging.error(f"지원하지 않는 화자 분리 방식입니다: {diarization_backend}")
+        return None, f"지원하지 않는 화자 분리 방식입니다: {diarization_backend}"
 
-    # --- 1. 화자 분리 --- #
-    diarization = diarize_audio(audio_path)
-    if not diarization:
-        return None, "화자 분리에 실패했습니다. Pyannote 토큰 또는 오디오 파일을 확인하세요."
+    # 오디오 내용의 지문(해시)으로 이전에 처리한 결과가 있는지 '기억 창고'에서 먼저 찾아봅니다.
+    try:
+        audio_hash = hash_file(audio_path)
+    except OSError as e:
+        logging.error(f"오디오 파일 해시 계산 실패: {e}")
+        return None, f"오디오 파일({os.path.basename(audio_path)})을 열 수 없습니다."
 
-    # --- 2. 병렬 STT 처리 --- #
+    # 파일 전체를 디코딩하지 않고 메모리맵으로 열어, 필요한 구간만 꺼내 씁니다.
     try:
-        audio = AudioSegment.from_wav(audio_path)
+        source = WavAudioSource(audio_path)
     except Exception as e:
         logging.error(f"오디오 파일 로딩 실패: {e}")
         return None, f"오디오 파일({os.path.basename(audio_path)})을 열 수 없습니다."
 
-    stt_prompt = STT_PROMPT_TEMPLATE.format(topic=topic, keywords=', '.join(keywords))
-    client = get_openai_client()
-    if not client:
-        return None, "OpenAI API 클라이언트 초기화에 실패했습니다. .env 파일을 확인하세요."
-
-    tasks = []
-    segments_info = []
-    temp_dir = TEMP_DIR # settings.py에서 가져온 임시 폴더 이름
-    os.makedirs(temp_dir, exist_ok=True) # 임시 폴더 생성
-
-    for i, (turn, _, speaker) in enumerate(diarization.itertracks(yield_label=True)):
-        if turn.end - turn.start < 1.0:
-            continue
-        start_ms = turn.start * 1000
-        end_ms = turn.end * 1000
-        segment_audio = audio[start_ms:end_ms]
-        segment_filename = os.path.join(temp_dir, f"segment_{i}_{int(time.time())}.wav")
-        tasks.append((segment_audio, segment_filename))
-        segments_info.append({'turn': turn, 'speaker': speaker})
-
-    transcribed_texts = [""] * len(tasks)
-    stt_start_time = time.time()
-    
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_to_index = {executor.submit(transcribe_segment, client, task[0], task[1], stt_prompt, STT_MODEL): i for i, task in enumerate(tasks)} # STT_MODEL도 settings.py에서 가져옴
-        
-        for future in concurrent.futures.as_completed(future_to_index):
-            index = future_to_index[future]
-            try:
-                transcribed_texts[index] = future.result()
-            except Exception as exc:
-                logging.error(f"STT 작업 중 오류 발생 (인덱스 {index}): {exc}")
+    with source:
+        # (선택) 침묵 구간은 다듬은 구간이 캐시에 없을 때만, 처음 필요할 때 찾습니다.
+        speech_mask = _LazySpeechMask(source) if use_vad else None
+        stt_prompt = STT_PROMPT_TEMPLATE.format(topic=topic, keywords=', '.join(keywords))
+        upload_stats = UploadStats() # 회의 하나에서 보낸 업로드 크기 집계 (창이 여러 개여도 한 번에 모읍니다)
+        request_stats = RequestStats() # 회의 하나의 Whisper API 요청/재시도/거절 횟수와 동시 요청 한도
 
-    stt_end_time = time.time()
-    logging.info(f"음성 인식 완료. (총 처리 시간: {stt_end_time - stt_start_time:.2f}초)")
+        # 긴 녹음은 어차피 창 단위로 처리하므로 그대로 겹쳐 실행하고, 짧은 녹음은 켜둔 경우에만 짧은 창으로 나눕니다.
+        # (짧은 창으로 나눈 결과는 한 번에 처리한 결과와 다를 수 있어 캐시도 따로 씁니다.)
+        windows = None
+        overlap = pipelined and diarization_backend == "pyannote"
+        if overlap and source.duration < DIARIZATION_WINDOWED_MIN_SEC:
+            overlap = STT_PIPELINE_SHORT_FILES
+            if overlap:
+                windows = (STT_PIPELINE_WINDOW_SEC, STT_PIPELINE_WINDOW_OVERLAP_SEC)
+
+        turns = load_cached_turns(audio_hash, diarization_backend, windows)
+        if turns is None and overlap:
+            # --- 1+2. 화자 분리와 병렬 STT를 겹쳐서 처리 --- #
+            notify("status", "화자 분리 + 음성 인식 중...")
+            turns, speaker_embeddings, segments_info, transcribed_texts, error_message = _diarize_and_transcribe_pipelined(
+                audio_path, source, audio_hash, stt_prompt, backend, speech_mask, windows,
+                upload_stats, request_stats
+            )
+            if error_message:
+                return None, error_message
+            save_cached_turns(audio_hash, turns, diarization_backend, speaker_embeddings, windows)
+        else:
+            # --- 1. 화자 분리 --- #
+            notify("status", "화자 분리 중...")
+            if turns is not None:
+                logging.info(f"캐시된 화자 분리 결과를 사용합니다. (구간 {len(turns)}개)")
+                speaker_embeddings = load_cached_speaker_embeddings(audio_hash, diarization_backend, windows)
+            else:
+                result = diarize_audio(audio_path, backend=diarization_backend, return_embeddings=True)
+                diarization, speaker_embeddings = result if result else (None, {})
+                if not diarization:
+                    return None, "화자 분리에 실패했습니다. Pyannote 토큰 또는 오디오 파일을 확인하세요."
+                turns = annotation_to_turns(diarization)
+                save_cached_turns(audio_hash, turns, diarization_backend, speaker_embeddings)
+
+            # --- 2. 병렬 STT 처리 --- #
+            notify("status", "음성 인식 중...")
+            segments_info = _prepare_segments(turns, audio_hash, speech_mask)
+            transcribed_texts, error_message = _transcribe_segments(source, segments_info, audio_hash, stt_prompt, backend,
+                                                                    upload_stats, request_stats)
+            if error_message:
+                return None, error_message
+
+    # 창 단위로 나눠 처리했더라도 회의 전체의 합계를 한 번만 남깁니다.
+    if speech_mask is not None:
+        logging.info(f"VAD: 침묵 {speech_mask.removed_seconds:.1f}초를 STT 대상에서 제외했습니다.")
+    if upload_stats.segments:
+        logging.info(f"STT {upload_stats.summary()}")
+    if request_stats.requests:
+        logging.info(f"STT 동시 요청 상태 (이번 회의): {request_stats.as_dict()}")
+
+    # 이전 회의에서 본 목소리는 명부의 이름(또는 SPK_0001 같은 번호)으로 바꿔 부릅니다.
+    if use_speaker_index:
+        space = SPEAKER_INDEX_SPACES.get(diarization_backend, diarization_backend)
+        speaker_names = identify_speakers(space, speaker_embeddings, audio_hash)
+        for info in segments_info:
+            info['speaker'] = speaker_names.get(info['speaker'], info['speaker'])
 
     original_transcript = []
     for i, text in enumerate(transcribed_texts):
         if text:
             info = segments_info[i]
             original_transcript.append({
-                "start": info['turn'].start,
-                "end": info['turn'].end,
+                "start": info['start'],
+                "end": info['end'],
                 "speaker": info['speaker'],
                 "text": text
             })
@@ -125,77 +461,17 @@ def run_pipeline(audio_path: str, llm_choice: str, topic: str, keywords: list):
     if not original_transcript:
         return None, "음성 인식 결과가 없습니다."
 
-    # --- 3. LLM 텍스트 교정 --- #
-    full_text_for_correction = "\n".join(f"{seg['speaker']}: {seg['text']}" for seg in original_transcript)
-    corrected_full_text = correct_text(llm_choice, full_text_for_correction, topic, keywords)
-    
-    corrected_lines = corrected_full_text.strip().split('\n')
-    corrected_transcript = []
-    for i, segment in enumerate(original_transcript):
-        new_text = segment['text']
-        if i < len(corrected_lines):
-            parts = corrected_lines[i].split(':', 1)
-            if len(parts) > 1:
-                new_text = parts[1].strip()
-        corrected_transcript.append({
-            "start": segment['start'], "end": segment['end'],
-            "speaker": segment['speaker'], "text": new_text
-        })
-
-    # --- 4. LLM 키워드 추출 --- #
-    text_for_keywords = "\n".join(seg['text'] for seg in corrected_transcript)
-    extracted_keywords = extract_keywords(llm_choice, text_for_keywords, topic)
-    
-    final_keywords = extracted_keywords
-    if not final_keywords:
-        logging.warning("키워드 추출에 실패하여 사용자가 입력한 키워드를 사용합니다.")
-        final_keywords = keywords
-
-    # --- 5. LLM 텍스트 요약 --- #
-    text_for_summary = "\n".join(seg['text'] for seg in corrected_transcript)
-    summary = summarize_text(llm_choice, text_for_summary, topic, final_keywords)
-
-    # --- 6. 결과 저장 --- #
-    results_path = save_results(
-        base_results_dir=RESULTS_DIR, # settings.py에서 가져온 경로 사용
-        original_filename=audio_path,
-        meeting_topic=topic,
-        keywords=final_keywords,
-        original_transcript=original_transcript,
-        corrected_transcript=corrected_transcript,
-        summary=summary
-    )
-    
-    # --- 6. 벡터 저장소 업데이트 --- #
-    if results_path:
-        base_filename = os.path.splitext(os.path.basename(audio_path))[0]
-        
-        # 1. ChromaDB 컬렉션 기본 이름 생성
-        slugified_name = slugify(base_filename, separator='_', lowercase=True, replacements=[['.', '_']])
-        collection_name = re.sub(r'[^a-zA-Z0-9._-]', '_', slugified_name)
-        collection_name = collection_name.strip('_')
-        if not collection_name or len(collection_name) < 3:
-            collection_name = "meeting_" + str(uuid.uuid4())[:8].replace('-', '_')
-
-        # 2. 전체 대화록 저장 ('{collection_name}_full')
-        try:
-            corrected_txt_path = os.path.join(results_path, f"corrected_{base_filename}.txt")
-            full_collection_name = f"{collection_name}_full"
-            if os.path.exists(corrected_txt_path):
-                update_vector_store(corrected_txt_path, full_collection_name)
-                logging.info(f"전체 대화록 벡터 저장소 업데이트 완료: {full_collection_name}")
-        except Exception as e:
-            logging.error(f"전체 대화록 벡터 저장소 업데이트 중 오류 발생: {e}")
-
-        # 3. 요약본 저장 ('{collection_name}_summary')
-        try:
-            summary_md_path = os.path.join(results_path, f"summary_{base_filename}.md")
-            summary_collection_name = f"{collection_name}_summary"
-            if os.path.exists(summary_md_path):
-                update_vector_store(summary_md_path, summary_collection_name)
-                logging.info(f"요약본 벡터 저장소 업데이트 완료: {summary_collection_name}")
-        except Exception as e:
-            logging.error(f"요약본 벡터 저장소 업데이트 중 오류 발생: {e}")
+    # --- 3~6. 교정/키워드/요약/저장/색인 --- #
+    # 단계마다 필요한 재료를 적어두고, 재료가 준비된 단계부터 동시에 실행합니다.
+    # (예: 키워드 추출 → 요약이 진행되는 동안, 교정된 대화록을 먼저 저장하고 벡터 저장소에 색인합니다.)
+    collection_name = _collection_name(audio_path)
+    graph = _build_post_stt_graph(audio_path, llm_choice, topic, keywords, collection_name, notify)
+    try:
+        values, _ = graph.run({"original_transcript": original_transcript}, max_workers=PIPELINE_MAX_WORKERS)
+    except StageError as e:
+        return None, f"'{e.stage}' 단계에서 오류가 발생했습니다: {e.cause}"
+    results_path = values["results_path"]
+    logging.info(f"LLM 응답 캐시 상태: {response_cache_stats()}")
 
     logging.info(f"--- 파이프라인 종료 --- 결과는 '{results_path}'에 저장되었습니다.")
     return results_path, "모든 처리가 완료되었습니다."
@@ -0,0 +1,131 @@
+"""
+[ai-seong-han-juni]
+이 파일은 '작업 순서표 담당자'의 역할을 합니다.
+각 단계(교정, 키워드 추출, 요약, 저장, 검색용 색인 등)가 무엇을 받아서(inputs) 무엇을 만들어내는지(outputs)
+순서표에 적어두면, 이 담당자가 재료가 준비된 단계부터 골라서 일을 시킵니다.
+서로 기다릴 필요가 없는 단계들은 동시에 진행하기 때문에, 예를 들어 요약을 기다리는 동안
+교정된 대화록을 검색용으로 색인하는 일을 먼저 끝낼 수 있어요.
+단계마다 걸린 시간도 기록해서 어디가 느린지 바로 알 수 있습니다.
+"""
+# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+import concurrent.futures
+
+
+class StageError(RuntimeError):
+    """단계 하나가 실패했을 때 발생합니다. 어느 단계에서 실패했는지(stage)와 원래 오류(cause)를 담습니다."""
+
+    def __init__(self, stage: str, cause: BaseException):
+        super().__init__(f"'{stage}' 단계 실패: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+
+class Stage:
+    """순서표의 한 칸. fn은 inputs 이름을 키워드 인자로 받고, outputs 순서대로 값을 돌려줍니다."""
+
+    def __init__(self, name: str, fn, inputs=(), outputs=()):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    def run(self, values: dict) -> dict:
+        result = self.fn(**{name: values[name] for name in self.inputs})
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        return dict(zip(self.outputs, result))
+
+
+class StageGraph:
+    """
+    단계들의 의존 관계(어떤 값이 어떤 단계에서 나오는지)를 보고,
+    준비된 단계부터 스레드 풀에서 동시에 실행하는 작은 작업 스케줄러입니다.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages = []
+        self._producers = {}  # 값 이름 -> 그 값을 만드는 단계 이름
+
+    def add(self, name: str, fn, inputs=(), outputs=()):
+        """단계를 추가합니다. 같은 값을 두 단계가 만들 수는 없습니다."""
+        stage = Stage(name, fn, inputs, outputs)
+        for output in stage.outputs:
+            if output in self._producers:
+                raise ValueError(f"'{output}' 값을 만드는 단계가 이미 있습니다: {self._producers[output]}")
+            self._producers[output] = name
+        self.stages.append(stage)
+        return self
+
+    def _validate(self, initial: dict):
+        """(내부용) 재료를 구할 수 없는 단계나 순환 의존이 없는지 미리 확인합니다."""
+        available = set(initial)
+        remaining = list(self.stages)
+        while remaining:
+            ready = [stage for stage in remaining if all(name in available for name in stage.inputs)]
+            if not ready:
+                missing = {stage.name: [name for name in stage.inputs if name not in available]
+                           for stage in remaining}
+                raise ValueError(f"실행할 수 없는 단계가 있습니다 (재료 없음 또는 순환 의존): {missing}")
+            for stage in ready:
+                available.update(stage.outputs)
+                remaining.remove(stage)
+
+    def run(self, initial: dict = None, max_workers: int = 4):
+        """
+        모든 단계를 의존 관계에 맞춰 실행합니다.
+        한 단계가 실패하면 새 단계는 더 시작하지 않고, 이미 돌고 있는 단계가 끝나기를 기다린 뒤 StageError를 던집니다.
+
+        Args:
+            initial (dict): 처음부터 준비된 값들 {이름: 값}.
+            max_workers (int): 동시에 실행할 최대 단계 수.
+
+        Returns:
+            tuple: (모든 값 {이름: 값}, 단계별 실행 시간 {단계 이름: 초})
+        """
+        values = dict(initial or {})
+        self._validate(values)
+        timings = {}
+        timings_lock = threading.Lock()
+        pending = list(self.stages)
+        failure = None
+        start_time = time.perf_counter()
+
+        def timed(stage, inputs):
+            stage_start = time.perf_counter()
+            try:
+                return stage.run(inputs)
+            finally:
+                with timings_lock:
+                    timings[stage.name] = time.perf_counter() - stage_start
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while pending or running:
+                if failure is None:
+                    for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                        pending.remove(stage)
+                        running[executor.submit(timed, stage, dict(values))] = stage
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        values.update(future.result())
+                    except Exception as e:
+                        logging.error(f"[{self.name}] '{stage.name}' 단계 중 오류 발생: {e}")
+                        if failure is None:
+                            failure = StageError(stage.name, e)
+
+        total = time.perf_counter() - start_time
+        summary = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+        logging.info(f"[{self.name}] 단계별 처리 시간: {summary} (전체 {total:.2f}s)")
+        if failure is not None:
+            raise failure
+        return values, timings
@@ -0,0 +1,128 @@
+"""
+[ai-seong-han-juni]
+이 파일은 챗봇 그래프의 '순수 오버헤드' 측정기입니다.
+진짜 LLM과 벡터 저장소 대신, 정해진 답을 바로 돌려주는 가짜 LLM과 가짜 리트리버를 넣어서
+네트워크 시간을 0으로 만든 뒤, 질문 하나가 그래프를 한 바퀴 도는 데 걸리는 시간만 잽니다.
+비교를 위해 노드용 체인(prompt | llm | parser)을 새로 만드는 비용도 함께 보여줍니다.
+(예전에는 질문마다 이 비용을 냈고, 지금은 그래프를 만들 때 한 번만 냅니다.)
+
+--latency-ms를 주면 가짜 LLM이 호출마다 그만큼 기다리므로,
+문서 평가 방식(sequential / batch / single)별로 질문당 걸리는 시간을 비교할 수 있습니다.
+
+실행 예:
+    python -m minute_code_alpha.scripts.bench_crag_graph --questions 200 --docs 4
+    python -m minute_code_alpha.scripts.bench_crag_graph --questions 5 --docs 8 --latency-ms 300
+"""
+# -*- coding: utf-8 -*-
+import io
+import json
+import time
+import argparse
+import contextlib
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import SimpleChatModel
+
+from ..chatbot.graph import build_crag_app
+from ..chatbot.nodes import build_crag_chains
+from ..chatbot.prompts import (
+    ROUTER_SYSTEM_PROMPT, CHATBOT_GRADER_SYSTEM_PROMPT, CHATBOT_BATCH_GRADER_SYSTEM_PROMPT,
+    GENERATION_VALIDATOR_SYSTEM_PROMPT
+)
+from ..settings import AVAILABLE_CHATBOT_GRADING_MODES
+
+
+class _FakeRetriever:
+    """(내부용) 항상 같은 문서 n_docs개를 돌려주는 리트리버."""
+
+    def __init__(self, n_docs: int):
+        self.documents = [Document(page_content=f"회의 내용 조각 {i}: 다음 주까지 배포 일정을 확정하기로 했다.")
+                          for i in range(n_docs)]
+
+    def invoke(self, question):
+        return [Document(page_content=doc.page_content) for doc in self.documents]
+
+class _FakeChatLLM(SimpleChatModel):
+    """
+    (내부용) 시스템 프롬프트를 보고 어느 노드의 호출인지 알아낸 뒤, 그 노드에 맞는 답을 돌려주는 가짜 LLM.
+    응답 순서에 기대지 않으므로 문서 평가를 동시에(batch) 불러도 안전합니다.
+    """
+    n_docs: int = 4
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-crag"
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        system = messages[0].content
+        if system == ROUTER_SYSTEM_PROMPT:
+            return json.dumps({"target_db": "summary_db", "confidence": 0.9, "rationale": "요약으로 충분"})
+        if system == CHATBOT_GRADER_SYSTEM_PROMPT:
+            return json.dumps({"relevant": "yes", "reason": "배포 일정 언급"})
+        if system == CHATBOT_BATCH_GRADER_SYSTEM_PROMPT:
+            return json.dumps({"grades": [{"document": f"D{i+1}", "relevant": "yes", "reason": "배포 일정 언급"}
+                                          for i in range(self.n_docs)]})
+        if system == GENERATION_VALIDATOR_SYSTEM_PROMPT:
+            return json.dumps({"grounded": True, "missing_evidence": [], "suggested_fix": ""})
+        return "배포 일정은 다음 주까지 확정합니다. [D1]"
+
+def make_fake_llm(n_docs: int, latency_ms: float = 0.0) -> _FakeChatLLM:
+    """노드마다 정해진 답을, 호출마다 latency_ms만큼 기다린 뒤 돌려주는 가짜 LLM."""
+    return _FakeChatLLM(n_docs=n_docs, latency_ms=latency_ms)
+
+def run_benchmark(n_questions: int, n_docs: int, grading_mode: str = "batch", latency_ms: float = 0.0) -> dict:
+    """가짜 LLM으로 그래프를 n_questions번 실행하고, 질문당 그래프 처리 시간과 체인 생성 비용을 잽니다."""
+    llm = make_fake_llm(n_docs, latency_ms)
+    retriever = _FakeRetriever(n_docs)
+
+    build_start = time.perf_counter()
+    app = build_crag_app(llm, retriever_factory=lambda collection_name: retriever, grading_mode=grading_mode)
+    build_seconds = time.perf_counter() - build_start
+
+    inputs = {"question": "배포 일정은 언제 확정하나요?", "base_collection_name": "bench", "final_answer": None}
+    with contextlib.redirect_stdout(io.StringIO()): # 노드들의 진행 로그는 숨깁니다.
+        app.invoke(inputs) # 첫 실행의 준비 비용은 빼고 잽니다.
+        start = time.perf_counter()
+        for _ in range(n_questions):
+            result = app.invoke(inputs)
+        graph_seconds = time.perf_counter() - start
+    if not result.get("final_answer"):
+        raise RuntimeError(f"그래프가 최종 답변을 만들지 못했습니다: {result}")
+
+    start = time.perf_counter()
+    for _ in range(n_questions):
+        build_crag_chains(llm)
+    chain_seconds = time.perf_counter() - start
+
+    return {
+        "questions": n_questions,
+        "docs": n_docs,
+        "grading_mode": grading_mode,
+        "latency_ms": latency_ms,
+        "app_build_ms": build_seconds * 1000,
+        "graph_ms_per_question": graph_seconds * 1000 / n_questions,
+        "chain_build_ms_per_question": chain_seconds * 1000 / n_questions,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 LLM으로 CRAG 챗봇 그래프의 질문당 처리 시간 측정")
+    parser.add_argument("--questions", type=int, default=100, help="실행할 질문 수")
+    parser.add_argument("--docs", type=int, default=4, help="검색 결과 문서 수")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="가짜 LLM 호출 한 번에 걸리는 시간 (ms)")
+    parser.add_argument("--grading-modes", nargs="+", default=AVAILABLE_CHATBOT_GRADING_MODES,
+                        choices=AVAILABLE_CHATBOT_GRADING_MODES, help="비교할 문서 평가 방식")
+    args = parser.parse_args()
+
+    print(f"질문 {args.questions}개, 문서 {args.docs}개, LLM 호출당 {args.latency_ms:.0f} ms")
+    for mode in args.grading_modes:
+        r = run_benchmark(args.questions, args.docs, mode, args.latency_ms)
+        print(f"[{mode}]")
+        print(f"  그래프 생성 (체인 포함, 1회):      {r['app_build_ms']:8.2f} ms")
+        print(f"  질문당 그래프 처리 시간:           {r['graph_ms_per_question']:8.2f} ms")
+        print(f"  질문당 체인 재생성 비용 (이전 방식): {r['chain_build_ms_per_question']:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+[ai-seong-han-juni]
+이 파일은 STT 백엔드들의 '달리기 시합' 심판입니다.
+같은 오디오 파일을 Whisper API(openai)와 로컬 CPU(local)로 각각 받아쓰게 하고,
+오디오 1초를 처리하는 데 몇 초가 걸렸는지(실시간 배율, RTF)를 비교해서 보여줍니다.
+RTF가 1보다 작으면 녹음 길이보다 빨리 받아쓴다는 뜻이에요.
+
+실행 예:
+    python -m minute_code_alpha.scripts.bench_stt --audio data/sample.wav --backends openai local
+"""
+# -*- coding: utf-8 -*-
+import time
+import argparse
+
+from ..audio.audio_source import WavAudioSource
+from ..audio.vad import compute_speech_mask, trim_turns
+from ..audio.segments import pack_turns
+from ..audio.stt_backends import get_stt_backend
+from ..settings import AVAILABLE_STT_BACKENDS
+
+
+def build_segments(source, max_segments: int = None) -> list:
+    """화자 분리 없이 VAD로 말소리 구간만 찾아 STT 요청 단위로 묶습니다. (백엔드끼리 같은 입력을 쓰기 위함)"""
+    speech_mask, frame_sec = compute_speech_mask(source)
+    turns, _ = trim_turns([[0.0, source.duration, "SPEAKER"]], speech_mask, frame_sec)
+    segments = pack_turns(turns)
+    return segments[:max_segments] if max_segments else segments
+
+def run_benchmark(audio_path: str, backend_names: list, max_segments: int = None, prompt: str = "") -> list:
+    """백엔드별로 받아쓰기 시간과 RTF를 측정합니다."""
+    results = []
+    with WavAudioSource(audio_path) as source:
+        segments = build_segments(source, max_segments)
+        audio_seconds = sum(seg['end'] - seg['start'] for seg in segments)
+        print(f"오디오: {audio_path} (구간 {len(segments)}개, 말소리 {audio_seconds:.1f}초)")
+
+        for name in backend_names:
+            backend = get_stt_backend(name)
+            # 로컬 모델은 처음 불러오는 시간이 크므로, 한 구간으로 미리 불러온 뒤 재는 것이 공정합니다.
+            if segments:
+                backend.transcribe_many(source, segments[:1], prompt)
+
+            start_time = time.perf_counter()
+            texts = backend.transcribe_many(source, segments, prompt)
+            elapsed = time.perf_counter() - start_time
+
+            results.append({
+                "backend": name,
+                "model": backend.model_id,
+                "seconds": elapsed,
+                "rtf": elapsed / audio_seconds if audio_seconds else float("nan"),
+                "empty_segments": sum(1 for text in texts if not text),
+                "characters": sum(len(text) for text in texts),
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="STT 백엔드별 실시간 배율(RTF) 비교")
+    parser.add_argument("--audio", required=True, help="측정할 WAV 파일 경로")
+    parser.add_argument("--backends", nargs="+", default=AVAILABLE_STT_BACKENDS, choices=AVAILABLE_STT_BACKENDS)
+    parser.add_argument("--max-segments", type=int, default=None, help="측정에 사용할 최대 구간 수")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.audio, args.backends, args.max_segments)
+    print(f"{'backend':<8} {'model':<32} {'time(s)':>9} {'RTF':>7} {'empty':>6} {'chars':>7}")
+    for r in results:
+        print(f"{r['backend']:<8} {r['model']:<32} {r['seconds']:>9.2f} {r['rtf']:>7.3f} "
+              f"{r['empty_segments']:>6} {r['characters']:>7}")
+
+
+if __name__ == "__main__":
+    main()
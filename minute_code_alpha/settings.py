@@ -17,15 +17,148 @@ DATA_DIR = os.path.join(ROOT_DIR, "data")
 RESULTS_DIR = os.path.join(ROOT_DIR, "results")
 TEMP_DIR = os.path.join(ROOT_DIR, "temp")
 CHROMA_PERSIST_DIR = os.path.join(ROOT_DIR, "chroma_db")
+CACHE_DIR = os.path.join(ROOT_DIR, "cache")
+SPEAKER_INDEX_DIR = os.path.join(ROOT_DIR, "speakers")
 
 
 # --- 모델 및 처리 설정 ---
 # STT 모델
 STT_MODEL = "whisper-1"
 
+# STT 백엔드: "openai"(Whisper API) 또는 "local"(CPU에서 돌리는 faster-whisper, CTranslate2 int8)
+AVAILABLE_STT_BACKENDS = ["openai", "local"]
+STT_BACKEND = "openai"
+LOCAL_STT_MODEL = "medium"          # faster-whisper 모델 크기 또는 경로
+LOCAL_STT_COMPUTE_TYPE = "int8"     # CPU에서는 int8 양자화가 가장 빠릅니다
+LOCAL_STT_CPU_THREADS = 4           # 추론에 사용할 CPU 스레드 수
+LOCAL_STT_BATCH_SIZE = 8            # 한 번의 추론에 함께 넣을 구간 수
+# Whisper에 올릴 오디오 형식 ("flac", "opus", "wav")과 샘플레이트.
+# 16kHz 모노로 줄여 압축해서 보내면 업로드 크기가 크게 줄어듭니다.
+STT_UPLOAD_FORMAT = "flac"
+STT_UPLOAD_SAMPLE_RATE = 16000
+STT_OPUS_BITRATE = "32k"
+
+# Whisper API 동시 요청 조절: 토큰 버킷(분당 요청 수/오디오 초) + 지연 시간 기반 AIMD + 재시도
+STT_MIN_CONCURRENCY = 1
+STT_INITIAL_CONCURRENCY = 4
+STT_MAX_CONCURRENCY = 16
+STT_MAX_REQUESTS_PER_MIN = 300
+STT_MAX_AUDIO_SEC_PER_MIN = 3600
+STT_LATENCY_TARGET_SEC = 10.0   # 요청 하나가 이보다 오래 걸리면 동시 요청 수를 줄입니다
+STT_MAX_RETRIES = 4
+
+# STT 전 구간 묶기(turn packing): 같은 화자의 이웃 구간을 합치고, 짧은 구간은 이웃에 붙여 요청 수를 줄입니다.
+STT_PACK_MAX_SEC = 30.0      # 합친 구간의 최대 길이 (초)
+STT_PACK_MIN_SEC = 1.0       # 이보다 짧은 구간은 이웃 구간에 붙입니다 (초)
+STT_PACK_MAX_GAP_SEC = 0.5   # 이 간격(초) 이내로 떨어진 구간끼리만 합칩니다
+
+# STT 전 음성 구간 검출(VAD): 구간 앞뒤의 침묵을 잘라내고, 긴 침묵에서 구간을 나눠 Whisper 과금 시간을 줄입니다.
+# 켜면 대화록의 구간 경계(타임스탬프)가 달라지므로, 선택해서 쓰는 단계로 기본은 꺼둡니다.
+VAD_ENABLED = False
+VAD_FRAME_SEC = 0.03        # 에너지를 계산할 프레임 길이 (초)
+VAD_MARGIN_DB = 12.0        # 배경 소음 수준보다 이만큼(dB) 커야 말소리로 봅니다
+VAD_MIN_THRESHOLD_DB = -55.0  # 아주 조용한 녹음에서도 이보다 작은 소리는 침묵으로 봅니다
+VAD_HANGOVER_SEC = 0.2      # 말소리 앞뒤로 남겨둘 여유 (초)
+VAD_MIN_PAUSE_SEC = 2.0     # 이보다 긴 침묵이 구간 안에 있으면 그 자리에서 나눕니다 (초)
+
+# 화자 분리 방식: "pyannote"(정확함, 느림) 또는 "fast"(numpy 에너지 VAD + 군집화, 2~3명 회의용)
+AVAILABLE_DIARIZATION_BACKENDS = ["pyannote", "fast"]
+DIARIZATION_BACKEND = "pyannote"
+FAST_DIARIZATION_SEGMENT_SEC = 1.5      # 목소리 특징을 뽑을 조각 길이 (초)
+FAST_DIARIZATION_MIN_SEGMENT_SEC = 0.5  # 이보다 짧은 말소리 구간은 무시합니다 (초)
+FAST_DIARIZATION_THRESHOLD = 0.5        # 이 코사인 유사도 이상인 묶음끼리 같은 화자로 합칩니다
+FAST_DIARIZATION_MAX_SPEAKERS = 8       # 최대 화자 수
+FAST_DIARIZATION_N_MELS = 40            # 멜 필터 개수 (특징 벡터는 이 값의 2배 차원)
+
+# 화자 분리 모델
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+# 프로세스 안에서 동시에 띄워둘 화자 분리 파이프라인 개수 (동시 처리 작업 수)
+DIARIZATION_POOL_SIZE = 1
+# 앱 시작(setup_directories) 시 화자 분리 모델을 미리 불러올지 여부
+DIARIZATION_PRELOAD = False
+
+# 창(window) 단위 화자 분리: 긴 녹음을 겹치는 구간으로 나눠 디스크에서 조금씩 읽으며 처리합니다.
+# 이 길이(초) 이상인 녹음은 자동으로 창 단위 모드로 처리합니다.
+DIARIZATION_WINDOWED_MIN_SEC = 1800
+DIARIZATION_WINDOW_SEC = 600
+DIARIZATION_WINDOW_OVERLAP_SEC = 30
+# 창 경계에서 같은 화자로 이어붙일 최소 화자 임베딩 코사인 유사도
+DIARIZATION_SPEAKER_MATCH_THRESHOLD = 0.5
+# 창 단위로 처리하는 긴 녹음은 창마다 끝난 발화 구간을 바로 STT로 넘겨, 화자 분리와 STT를 겹쳐 실행합니다.
+STT_PIPELINED = True
+# (선택) DIARIZATION_WINDOWED_MIN_SEC보다 짧은 녹음도 짧은 창으로 나눠 겹쳐 실행할지 여부.
+# 켜면 STT가 일찍 시작하지만, 화자 일관성이 한 번의 전체 클러스터링 대신 창 이어붙이기에 달려 있게 됩니다.
+# scripts/bench_diarization.py로 화자 분리 오류율과 화자 수가 나빠지지 않는지 확인하기 전까지는 끕니다.
+STT_PIPELINE_SHORT_FILES = False
+# 짧은 녹음을 겹쳐 실행할 때 쓰는 창 길이/겹침 (초). 창이 짧을수록 STT가 일찍 시작하지만, 겹침만큼 화자 분리 계산이 늘어납니다.
+STT_PIPELINE_WINDOW_SEC = 180
+STT_PIPELINE_WINDOW_OVERLAP_SEC = 20
+# 화자 분리가 STT보다 앞서 나갈 수 있는 최대 창 개수 (대기열 크기)
+STT_PIPELINE_QUEUE_SIZE = 2
+
+# --- 화자 색인 설정 ---
+# 회의가 끝날 때마다 화자 임베딩을 모아두고, 다음 회의에서 같은 목소리를 자동으로 알아봅니다.
+# 회의를 넘나드는 목소리 비교가 충분히 검증되기 전까지는 기본으로 끕니다. ('처리 & 요약' 탭의 체크박스로 켤 수 있습니다.)
+SPEAKER_INDEX_ENABLED = False
+# 화자 분리 방식마다 명부에서 쓸 임베딩 공간 이름.
+# 임베딩 계산 방식이 바뀌면 새 이름을 써서 예전 방식으로 적어둔 임베딩과 섞이지 않게 합니다.
+SPEAKER_INDEX_SPACES = {"pyannote": "pyannote", "fast": "fast_fixed"}
+# 임베딩 공간마다 성질이 달라서, 같은 사람으로 볼 코사인 유사도 기준도 따로 둡니다.
+SPEAKER_INDEX_THRESHOLDS = {"pyannote": 0.6, "fast_fixed": 0.75}
+SPEAKER_INDEX_MAX_PER_SPEAKER = 20  # 화자 한 명당 보관할 최대 임베딩 개수 (오래된 것부터 지웁니다)
+
+# --- 캐시 설정 ---
+# 같은 오디오를 다시 처리할 때 화자 분리/STT 결과를 재사용하는 디스크 캐시의 최대 크기 (바이트)
+AUDIO_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# 같은 입력으로 교정/키워드/요약을 다시 요청할 때 LLM 응답을 재사용하는 디스크 캐시
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+LLM_CACHE_TTL_SEC = 7 * 24 * 60 * 60  # 이보다 오래된 응답은 다시 요청합니다 (초)
+# prompts.py의 명령서를 고치면 이 값을 올려주세요. 예전 명령서로 받은 응답을 재사용하지 않습니다.
+LLM_PROMPT_VERSION = "1"
+# 색인과 챗봇 질문에서 같은 글의 임베딩을 재사용하는 캐시 (float32로 SQLite 파일 하나에 저장)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# --- LLM/API 연결 설정 ---
+# OpenAI 클라이언트(GPT, Whisper, 임베딩, 챗봇)가 함께 쓰는 HTTP 연결 풀입니다.
+# STT 동시 요청 수(STT_MAX_CONCURRENCY)와 Gradio 동시 작업을 함께 감당할 수 있을 만큼 잡아둡니다.
+LLM_HTTP_MAX_CONNECTIONS = 32
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+LLM_HTTP_KEEPALIVE_EXPIRY_SEC = 60.0  # 이 시간 동안 쓰지 않은 연결은 닫습니다 (초)
+LLM_HTTP_CONNECT_TIMEOUT_SEC = 10.0
+LLM_HTTP_TIMEOUT_SEC = 180.0          # 요청 하나의 최대 대기 시간 (긴 요약/업로드 고려, 초)
+# 교정/키워드/요약 요청을 LLM 공급자(모델)마다 동시에 최대 몇 개까지 보낼지
+LLM_MAX_CONCURRENT_REQUESTS = 16
+
 # 사용 가능한 LLM 모델
 AVAILABLE_LLMS = ["gpt-4o", "gemini-2.5-pro"]
 
+# 대화록 교정: 구간을 창 단위로 나눠 동시에 교정합니다. 창 앞뒤로 문맥용 구간을 함께 보여줍니다.
+CORRECTION_WINDOW_SEGMENTS = 40   # 창 하나에서 교정할 구간 수
+CORRECTION_CONTEXT_SEGMENTS = 5   # 창 앞뒤로 참고용으로만 보여줄 구간 수
+CORRECTION_MAX_WORKERS = 8        # 동시에 교정할 창 수
+
+# 요약 방식: "single"(한 번에 요약), "map_reduce"(나눠서 요약한 뒤 합치기), "auto"(길이에 따라 자동 선택)
+SUMMARY_MODE = "auto"
+SUMMARY_SINGLE_MAX_TOKENS = 12000  # auto 모드에서 대화록이 이보다 길면 나눠서 요약합니다 (토큰)
+SUMMARY_CHUNK_TOKENS = 4000        # 나눠서 요약할 때 조각 하나의 최대 길이 (토큰)
+SUMMARY_MAX_WORKERS = 4            # 동시에 요약할 조각 수
+
+# STT 이후 단계(교정/키워드/요약/저장/색인) 중 서로 기다릴 필요가 없는 단계를 동시에 실행할 최대 개수
+PIPELINE_MAX_WORKERS = 4
+# '처리 & 요약' 탭에서 교정/요약 결과가 도착하는 중에 화면을 다시 그리는 최소 간격 (초)
+UI_STREAM_INTERVAL_SEC = 0.3
+
+# --- 챗봇 설정 ---
+# 검색된 문서의 관련성 평가 방식:
+# "batch"(문서마다 한 번씩, 동시에 호출), "single"(모든 문서를 한 번의 호출로 평가), "sequential"(문서마다 차례로 호출)
+AVAILABLE_CHATBOT_GRADING_MODES = ["batch", "single", "sequential"]
+CHATBOT_GRADING_MODE = "batch"
+CHATBOT_GRADING_MAX_CONCURRENCY = 4  # batch 모드에서 동시에 평가할 최대 문서 수
+# 열어둔 ChromaDB 컬렉션(과 리트리버)을 최대 몇 개까지 기억해둘지 (오래 안 쓴 것부터 닫습니다)
+CHROMA_HANDLE_CACHE_SIZE = 16
+
 # 기본 회의 주제 및 키워드 (UI에서 오버라이드 가능)
 DEFAULT_MEETING_TOPIC = "회의"
 DEFAULT_KEYWORDS = ["핵심", "내용", "정리"]
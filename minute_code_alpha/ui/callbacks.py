@@ -13,6 +13,9 @@ import logging
 import re
 import uuid
 import json
+import time
+import queue
+import threading
 from slugify import slugify
 
 # 우리가 만든 모듈들을 가져옵니다.
@@ -21,8 +24,12 @@ from ..settings import (
     DATA_DIR,
     RESULTS_DIR,
     AVAILABLE_LLMS,
+    STT_BACKEND,
+    DIARIZATION_BACKEND,
+    SPEAKER_INDEX_ENABLED,
     DEFAULT_MEETING_TOPIC,
-    DEFAULT_KEYWORDS
+    DEFAULT_KEYWORDS,
+    UI_STREAM_INTERVAL_SEC
 )
 from .handlers import (
     get_audio_files_for_df,
@@ -32,6 +39,7 @@ from .handlers import (
     save_recording
 )
 from ..chatbot.graph import run_query
+from ..audio.speaker_index import get_speaker_index
 
 # --- 기본 설정 ---
 # 이제 모든 경로는 settings.py에서 관리합니다.
@@ -144,20 +152,79 @@ def save_recording_wrapper(temp_file, fname):
 
 # --- Gradio 콜백 함수 (사용자 행동에 반응하는 함수들) ---
 
-def run_processing_and_update_ui(audio_filename, llm_choice, topic, keywords_str, progress=gr.Progress(track_tqdm=True)):
-    """처리 파이프라인을 실행하고 UI를 업데이트합니다."""
+def _format_streaming_summary(summary_text: str) -> str:
+    """(내부용) 작성 중인 요약(JSON 조각)을 그대로 보여주는 마크다운을 만듭니다."""
+    if not summary_text:
+        return ""
+    return f"*요약 작성 중...*\n\n```\n{summary_text}\n```"
+
+def run_processing_and_update_ui(audio_filename, llm_choice, topic, keywords_str, stt_backend=STT_BACKEND,
+                                 diarization_backend=DIARIZATION_BACKEND, use_speaker_index=SPEAKER_INDEX_ENABLED,
+                                 progress=gr.Progress(track_tqdm=True)):
+    """
+    처리 파이프라인을 실행하고 UI를 업데이트합니다.
+    파이프라인은 별도 스레드에서 돌리고, 교정된 대화록과 요약이 도착하는 대로 화면에 조금씩 보여줍니다. (제너레이터)
+    """
     if not audio_filename:
-        return "처리할 오디오 파일을 먼저 선택해주세요.", "", "", gr.Dropdown(choices=[name for name, _ in get_processed_meetings()]), {}
+        yield "처리할 오디오 파일을 먼저 선택해주세요.", "", "", gr.Dropdown(choices=[name for name, _ in get_processed_meetings()]), {}
+        return
 
     progress(0, desc="준비 중...")
     audio_path = os.path.join(DATA_DIR, audio_filename)
     keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
 
-    results_path, message = run_pipeline(audio_path, llm_choice, topic, keywords)
+    events = queue.Queue()
+    outcome = {}
+    def worker():
+        try:
+            outcome["result"] = run_pipeline(audio_path, llm_choice, topic, keywords, stt_backend=stt_backend,
+                                             diarization_backend=diarization_backend,
+                                             use_speaker_index=use_speaker_index,
+                                             on_event=lambda kind, payload: events.put((kind, payload)))
+        except Exception as e:
+            logging.error(f"처리 파이프라인 실행 중 오류 발생: {e}")
+            outcome["result"] = (None, str(e))
+        finally:
+            events.put((None, None)) # 끝났다는 신호
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    meetings = get_processed_meetings() # 처리 중에는 Q&A 탭의 목록을 그대로 둡니다.
+    status, corrected_text, summary_text = "처리 중...", "", ""
+    last_yield = 0.0
+    dirty = False
+    finished = False
+    while not finished:
+        try:
+            kind, payload = events.get(timeout=UI_STREAM_INTERVAL_SEC)
+            while True:
+                if kind is None:
+                    finished = True
+                    break
+                if kind == "status":
+                    status = payload
+                    progress(0.5, desc=payload)
+                elif kind == "transcript":
+                    corrected_text = payload
+                elif kind == "summary_token":
+                    summary_text += payload
+                dirty = True
+                kind, payload = events.get_nowait() # 그동안 쌓인 소식을 한꺼번에 반영합니다.
+        except queue.Empty:
+            pass
+        # 너무 자주 다시 그리면 브라우저가 버벅이므로, 일정 간격으로 모아서 보여줍니다.
+        if dirty and not finished and time.monotonic() - last_yield >= UI_STREAM_INTERVAL_SEC:
+            last_yield = time.monotonic()
+            dirty = False
+            yield (f"**{status}**", _format_streaming_summary(summary_text), corrected_text,
+                   gr.Dropdown(choices=[name for name, _ in meetings]), dict(meetings))
+
+    results_path, message = outcome["result"]
     progress(0.9, desc="결과 파일 로딩 중...")
 
     if not results_path:
-        return f"**처리 실패:** {message}", "", "", gr.Dropdown(choices=[name for name, _ in get_processed_meetings()]), {}
+        yield f"**처리 실패:** {message}", "", "", gr.Dropdown(choices=[name for name, _ in get_processed_meetings()]), {}
+        return
 
     summary_markdown = "요약 파일을 찾을 수 없습니다."
     corrected_text = "교정된 텍스트 파일을 찾을 수 없습니다."
@@ -178,7 +245,7 @@ def run_processing_and_update_ui(audio_filename, llm_choice, topic, keywords_str
 
     progress(1, desc="완료")
     new_meetings = get_processed_meetings()
-    return f"**{message}** 결과는 '{results_path}' 폴더에 저장되었습니다.", summary_markdown, corrected_text, gr.Dropdown(choices=[name for name, _ in new_meetings]), dict(new_meetings)
+    yield f"**{message}** 결과는 '{results_path}' 폴더에 저장되었습니다.", summary_markdown, corrected_text, gr.Dropdown(choices=[name for name, _ in new_meetings]), dict(new_meetings)
 
 def handle_chat_message(user_question, history, collection_name):
     """챗봇 메시지를 처리하고 답변을 생성합니다. (messages 포맷)"""
@@ -267,3 +334,32 @@ def load_meeting_data(selection, state):
 def refresh_chatbot_dropdown():
     new_meetings = get_processed_meetings()
     return gr.Dropdown(choices=[name for name, _ in new_meetings]), dict(new_meetings)
+
+# --- 화자 명부 탭 ---
+
+def get_speaker_rows():
+    """화자 명부를 데이터프레임용 [화자 번호, 이름, 참여한 회의 수] 목록으로 반환합니다."""
+    try:
+        return [[speaker_id, name or "", meetings] for speaker_id, name, meetings in get_speaker_index().list_speakers()]
+    except Exception as e:
+        logging.error(f"화자 명부 로딩 중 오류: {e}")
+        return []
+
+def refresh_speaker_list():
+    """화자 명부 표와 화자 선택 목록을 최신 상태로 업데이트합니다."""
+    rows = get_speaker_rows()
+    return gr.Dataframe(value=rows), gr.Dropdown(choices=[row[0] for row in rows])
+
+def rename_speaker(speaker_id, name):
+    """선택한 화자에게 이름을 붙입니다. 다음에 처리하는 회의부터 대화록에 이 이름이 나옵니다. (빈 이름이면 이름을 지웁니다.)"""
+    if not speaker_id:
+        status = "이름을 붙일 화자를 먼저 선택해주세요."
+    else:
+        try:
+            name = (name or "").strip()
+            get_speaker_index().rename(speaker_id, name)
+            status = f"'{speaker_id}'의 이름을 '{name}'(으)로 저장했습니다." if name else f"'{speaker_id}'의 이름을 지웠습니다."
+        except Exception as e:
+            logging.error(f"화자 이름 저장 중 오류: {e}")
+            status = f"화자 이름 저장 중 오류 발생: {e}"
+    return (gr.Markdown(status),) + refresh_speaker_list()
@@ -11,7 +11,8 @@ import os
 import shutil
 from datetime import datetime
 import logging
-from pydub import AudioSegment # 오디오 파일 변환에 필요
+
+from ..audio.ingest import convert_to_wav # 오디오 파일 변환에 필요
 
 # Gradio 컴포넌트의 타입을 명시하기 위해 import 합니다. 실제 Gradio 로직은 callbacks.py에서 처리합니다.
 import gradio as gr 
@@ -48,7 +49,7 @@ def refresh_audio_df(data_dir):
     return gr.Dataframe(value=get_audio_files_for_df(data_dir))
 
 def upload_file(file_obj, data_dir, progress=gr.Progress(track_tqdm=True)):
-    """파일을 업로드하고 WAV로 변환합니다."""
+    """파일을 업로드하고 16kHz 모노 WAV로 변환합니다. (ffmpeg로 조금씩 흘려보내며 디스크에 바로 씁니다.)"""
     if file_obj is None:
         return gr.Markdown("파일이 선택되지 않았습니다."), refresh_audio_df(data_dir), gr.Dropdown(choices=get_audio_files_for_dropdown(data_dir))
 
@@ -59,8 +60,8 @@ def upload_file(file_obj, data_dir, progress=gr.Progress(track_tqdm=True)):
 
     try:
         progress(0, desc="파일 변환 중...")
-        audio = AudioSegment.from_file(original_path)
-        audio.export(wav_path, format="wav")
+        convert_to_wav(original_path, wav_path,
+                       progress_callback=lambda ratio: progress(ratio, desc="파일 변환 중..."))
         status = f"'{filename}'이(가) '{os.path.basename(wav_path)}'(으)로 변환되어 저장되었습니다."
     except Exception as e:
         status = f"파일 변환 중 오류 발생: {e}"
@@ -19,7 +19,10 @@ from .callbacks import (
     run_processing_and_update_ui,
     handle_chat_message,
     load_meeting_data,
-    refresh_chatbot_dropdown
+    refresh_chatbot_dropdown,
+    get_speaker_rows,
+    refresh_speaker_list,
+    rename_speaker
 )
 from .handlers import (
     get_audio_files_for_df,
@@ -29,6 +32,11 @@ from ..settings import (
     DATA_DIR,
     RESULTS_DIR,
     AVAILABLE_LLMS,
+    AVAILABLE_STT_BACKENDS,
+    STT_BACKEND,
+    AVAILABLE_DIARIZATION_BACKENDS,
+    DIARIZATION_BACKEND,
+    SPEAKER_INDEX_ENABLED,
     DEFAULT_MEETING_TOPIC,
     DEFAULT_KEYWORDS
 )
@@ -92,6 +100,9 @@ def create_ui():
                     keywords_input = gr.Textbox(label="주요 키워드 (쉼표로 구분)", value=", ".join(DEFAULT_KEYWORDS))
                 
                 llm_dropdown = gr.Radio(label="사용할 LLM", choices=AVAILABLE_LLMS, value=AVAILABLE_LLMS[0])
+                stt_backend_radio = gr.Radio(label="음성 인식(STT) 방식 (openai: Whisper API, local: CPU에서 직접 실행)", choices=AVAILABLE_STT_BACKENDS, value=STT_BACKEND)
+                diarization_backend_radio = gr.Radio(label="화자 분리 방식 (pyannote: 정확함, fast: 2~3명 회의용 빠른 처리)", choices=AVAILABLE_DIARIZATION_BACKENDS, value=DIARIZATION_BACKEND)
+                speaker_index_checkbox = gr.Checkbox(label="화자 명부 사용 (이전 회의에서 본 목소리를 알아보고, 이번 회의의 목소리도 명부에 적어둡니다)", value=SPEAKER_INDEX_ENABLED)
                 
                 start_button = gr.Button("처리 시작", variant="primary")
                 process_status = gr.Markdown("")
@@ -100,6 +111,22 @@ def create_ui():
                     summary_output = gr.Markdown(label="회의 요약")
                     corrected_output = gr.Textbox(label="교정된 대화록", lines=15, interactive=False)
 
+            with gr.TabItem("화자 명부"):
+                gr.Markdown("'화자 명부 사용'을 켜고 처리한 회의의 목소리가 여기에 모입니다. 화자에게 이름을 붙이면 다음 회의부터 대화록에 그 이름이 나옵니다.")
+                speaker_rows = get_speaker_rows()
+                speaker_list_df = gr.Dataframe(
+                    headers=["화자 번호", "이름", "참여한 회의 수"],
+                    value=speaker_rows,
+                    interactive=False
+                )
+                with gr.Row():
+                    speaker_selector = gr.Dropdown(label="화자 선택", choices=[row[0] for row in speaker_rows])
+                    speaker_name_input = gr.Textbox(label="이름", placeholder="예: 김팀장")
+                with gr.Row():
+                    rename_speaker_button = gr.Button("이름 저장", variant="primary")
+                    speaker_refresh_button = gr.Button("명부 새로고침")
+                speaker_status = gr.Markdown("")
+
             with gr.TabItem("회의록 검색 Q&A"):
                 with gr.Column():
                     with gr.Row():
@@ -154,10 +181,19 @@ def create_ui():
         # 처리 & 요약 탭에서 처리가 완료되면 Q&A 탭의 드롭다운과 상태를 함께 업데이트
         start_button.click(
             fn=run_processing_and_update_ui,
-            inputs=[audio_dropdown, llm_dropdown, topic_input, keywords_input],
+            inputs=[audio_dropdown, llm_dropdown, topic_input, keywords_input, stt_backend_radio, diarization_backend_radio,
+                    speaker_index_checkbox],
             outputs=[process_status, summary_output, corrected_output, chatbot_meeting_selector, available_meetings_state]
         )
 
+        # 화자 명부 탭 이벤트 핸들러
+        speaker_refresh_button.click(fn=refresh_speaker_list, outputs=[speaker_list_df, speaker_selector])
+        rename_speaker_button.click(
+            fn=rename_speaker,
+            inputs=[speaker_selector, speaker_name_input],
+            outputs=[speaker_status, speaker_list_df, speaker_selector]
+        )
+
         # 회의록 선택 시 데이터 로드
         chatbot_meeting_selector.change(
             fn=load_meeting_data,